@@ -1,135 +1,619 @@
+import base64
+import os
+import queue
 import sqlite3
+import threading
 import json
+from contextlib import contextmanager
 from datetime import datetime
 
-DB_NAME = "app/database/users.db"
+from app.utils.timing import phase
 
+DB_NAME = os.getenv("DB_PATH", "app/database/users.db")
+# Connections kept open per process; callers wait for a free one beyond this
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+
+# WAL lets readers run alongside a writer; NORMAL sync is safe in WAL mode
+# and avoids an fsync on every commit
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 134217728",
+)
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared by the threads of one process."""
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self.pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=DB_POOL_TIMEOUT, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._idle.get(timeout=DB_POOL_TIMEOUT)
+
+    def release(self, conn):
+        self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Per-process pool; worker processes build their own instead of sharing sockets/handles."""
+    global _pool
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                _pool = ConnectionPool(DB_NAME, DB_POOL_SIZE)
+    return _pool
+
+
+@contextmanager
 def get_connection():
-    """Helper to open a new database connection."""
-    return sqlite3.connect(DB_NAME)
+    """Borrow a pooled connection; commits on success, rolls back on error.
+
+    Every DB call goes through here, so the whole call (waiting for a
+    connection included) is timed as the "db" phase.
+    """
+    with phase("db"):
+        pool = get_pool()
+        conn = pool.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            pool.release(conn)
+
 
 def initialize_db():
     """Initialize users and model_results tables if they don't exist."""
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    # Create users table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL
-        );
-    """)
-
-    # Create model_results table (ties metrics to usernames)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS model_results (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL,
-            dataset_name TEXT NOT NULL,
-            model_type TEXT NOT NULL,
-            target_column TEXT,
-            metrics TEXT,
-            metric_value REAL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(username) REFERENCES users(username)
-        );
-    """)
-
-    conn.commit()
-    conn.close()
-    print(f"Database '{DB_NAME}' initialized successfully with 'users' and 'model_results' tables.")
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        # Create users table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL
+            );
+        """)
+
+        # Create model_results table (ties metrics to usernames)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS model_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL,
+                dataset_name TEXT NOT NULL,
+                model_type TEXT NOT NULL,
+                target_column TEXT,
+                metrics TEXT,
+                metric_value REAL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY(username) REFERENCES users(username)
+            );
+        """)
+
+        # Older databases predate the model_id column
+        cursor.execute("PRAGMA table_info(model_results)")
+        if "model_id" not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE model_results ADD COLUMN model_id TEXT")
+
+        # History pages (newest first) and the best-per-model aggregate are
+        # both answered from these indexes instead of scanning the table
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_model_results_user_time
+            ON model_results (username, timestamp, id);
+        """)
+        # Best-per-model is grouped by dataset and target; replaces the older
+        # (username, dataset_name, model_type, metric_value) index
+        cursor.execute("DROP INDEX IF EXISTS idx_model_results_user_dataset_model;")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_model_results_user_dataset_target_model
+            ON model_results (username, dataset_name, target_column, model_type, metric_value);
+        """)
+
+        # Create jobs table (background training runs and their results)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                username TEXT,
+                model_type TEXT NOT NULL,
+                dataset_name TEXT,
+                target_column TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                progress REAL DEFAULT 0,
+                message TEXT,
+                result TEXT,
+                error TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                started_at DATETIME,
+                finished_at DATETIME
+            );
+        """)
+
+        # Older databases predate job cancellation
+        cursor.execute("PRAGMA table_info(jobs)")
+        if "cancel_requested" not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE jobs ADD COLUMN cancel_requested INTEGER DEFAULT 0")
+
+        # Create datasets table (uploaded files stored once on disk)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS datasets (
+                id TEXT PRIMARY KEY,
+                username TEXT,
+                filename TEXT NOT NULL,
+                path TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                size_bytes INTEGER,
+                n_rows INTEGER,
+                n_columns INTEGER,
+                schema TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+        # Results of finished model runs, keyed by a hash of everything that
+        # determines them (see utils/result_cache.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS result_cache (
+                key TEXT PRIMARY KEY,
+                model_type TEXT,
+                result TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hits INTEGER DEFAULT 0
+            );
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_result_cache_last_used
+            ON result_cache (last_used_at);
+        """)
+
+    print(f"Database '{DB_NAME}' initialized successfully with 'users', 'model_results', 'jobs', 'datasets' "
+          f"and 'result_cache' tables.")
 
 
 # ------------------------------
 # User Management
 # ------------------------------
 def add_user(username: str, password: str):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password))
-        conn.commit()
-        return {"success": "success"}
-    except sqlite3.IntegrityError:
-        return {"failed": "User already exists"}
-    finally:
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password))
+            return {"success": "success"}
+        except sqlite3.IntegrityError:
+            return {"failed": "User already exists"}
+
 
 def get_user(username: str, password: str):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM users WHERE username = ? AND password = ?", (username, password))
-    user = cursor.fetchone()
-    conn.close()
-    return bool(user)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM users WHERE username = ? AND password = ?", (username, password))
+        user = cursor.fetchone()
+        return bool(user)
 
 
 # ------------------------------
 # Model Tracking
 # ------------------------------
-def save_model_result(username: str, dataset_name: str, model_type: str, target_column: str, metrics: dict):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    # Extract a key metric for comparison
-    metric_value = metrics.get("accuracy") or metrics.get("r2_score") or (1 / metrics.get("mse", 1))
-
-    cursor.execute("""
-        INSERT INTO model_results (username, dataset_name, model_type, target_column, metrics, metric_value, timestamp)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
-        username,
-        dataset_name,
-        model_type,
-        target_column,
-        json.dumps(metrics),
-        round(metric_value, 4),
-        datetime.now(),
-    ))
-
-    conn.commit()
-    conn.close()
-
-
-def get_user_model_history(username: str):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT dataset_name, model_type, target_column, metrics, metric_value, timestamp
+def primary_metric(metrics: dict):
+    """Extract a key metric for comparison."""
+    return round(metrics.get("accuracy") or metrics.get("r2_score") or (1 / metrics.get("mse", 1)), 4)
+
+
+def save_model_result(username: str, dataset_name: str, model_type: str, target_column: str, metrics: dict,
+                      model_id: str = None):
+    save_model_results(username, dataset_name, target_column, [(model_type, metrics, model_id)])
+
+
+def save_model_results(username: str, dataset_name: str, target_column: str, results: list):
+    """Save several (model_type, metrics, model_id) results in a single transaction."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        now = datetime.now()
+        cursor.executemany("""
+            INSERT INTO model_results (username, dataset_name, model_type, target_column, metrics, metric_value, timestamp, model_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                username,
+                dataset_name,
+                model_type,
+                target_column,
+                json.dumps(metrics),
+                primary_metric(metrics),
+                now,
+                model_id,
+            )
+            for model_type, metrics, model_id in results
+        ])
+
+
+# Max rows returned by one history page
+HISTORY_PAGE_LIMIT = 500
+
+
+def _history_row_to_dict(row):
+    dataset, model, target, metrics_json, metric_value, ts, model_id = row[:7]
+    try:
+        metrics = json.loads(metrics_json)
+    except (TypeError, json.JSONDecodeError):
+        metrics = {}
+    return {
+        "dataset_name": dataset,
+        "model": model,
+        "target_column": target,
+        "metric_value": metric_value,
+        "metrics": metrics,
+        "timestamp": ts,
+        "model_id": model_id,
+    }
+
+
+def _history_filters(username: str, dataset_name: str = None, model_type: str = None, target_column: str = None):
+    clauses, params = ["username = ?"], [username]
+    for column, value in (("dataset_name", dataset_name), ("model_type", model_type), ("target_column", target_column)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    return clauses, params
+
+
+def encode_history_cursor(timestamp, row_id: int):
+    return base64.urlsafe_b64encode(json.dumps([str(timestamp), row_id]).encode()).decode()
+
+
+def decode_history_cursor(cursor: str):
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def get_user_model_history(username: str, limit: int = None, cursor: str = None, dataset_name: str = None,
+                           model_type: str = None, target_column: str = None):
+    """Newest-first model history, optionally filtered.
+
+    Without a limit every matching row is returned (as before). With a limit a
+    page is returned together with the cursor of the next page:
+    {"history": [...], "next_cursor": str | None}.
+    """
+    clauses, params = _history_filters(username, dataset_name, model_type, target_column)
+    if cursor:
+        # Keyset pagination: continue strictly after the last row of the previous page
+        clauses.append("(timestamp, id) < (?, ?)")
+        params.extend(decode_history_cursor(cursor))
+
+    query = f"""
+        SELECT dataset_name, model_type, target_column, metrics, metric_value, timestamp, model_id, id
         FROM model_results
-        WHERE username = ?
-        ORDER BY timestamp DESC
-    """, (username,))
+        WHERE {" AND ".join(clauses)}
+        ORDER BY timestamp DESC, id DESC
+    """
+    if limit is not None:
+        limit = max(1, min(int(limit), HISTORY_PAGE_LIMIT))
+        # One extra row tells whether another page exists
+        query += " LIMIT ?"
+        params.append(limit + 1)
 
-    rows = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
 
-    history = []
-    for dataset, model, target, metrics_json, metric_value, ts in rows:
-        try:
-            metrics = json.loads(metrics_json)
-        except json.JSONDecodeError:
-            metrics = {}
-        history.append({
-            "dataset_name": dataset,
-            "model": model,
-            "target_column": target,
-            "metric_value": metric_value,
-            "metrics": metrics,
-            "timestamp": ts
-        })
-    return history
+    if limit is None:
+        return [_history_row_to_dict(row) for row in rows]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_history_cursor(rows[-1][5], rows[-1][7])
+    return {"history": [_history_row_to_dict(row) for row in rows], "next_cursor": next_cursor}
+
+
+def get_best_model_results(username: str, dataset_name: str = None, target_column: str = None):
+    """Best metric_value of each model on each dataset and target, with the run that achieved it.
+
+    Runs on different targets are never compared: their metrics (r2, accuracy) differ.
+    """
+    clauses, params = _history_filters(username, dataset_name, target_column=target_column)
+    with get_connection() as conn:
+        # SQLite fills the bare columns from the row holding MAX(metric_value)
+        rows = conn.execute(f"""
+            SELECT dataset_name, model_type, target_column, metrics, MAX(metric_value), timestamp, model_id,
+                   COUNT(*)
+            FROM model_results
+            WHERE {" AND ".join(clauses)}
+            GROUP BY dataset_name, target_column, model_type
+            ORDER BY dataset_name, target_column, MAX(metric_value) DESC
+        """, params).fetchall()
+
+    best = []
+    for row in rows:
+        entry = _history_row_to_dict(row)
+        entry["runs"] = row[7]
+        best.append(entry)
+    return best
 
 
 def clear_user_model_history(username: str):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM model_results WHERE username = ?", (username,))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM model_results WHERE username = ?", (username,))
+
+
+# ------------------------------
+# Training Jobs
+# ------------------------------
+JOB_COLUMNS = (
+    "id", "username", "model_type", "dataset_name", "target_column", "status",
+    "progress", "message", "result", "error", "created_at", "started_at", "finished_at", "cancel_requested",
+)
+
+
+def create_job(job_id: str, username: str, model_type: str, dataset_name: str, target_column: str):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO jobs (id, username, model_type, dataset_name, target_column, status, progress, created_at)
+            VALUES (?, ?, ?, ?, ?, 'queued', 0, ?)
+        """, (job_id, username, model_type, dataset_name, target_column, datetime.now()))
+
+
+def update_job(job_id: str, **fields):
+    """Update any of the job columns, e.g. update_job(id, status="running", progress=0.5)."""
+    unknown = set(fields) - set(JOB_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+    if not fields:
+        return
+
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+
+def mark_job_running(job_id: str):
+    """Move a queued job to running. False if it was cancelled while waiting for a worker."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE jobs SET status = 'running', started_at = ?, message = 'Starting'
+            WHERE id = ? AND status = 'queued'
+        """, (datetime.now(), job_id))
+        return cursor.rowcount == 1
+
+
+def request_job_cancel(job_id: str):
+    """Cancel a job: queued jobs are cancelled at once, running ones are flagged for their worker.
+
+    Returns the job's status afterwards, or None if the job doesn't exist.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE jobs SET status = 'cancelled', error = 'Cancelled by user', finished_at = ?, cancel_requested = 1
+            WHERE id = ? AND status = 'queued'
+        """, (datetime.now(), job_id))
+        cursor.execute("""
+            UPDATE jobs SET cancel_requested = 1, message = 'Cancelling'
+            WHERE id = ? AND status = 'running'
+        """, (job_id,))
+        cursor.execute("SELECT status FROM jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+
+def is_job_cancel_requested(job_id: str):
+    with get_connection() as conn:
+        row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+
+def get_job(job_id: str):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+        return dict(zip(JOB_COLUMNS, row)) if row else None
+
+
+def get_user_jobs(username: str, limit: int = 50):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, model_type, dataset_name, target_column, status, progress, created_at, finished_at
+            FROM jobs
+            WHERE username = ?
+            ORDER BY created_at DESC
+            LIMIT ?
+        """, (username, limit))
+        rows = cursor.fetchall()
+
+    columns = ("id", "model_type", "dataset_name", "target_column", "status", "progress", "created_at", "finished_at")
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def fail_interrupted_jobs():
+    """Mark jobs left queued/running by a previous server process as failed."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE jobs
+            SET status = 'failed', error = 'Job was interrupted by a server restart', finished_at = ?
+            WHERE status IN ('queued', 'running')
+        """, (datetime.now(),))
+        return cursor.rowcount
+
+
+# ------------------------------
+# Dataset Registry
+# ------------------------------
+def save_dataset(dataset_id: str, username: str, filename: str, path: str, content_hash: str,
+                 size_bytes: int, n_rows: int, n_columns: int, schema: dict):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO datasets (id, username, filename, path, content_hash, size_bytes, n_rows, n_columns, schema, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            dataset_id, username, filename, path, content_hash, size_bytes,
+            n_rows, n_columns, json.dumps(schema), datetime.now(),
+        ))
+
+
+def _dataset_row_to_dict(row):
+    dataset_id, username, filename, path, content_hash, size_bytes, n_rows, n_columns, schema, created_at = row
+    try:
+        schema = json.loads(schema)
+    except (TypeError, json.JSONDecodeError):
+        schema = {}
+    return {
+        "dataset_id": dataset_id,
+        "username": username,
+        "filename": filename,
+        "path": path,
+        "content_hash": content_hash,
+        "size_bytes": size_bytes,
+        "n_rows": n_rows,
+        "n_columns": n_columns,
+        "schema": schema,
+        "created_at": created_at,
+    }
+
+
+def get_dataset(dataset_id: str):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, username, filename, path, content_hash, size_bytes, n_rows, n_columns, schema, created_at
+            FROM datasets
+            WHERE id = ?
+        """, (dataset_id,))
+        row = cursor.fetchone()
+        return _dataset_row_to_dict(row) if row else None
+
+
+def get_user_datasets(username: str):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, username, filename, path, content_hash, size_bytes, n_rows, n_columns, schema, created_at
+            FROM datasets
+            WHERE username = ?
+            ORDER BY created_at DESC
+        """, (username,))
+        rows = cursor.fetchall()
+        return [_dataset_row_to_dict(row) for row in rows]
+
+
+def delete_dataset(dataset_id: str):
+    """Delete a dataset record. Returns the number of other records still using the same file."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT path FROM datasets WHERE id = ?", (dataset_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        cursor.execute("DELETE FROM datasets WHERE id = ?", (dataset_id,))
+        cursor.execute("SELECT COUNT(*) FROM datasets WHERE path = ?", (row[0],))
+        return cursor.fetchone()[0]
+
+
+# ------------------------------
+# Result Cache
+# ------------------------------
+def get_cached_result(key: str, min_created_at: float):
+    """The stored result JSON for key if it was created after min_created_at; counts the hit."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT result, created_at FROM result_cache WHERE key = ? AND created_at >= ?",
+                       (key, min_created_at))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        cursor.execute("UPDATE result_cache SET last_used_at = ?, hits = hits + 1 WHERE key = ?",
+                       (datetime.now().timestamp(), key))
+        return {"result": row[0], "created_at": row[1]}
+
+
+def save_cached_result(key: str, model_type: str, result: str, max_bytes: int, min_created_at: float):
+    """Store a result, then drop expired entries and the least recently used ones beyond max_bytes."""
+    now = datetime.now().timestamp()
+    size = len(result.encode("utf-8"))
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT OR REPLACE INTO result_cache (key, model_type, result, size_bytes, created_at, last_used_at, hits)
+            VALUES (?, ?, ?, ?, ?, ?, 0)
+        """, (key, model_type, result, size, now, now))
+        cursor.execute("DELETE FROM result_cache WHERE created_at < ?", (min_created_at,))
+        cursor.execute("""
+            DELETE FROM result_cache WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size_bytes) OVER (ORDER BY last_used_at DESC, key) AS running_bytes
+                    FROM result_cache
+                ) WHERE running_bytes > ?
+            )
+        """, (max_bytes,))
+
+
+def delete_cached_result(key: str):
+    with get_connection() as conn:
+        conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+
+
+def get_result_cache_stats():
+    with get_connection() as conn:
+        entries, size, hits = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(hits), 0) FROM result_cache"
+        ).fetchone()
+        return {"entries": entries, "bytes": size, "hits": hits}
 
 
-# Run on import
-initialize_db()
+def clear_result_cache():
+    with get_connection() as conn:
+        return conn.execute("DELETE FROM result_cache").rowcount
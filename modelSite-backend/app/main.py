@@ -1,14 +1,48 @@
 # uvicorn app.main:app --reload --port 8000
 import uvicorn
-import app.models as models
 import app.database.DB as db
+import app.utils.executor as executor
+import app.utils.jobs as jobs
+import app.utils.datasets as datasets
+import app.utils.dataset_profile as dataset_profile
+import app.utils.comparison as comparison
+import app.utils.cross_validation as cross_validation
+import app.utils.profiling as profiling
+import app.utils.registry as registry
+import app.utils.result_cache as result_cache
+import app.utils.streaming as streaming
+import app.utils.timing as timing
+import app.utils.tuning as tuning
+import app.utils.model_store as model_store
+import app.utils.data_utils as data_utils
+import asyncio
+import os
+import pandas as pd
 import json
 
+from contextlib import asynccontextmanager
+
 from pydantic import BaseModel
-from fastapi import FastAPI, UploadFile, Form, File, Body
+from fastapi import FastAPI, UploadFile, Form, File, Body, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
+
+# Admin endpoints (e.g. the profiling toggle) and the X-Profile header need this
+# in the X-Admin-Token header; they are disabled while it is unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup work runs here rather than as import side effects, so importing
+    # the app (and every training worker) stays cheap
+    await asyncio.to_thread(db.initialize_db)
+    interrupted = await asyncio.to_thread(db.fail_interrupted_jobs)
+    if interrupted:
+        print(f"Marked {interrupted} interrupted training job(s) as failed.")
+    yield
+    executor.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,7 +50,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets browser clients read the phase timings and profile links added to responses
+    expose_headers=["Server-Timing", "X-Profile-Url"],
 )
+# X-Profile request header (admins only) / admin toggle -> profiled model runs
+app.add_middleware(profiling.ProfilingMiddleware, admin_token=ADMIN_TOKEN)
+# Added last so it wraps everything else: phase timings for every request,
+# returned as a Server-Timing header and recorded for /metrics
+app.add_middleware(timing.TimingMiddleware)
 
 class User(BaseModel):
     username: str
@@ -28,10 +69,65 @@ async def root():
 
 @app.get("/status")
 async def status():
-    return {"message": "Backend is running properly"}
+    return {"message": "Backend is running properly", "workers": executor.queue_status()}
+
+@app.get("/metrics")
+def metrics():
+    """Request and per-phase latency histograms in the Prometheus text format (this API process only)."""
+    return Response(timing.render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def require_admin(request: Request):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    if request.headers.get("x-admin-token") != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+# ------------------------------
+# Profiling
+# ------------------------------
+@app.get("/admin/profiling")
+def profiling_status(request: Request):
+    require_admin(request)
+    return {"mode": profiling.get_admin_mode() or "off", "modes": list(profiling.PROFILE_MODES)}
+
+@app.post("/admin/profiling")
+def set_profiling(request: Request, mode: str = Form(...)):
+    """Profile every model run in this API process ("sample" or "cprofile"), or stop ("off")."""
+    require_admin(request)
+    return {"mode": profiling.set_admin_mode(mode) or "off"}
+
+@app.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, format: str = None):
+    """A saved profile: collapsed stacks (.folded, for flamegraph.pl or speedscope)
+    from the sampler, or cProfile stats (.pstats, or a text table with format=text)."""
+    try:
+        found = profiling.profile_path(profile_id)
+    except ValueError as e:
+        return {"error": str(e)}
+    if found is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    path, mode = found
+    if mode == "cprofile" and format == "text":
+        return PlainTextResponse(profiling.pstats_text(path))
+    media_type = "text/plain; charset=utf-8" if mode == "sample" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
+# ------------------------------
+# Result cache
+# ------------------------------
+@app.get("/admin/result-cache")
+def result_cache_status(request: Request):
+    require_admin(request)
+    return {**db.get_result_cache_stats(), "ttl_seconds": result_cache.RESULT_CACHE_TTL,
+            "max_bytes": result_cache.RESULT_CACHE_MB * 1024 * 1024}
+
+@app.delete("/admin/result-cache")
+def clear_result_cache(request: Request):
+    require_admin(request)
+    return {"deleted": db.clear_result_cache()}
 
 @app.post("/login")
-async def login(user: User):
+def login(user: User):
     res = db.get_user(user.username, user.password)
     return res
 
@@ -41,7 +137,7 @@ def signup(user: User):
     return res
 
 @app.delete("/clear-model-history/{username}")
-async def clear_model_history(username: str):
+def clear_model_history(username: str):
     try:
         db.clear_user_model_history(username)
         return {"message": f"All model history cleared for {username}"}
@@ -49,174 +145,405 @@ async def clear_model_history(username: str):
         return {"error": str(e)}
 
 @app.post("/save-model-result")
-async def save_model_result(
+def save_model_result(
         username: str = Form(...),
         dataset_name: str = Form(...),
         model_type: str = Form(...),
         target_column: str = Form(...),
         metrics: str = Form(...),
+        model_id: str = Form(None),
 ):
     try:
         metrics_dict = json.loads(metrics)
-        db.save_model_result(username, dataset_name, model_type, target_column, metrics_dict)
+        db.save_model_result(username, dataset_name, model_type, target_column, metrics_dict, model_id)
         return {"message": "Model result saved successfully"}
     except Exception as e:
         return {"error": str(e)}
 
 @app.get("/model-history/{username}")
-async def model_history(username: str):
+def model_history(
+        username: str,
+        limit: int = None,
+        cursor: str = None,
+        dataset_name: str = None,
+        model_type: str = None,
+        target_column: str = None,
+):
+    """Newest-first history. Pass limit to page through it with the returned next_cursor."""
     try:
-        history = db.get_user_model_history(username)
-        return {"history": history}
+        history = db.get_user_model_history(username, limit, cursor, dataset_name, model_type, target_column)
+        if limit is None:
+            return {"history": history, "next_cursor": None}
+        return history
     except Exception as e:
         return {"error": str(e)}
 
-@app.post("/linear-regression")
-async def linear_regression(file: UploadFile, target_column: str = Form(...)):
-    contents = await file.read()
+@app.get("/model-history/{username}/best")
+def best_model_results(username: str, dataset_name: str = None, target_column: str = None):
+    """Best saved run of each model on each dataset."""
     try:
-        res = models.linearregression.process_linear_regression(contents, file.filename, target_column)
-        if "error" in res:
-            return {"error": res["error"]}
-        return {
-            "model": res.get("model_type", "Linear Regression"),
-            "message": "Model executed successfully!",
-            "metrics": res.get("metrics", {}),
-            "coefficients": res.get("coefficients"),
-            "intercept": res.get("intercept"),
-            "predictions_preview": res.get("predictions_preview"),
-        }
-
+        return {"best": db.get_best_model_results(username, dataset_name, target_column)}
     except Exception as e:
         return {"error": str(e)}
 
-@app.post("/bagging")
-async def bagging(file: UploadFile, target_column: str = Form(...)):
-    contents = await file.read()
+@app.get("/models")
+def list_models():
+    """Registered models with their task types, metrics and default parameters."""
+    return {"models": registry.describe_models()}
+
+# ------------------------------
+# Model endpoints
+# ------------------------------
+# Result fields the model endpoints return besides the metrics and predictions preview
+LINEAR_FIELDS = ("coefficients", "intercept")
+ENSEMBLE_FIELDS = ("parameters",)
+KERNEL_FIELDS = ("coefficients", "intercept", "parameters")
+
+
+async def run_model_endpoint(model_name, file, dataset_id, target_column, fields=None, **options):
+    """Shared body of the model endpoints: train (or reuse a cached result) and shape the response.
+
+    With fields=None the whole result is returned, as /deep-neural-network does.
+    """
     try:
-        res = models.bagging.process_bagging_regression(contents, file.filename, target_column)
+        source, filename = await datasets.resolve_dataset(file, dataset_id)
+        res = await result_cache.run_pipeline(model_name, source, filename, target_column, **options)
         if "error" in res:
             return {"error": res["error"]}
+        if fields is None:
+            return res
         return {
-            "model": res.get("model_type", "Bagging"),
+            "model": res.get("model_type", registry.get_spec(model_name).label),
             "message": "Model executed successfully!",
             "metrics": res.get("metrics", {}),
-            "parameters": res.get("parameters"),
+            **{field: res.get(field) for field in fields},
             "predictions_preview": res.get("predictions_preview"),
+            "model_id": res.get("model_id"),
+            "cache_hit": res.get("cache_hit"),
         }
     except Exception as e:
         return {"error": str(e)}
 
+@app.post("/linear-regression")
+async def linear_regression(file: UploadFile = File(None), target_column: str = Form(...), dataset_id: str = Form(None)):
+    return await run_model_endpoint("linear-regression", file, dataset_id, target_column, LINEAR_FIELDS)
+
+@app.post("/bagging")
+async def bagging(file: UploadFile = File(None), target_column: str = Form(...), dataset_id: str = Form(None)):
+    return await run_model_endpoint("bagging", file, dataset_id, target_column, ENSEMBLE_FIELDS)
+
 @app.post("/logistic-regression")
-async def logistic_regression(file: UploadFile, target_column: str = Form(...)):
-    contents = await file.read()
+async def logistic_regression(file: UploadFile = File(None), target_column: str = Form(...), dataset_id: str = Form(None)):
+    return await run_model_endpoint("logistic-regression", file, dataset_id, target_column, LINEAR_FIELDS)
+
+@app.post("/decision-trees")
+async def decision_trees(file: UploadFile = File(None), target_column: str = Form(...), dataset_id: str = Form(None)):
+    return await run_model_endpoint("decision-trees", file, dataset_id, target_column, LINEAR_FIELDS)
+
+@app.post("/random-forest")
+async def random_forest(file: UploadFile = File(None), target_column: str = Form(...), dataset_id: str = Form(None)):
+    return await run_model_endpoint("random-forest", file, dataset_id, target_column, ENSEMBLE_FIELDS)
+
+@app.post("/svm")
+async def support_vector_machines(
+        file: UploadFile = File(None),
+        target_column: str = Form(...),
+        dataset_id: str = Form(None),
+        solver: str = Form(None),
+):
+    """solver: "exact" (kernel SVR), "approx" (Nystroem + LinearSVR) or "auto" (approx on large data)."""
+    return await run_model_endpoint("svm", file, dataset_id, target_column, KERNEL_FIELDS, solver=solver)
+
+@app.post("/deep-neural-network")
+async def deep_neural_network(file: UploadFile = File(None), request_data: str = Form(...), dataset_id: str = Form(None)):
     try:
-        res = models.logisticregression.process_logistic_regression(contents, file.filename, target_column)
-        if "error" in res:
-            return {"error": res["error"]}
-        return {
-            "model": res.get("model_type", "Logistic Regression"),
-            "message": "Model executed successfully!",
-            "metrics": res.get("metrics", {}),
-            "coefficients": res.get("coefficients"),
-            "intercept": res.get("intercept"),
-            "predictions_preview": res.get("predictions_preview"),
-        }
+        data = json.loads(request_data)
+        target_column, model_config = data.get("target_column"), data.get("model_config")
     except Exception as e:
         return {"error": str(e)}
+    return await run_model_endpoint("deep-neural-network", file, dataset_id, target_column, model_config=model_config)
 
-@app.post("/decision-trees")
-async def decision_trees(file: UploadFile, target_column: str = Form(...)):
-    contents = await file.read()
+@app.post("/boosting")
+async def model_boosting(
+        file: UploadFile = File(None),
+        target_column: str = Form(...),
+        dataset_id: str = Form(None),
+        engine: str = Form(None),
+):
+    """engine: "exact" (GradientBoosting) or "hist" (HistGradientBoosting, faster on large data)."""
+    return await run_model_endpoint("boosting", file, dataset_id, target_column, KERNEL_FIELDS, engine=engine)
+
+@app.post("/compare")
+async def compare_models(
+        file: UploadFile = File(None),
+        target_column: str = Form(...),
+        model_names: str = Form(..., alias="models"),
+        dataset_id: str = Form(None),
+        network_config: str = Form(None, alias="model_config"),
+        username: str = Form(None),
+        save: bool = Form(False),
+        cv: str = Form(None),
+        cv_folds: int = Form(5),
+):
+    """Train several models on one dataset and return a combined metrics table.
+
+    `models` is a JSON list or comma-separated list, e.g. "linear-regression,random-forest,svm".
+    With save=true and a username, every successful result is saved to the model history.
+    cv ("kfold" or "stratified") scores every model on the same cv_folds folds as well.
+    """
     try:
-        res = models.decisiontrees.process_decision_tree(contents, file.filename, target_column)
-        if "error" in res:
-            return {"error": res["error"]}
-        return {
-            "model": res.get("model_type", "Logistic Regression"),
-            "message": "Model executed successfully!",
-            "metrics": res.get("metrics", {}),
-            "coefficients": res.get("coefficients"),
-            "intercept": res.get("intercept"),
-            "predictions_preview": res.get("predictions_preview"),
-        }
+        source, filename = await datasets.resolve_dataset(file, dataset_id)
+        try:
+            names = json.loads(model_names)
+        except json.JSONDecodeError:
+            names = [name.strip() for name in model_names.split(",") if name.strip()]
+        registry.resolve_model_names(names)
+        cross_validation.check_cv(cv, cv_folds)
+        config = json.loads(network_config) if network_config else None
+
+        res = await executor.run_model(
+            comparison.compare_models, source, filename, target_column, names, config, cv=cv, cv_folds=cv_folds
+        )
+
+        if save and username:
+            saved = [
+                (r["model_type"], comparison.result_metrics(r), r.get("model_id"))
+                for r in res["results"].values() if "error" not in r
+            ]
+            await asyncio.to_thread(db.save_model_results, username, filename, target_column, saved)
+            res["saved"] = len(saved)
+        return res
     except Exception as e:
         return {"error": str(e)}
 
-@app.post("/random-forest")
-async def random_forest(file: UploadFile, target_column: str = Form(...)):
-    contents = await file.read()
+@app.post("/tune")
+async def tune_model(
+        file: UploadFile = File(None),
+        target_column: str = Form(...),
+        model_name: str = Form(..., alias="model"),
+        dataset_id: str = Form(None),
+        strategy: str = Form("random"),
+        space: str = Form(None),
+        n_trials: int = Form(20),
+        metric: str = Form(None),
+        network_config: str = Form(None, alias="model_config"),
+        engine: str = Form(None),
+        solver: str = Form(None),
+        username: str = Form(None),
+        background: bool = Form(False),
+):
+    """Hyperparameter search for one model: strategy is "grid", "random" or "halving".
+
+    `space` is JSON mapping parameter names to a list of values or a
+    {"low", "high", "log"} range; each model has a default space. The best
+    parameters are refitted and saved like a normal run. With background=true
+    a job ID is returned and /jobs/{job_id}/result shows the best-so-far while
+    the search runs. `metric` ranks the trials ("r2", "mse", "accuracy", ...);
+    one the model doesn't report for the target's task is a 400. engine picks
+    the boosting engine, and with it the default space; solver the SVM solver.
+    """
     try:
-        res = models.randomforest.process_random_forest(contents, file.filename, target_column)
-        if "error" in res:
-            return {"error": res["error"]}
-        return {
-            "model": res.get("model_type", "Bagging"),
-            "message": "Model executed successfully!",
-            "metrics": res.get("metrics", {}),
-            "parameters": res.get("parameters"),
-            "predictions_preview": res.get("predictions_preview"),
-        }
+        source, filename = await datasets.resolve_dataset(file, dataset_id)
+        name = registry.resolve_model_names([model_name])[0]
+        content_key = await asyncio.to_thread(data_utils.dataset_key, source, filename)
+        error = await asyncio.to_thread(dataset_profile.check_target, name, content_key, target_column)
+        if error is not None:
+            return {"error": error}
+        task = await asyncio.to_thread(dataset_profile.target_task, content_key, target_column)
+        try:
+            metric = tuning.resolve_metric(name, metric, task)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        search_space = json.loads(space) if space else None
+        if search_space is not None:
+            tuning.validate_space(search_space, strategy)
+        config = json.loads(network_config) if network_config else None
+        args = (source, filename, target_column, name, strategy, search_space, n_trials, metric, config, engine, solver)
+
+        if background:
+            job_id = await jobs.start_job(f"tune:{name}", tuning.tune_model, username, filename, target_column, *args)
+            return {"job_id": job_id, "status": "queued"}
+        return await executor.run_model(tuning.tune_model, *args)
+    except HTTPException:
+        raise
     except Exception as e:
         return {"error": str(e)}
 
-@app.post("/svm")
-async def support_vector_machines(file: UploadFile, target_column: str = Form(...)):
-    contents = await file.read()
+@app.post("/predict/{model_id}")
+async def predict(model_id: str, request: Request):
+    """Score new rows with a saved model.
+
+    Send either JSON ({"rows": [{"column": value, ...}, ...]}) or a CSV/Excel
+    file as multipart form field "file". Columns must match the training data.
+    """
     try:
-        res = models.svm.process_svm_model(contents, file.filename, target_column)
-        if "error" in res:
-            return {"error": res["error"]}
-        return {
-            "model": res.get("model_type", "Logistic Regression"),
-            "message": "Model executed successfully!",
-            "metrics": res.get("metrics", {}),
-            "coefficients": res.get("coefficients"),
-            "intercept": res.get("intercept"),
-            "predictions_preview": res.get("predictions_preview"),
-        }
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None:
+                return {"error": "Upload a file or send JSON rows"}
+            ext = upload.filename.split(".")[-1].lower()
+            df = await asyncio.to_thread(data_utils.parse_dataset, await upload.read(), ext)
+        else:
+            body = await request.json()
+            rows = body.get("rows") if isinstance(body, dict) else body
+            if not rows:
+                return {"error": "No rows to score"}
+            df = pd.DataFrame(rows)
+
+        res = await asyncio.to_thread(model_store.predict, model_id, df)
+        if res is None:
+            raise HTTPException(status_code=404, detail="Model not found")
+        return res
+    except HTTPException:
+        raise
     except Exception as e:
         return {"error": str(e)}
 
-@app.post("/deep-neural-network")
-async def deep_neural_network(file: UploadFile = File(...), request_data: str = Form(...)):
-    contents = await file.read()
-    print(f"Received file: {file.filename}")
-    print(request_data)
+# ------------------------------
+# Dataset registry
+# ------------------------------
+@app.post("/datasets")
+async def upload_dataset(file: UploadFile = File(...), username: str = Form(None)):
+    """Store a dataset once; model endpoints can then take its dataset_id instead of the file."""
     try:
-        data = json.loads(request_data)
-        target_column = data.get("target_column")
-        model_config = data.get("model_config")
-
-        res = models.deepnueralnetwork.process_deep_neural_network(
-            contents, file.filename, target_column, model_config
-        )
+        return await datasets.register_dataset(file, username)
+    except Exception as e:
+        return {"error": str(e)}
 
-        if "error" in res:
-            return {"error": res["error"]}
-        return res
+@app.post("/datasets/profile")
+async def profile_dataset(file: UploadFile = File(None), dataset_id: str = Form(None), sample_rows: int = Form(None)):
+    """Column types, null counts, cardinality, quantiles and the task type each
+    column implies as a target (regression or classification).
 
+    Distinct counts and quantiles use a sample of sample_rows rows on large
+    files. Profiles are cached by dataset content; once a dataset is profiled,
+    model runs with a missing target or the wrong model type for the target
+    are rejected before training starts.
+    """
+    try:
+        source, filename = await datasets.resolve_dataset(file, dataset_id)
+        sample_rows = sample_rows or dataset_profile.PROFILE_SAMPLE_ROWS
+        if sample_rows < 1:
+            return {"error": "sample_rows must be positive"}
+        content_key = await asyncio.to_thread(data_utils.dataset_key, source, filename)
+        profile = await asyncio.to_thread(dataset_profile.cached_profile, content_key, sample_rows)
+        if profile is None:
+            profile = await executor.run_model(dataset_profile.profile_dataset, source, filename, sample_rows)
+        return profile
     except Exception as e:
-        print(f"[ERROR] deep_neural_network: {e}")
         return {"error": str(e)}
 
-@app.post("/boosting")
-async def model_boosting(file: UploadFile, target_column: str = Form(...)):
-    contents = await file.read()
+@app.get("/datasets/{dataset_id}")
+def get_dataset(dataset_id: str):
+    dataset = db.get_dataset(dataset_id)
+    if dataset is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    return dataset
+
+@app.delete("/datasets/{dataset_id}")
+def delete_dataset(dataset_id: str):
+    if not datasets.delete_dataset(dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    return {"message": f"Dataset {dataset_id} deleted"}
+
+@app.get("/user-datasets/{username}")
+def user_datasets(username: str):
+    return {"datasets": db.get_user_datasets(username)}
+
+# ------------------------------
+# Background training jobs
+# ------------------------------
+@app.post("/jobs/{model_name}")
+async def create_training_job(
+        model_name: str,
+        file: UploadFile = File(None),
+        target_column: str = Form(None),
+        request_data: str = Form(None),
+        username: str = Form(None),
+        dataset_id: str = Form(None),
+        engine: str = Form(None),
+        solver: str = Form(None),
+        cv: str = Form(None),
+        cv_folds: int = Form(5),
+        stream: bool = Form(False),
+        chunk_rows: int = Form(None),
+        stream_epochs: int = Form(None),
+):
+    """Start training in the background and return a job ID right away.
+
+    Takes the same form fields as the matching model endpoint (request_data for
+    deep-neural-network, target_column for the rest) plus an optional username.
+    cv ("kfold" or "stratified") adds cross-validated metrics over cv_folds folds.
+    stream=true trains out of core, chunk_rows rows at a time (linear, logistic
+    and neural network models; best with a stored dataset_id).
+    """
     try:
-        res = models.boosting.process_boosting(contents, file.filename, target_column)
-        if "error" in res:
-            return {"error": res["error"]}
-        return {
-            "model": res.get("model_type", "Logistic Regression"),
-            "message": "Model executed successfully!",
-            "metrics": res.get("metrics", {}),
-            "coefficients": res.get("coefficients"),
-            "intercept": res.get("intercept"),
-            "predictions_preview": res.get("predictions_preview"),
-        }
+        source, filename = await datasets.resolve_dataset(file, dataset_id)
+        options = {"engine": engine, "solver": solver}
+        if request_data:
+            data = json.loads(request_data)
+            target_column = data.get("target_column")
+            options["model_config"] = data.get("model_config")
+        if not target_column:
+            return {"error": "target_column is required"}
+        cross_validation.check_cv(cv, cv_folds)
+        if stream:
+            streaming.check_streaming(model_name)
+
+        job_id = await jobs.submit_job(
+            model_name, username, filename, target_column,
+            source, filename, target_column, cv=cv, cv_folds=cv_folds,
+            stream=stream, chunk_rows=chunk_rows, stream_epochs=stream_epochs,
+            **registry.model_options(model_name, **options),
+        )
+        return {"job_id": job_id, "status": "queued"}
     except Exception as e:
         return {"error": str(e)}
 
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = jobs.get_job_status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    res = jobs.get_job_result(job_id)
+    if res is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return res
+
+@app.get("/jobs/{job_id}/events")
+def job_events(job_id: str):
+    """Stream a job's progress as Server-Sent Events until it finishes.
+
+    Per-epoch loss (deep-neural-network), per-stage progress (boosting,
+    random-forest) and best-so-far results (tune) arrive in the "partial"
+    field of "progress" events.
+    """
+    if db.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        jobs.job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    """Cancel a queued or running job; a running job stops at its next progress report."""
+    status = jobs.cancel_job(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if status not in ("cancelled", "cancelling"):
+        return {"error": f"Job already {status}"}
+    return {"job_id": job_id, "status": status}
+
+@app.get("/user-jobs/{username}")
+def user_jobs(username: str):
+    return {"jobs": db.get_user_jobs(username)}
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,94 +1,132 @@
 # models/boosting_model.py
+import os
 import numpy as np
-from sklearn.ensemble import GradientBoostingRegressor, GradientBoostingClassifier
-from sklearn.metrics import (
-    mean_squared_error,
-    mean_absolute_error,
-    r2_score,
-    accuracy_score,
-    precision_score,
-    recall_score,
-    f1_score,
-    confusion_matrix,
+from sklearn.ensemble import (
+    GradientBoostingRegressor,
+    GradientBoostingClassifier,
+    HistGradientBoostingRegressor,
+    HistGradientBoostingClassifier,
 )
-from app.utils.data_utils import load_dataset, prepare_features, train_test_split_data, parse_metrics
-
-
-def process_boosting(file: bytes, filename: str, target_column: str, metrics_list=None):
-    # --- Load and preprocess dataset ---
-    df = load_dataset(file, filename)
-    X_scaled, y, feature_names = prepare_features(df, target_column)
-
-    # --- Detect problem type ---
-    if np.issubdtype(y.dtype, np.number) and y.nunique() > 10:
-        problem_type = "regression"
-        model = GradientBoostingRegressor(
-            n_estimators=100,
-            learning_rate=0.1,
-            max_depth=3,
-            random_state=42
+from app.utils.jobs import in_job, report_progress
+
+# "exact": GradientBoosting* (single-threaded, exact splits, no missing values)
+# "hist": HistGradientBoosting* (binned features, multi-threaded, handles NaN,
+#         stops early once the validation score stops improving)
+ENGINES = ("exact", "hist")
+BOOSTING_ENGINE = os.getenv("BOOSTING_ENGINE", "exact")
+# In a job, the hist engine fits this many iterations per call (warm_start) and
+# reports progress in between; 0 fits in one call, which can't be cancelled midway
+HIST_STAGE_ITERATIONS = int(os.getenv("HIST_STAGE_ITERATIONS", 100))
+
+
+def resolve_engine(engine):
+    """The engine a run uses: the one asked for, else BOOSTING_ENGINE."""
+    return (engine or BOOSTING_ENGINE).lower()
+
+
+def _hist_model(problem_type):
+    estimator = HistGradientBoostingRegressor if problem_type == "regression" else HistGradientBoostingClassifier
+    return estimator(
+        max_iter=500,
+        early_stopping=True,
+        validation_fraction=0.1,
+        n_iter_no_change=10,
+    )
+
+
+def _exact_model(problem_type):
+    estimator = GradientBoostingRegressor if problem_type == "regression" else GradientBoostingClassifier
+    return estimator(n_estimators=100, max_depth=3)
+
+
+def _stage_monitor(n_stages):
+    """GradientBoosting monitor callback: report each finished stage and its training loss."""
+    def monitor(i, model, _locals):
+        train_loss = float(model.train_score_[i])
+        report_progress(
+            0.3 + 0.65 * (i + 1) / n_stages,
+            f"Stage {i + 1}/{n_stages} - train loss {train_loss:.4f}",
+            partial={"stage": i + 1, "stages": n_stages, "train_loss": train_loss},
         )
-        valid_metrics = {"mse", "mae", "r2"}
+        return False
+    return monitor
+
+
+def _fit_hist_in_stages(model, X_train, y_train):
+    """Grow a HistGradientBoosting model HIST_STAGE_ITERATIONS iterations at a time.
+
+    warm_start keeps the trees, the validation split and the early-stopping
+    scores between calls, so the model matches one fit up to float rounding;
+    the progress report after each call lets a cancelled job stop, like the
+    exact engine's monitor. Each call re-predicts the earlier trees, so this
+    costs time and only runs inside a job.
+    """
+    max_iter = model.max_iter
+    step = HIST_STAGE_ITERATIONS
+    model.set_params(warm_start=True)
+    try:
+        for stop in range(step, max_iter + step, step):
+            model.set_params(max_iter=min(stop, max_iter))
+            model.fit(X_train, y_train)
+            partial = {"iteration": model.n_iter_, "max_iter": max_iter}
+            message = f"Iteration {model.n_iter_}/{max_iter}"
+            if model.do_early_stopping_ and model.scoring == "loss":
+                partial["validation_loss"] = float(-model.validation_score_[-1])
+                message += f" - validation loss {partial['validation_loss']:.4f}"
+            report_progress(0.3 + 0.65 * model.n_iter_ / max_iter, message, partial=partial)
+            if model.n_iter_ < model.max_iter:
+                # Early stopping ended this call before its last iteration
+                break
+    finally:
+        model.set_params(warm_start=False, max_iter=max_iter)
+
+
+def check_input(X_scaled, problem_type, engine=None):
+    engine = resolve_engine(engine)
+    if engine not in ENGINES:
+        return f"Unknown boosting engine '{engine}'. Choose one of: {', '.join(ENGINES)}"
+    if engine == "exact" and np.isnan(X_scaled).any():
+        return "Dataset has missing values; use engine=hist, which handles them natively."
+    return None
+
+
+def build_estimator(problem_type, params, X_train, engine=None):
+    # params holds the registry defaults shared by both engines (learning_rate, random_state)
+    model = _hist_model(problem_type) if resolve_engine(engine) == "hist" else _exact_model(problem_type)
+    model.set_params(**params)
+    return model
+
+
+def fit_estimator(model, X_train, y_train, engine=None):
+    if resolve_engine(engine) == "exact":
+        model.fit(X_train, y_train, monitor=_stage_monitor(model.n_estimators))
+    elif in_job() and HIST_STAGE_ITERATIONS > 0:
+        _fit_hist_in_stages(model, X_train, y_train)
     else:
-        problem_type = "classification"
-        model = GradientBoostingClassifier(
-            n_estimators=100,
-            learning_rate=0.1,
-            max_depth=3,
-            random_state=42
-        )
-        valid_metrics = {"accuracy", "precision", "recall", "f1_score", "confusion_matrix"}
-        # Encode non-numeric labels if necessary
-        if not np.issubdtype(y.dtype, np.number):
-            from pandas import factorize
-            y = factorize(y)[0]
-
-    # --- Parse requested metrics ---
-    metrics_list = parse_metrics(metrics_list, valid_metrics)
-
-    # --- Train/test split ---
-    X_train, X_test, y_train, y_test = train_test_split_data(X_scaled, y)
-
-    # --- Train model ---
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
-
-    # --- Compute metrics ---
-    results = {}
-    if problem_type == "regression":
-        if "mse" in metrics_list:
-            results["mse"] = round(mean_squared_error(y_test, y_pred), 4)
-        if "mae" in metrics_list:
-            results["mae"] = round(mean_absolute_error(y_test, y_pred), 4)
-        if "r2" in metrics_list:
-            results["r2_score"] = round(r2_score(y_test, y_pred), 4)
+        model.fit(X_train, y_train)
+
+
+def describe(model, feature_names, problem_type, engine=None):
+    engine = resolve_engine(engine)
+    if engine == "hist":
+        parameters = {
+            "engine": engine,
+            "max_iter": model.max_iter,
+            "n_iter": model.n_iter_,
+            "learning_rate": model.learning_rate,
+            "max_leaf_nodes": model.max_leaf_nodes,
+            "early_stopping": model.early_stopping,
+            "random_state": 42,
+        }
+        # Impurity-based importances are only available from the exact engine
+        feature_importances = None
     else:
-        if "accuracy" in metrics_list:
-            results["accuracy"] = round(accuracy_score(y_test, y_pred), 4)
-        if "precision" in metrics_list:
-            results["precision"] = round(precision_score(y_test, y_pred, average="weighted", zero_division=0), 4)
-        if "recall" in metrics_list:
-            results["recall"] = round(recall_score(y_test, y_pred, average="weighted", zero_division=0), 4)
-        if "f1_score" in metrics_list:
-            results["f1_score"] = round(f1_score(y_test, y_pred, average="weighted", zero_division=0), 4)
-        if "confusion_matrix" in metrics_list:
-            results["confusion_matrix"] = confusion_matrix(y_test, y_pred).tolist()
-
-    # --- Feature importances ---
-    feature_importances = dict(zip(feature_names, np.round(model.feature_importances_, 4)))
-
-    # --- Return consistent response ---
-    return {
-        "model_type": "Boosting (Regression)" if problem_type == "regression" else "Boosting (Classification)",
-        "metrics": results,
-        "feature_importances": feature_importances,
-        "parameters": {
+        parameters = {
+            "engine": engine,
             "n_estimators": model.n_estimators,
             "learning_rate": model.learning_rate,
             "max_depth": model.max_depth,
             "random_state": 42,
-        },
-        "predictions_preview": [
-            {"actual": float(a), "predicted": float(p)} for a, p in zip(y_test[:10], y_pred[:10])
-        ],
-    }
+        }
+        feature_importances = dict(zip(feature_names, np.round(model.feature_importances_, 4)))
+    return {"feature_importances": feature_importances, "parameters": parameters}
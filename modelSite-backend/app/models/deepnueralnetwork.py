@@ -1,10 +1,13 @@
 # models/deep_neural_network_model.py
 import io
 import json
-import numpy as np
+import os
+import time
+from contextlib import contextmanager
 import torch
 import torch.nn as nn
 import torch.optim as optim
+from torch.utils.data import DataLoader, Sampler, TensorDataset
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import (
@@ -14,7 +17,33 @@ from sklearn.metrics import (
     f1_score,
     confusion_matrix,
 )
-from app.utils.data_utils import load_dataset, prepare_features, parse_metrics
+from app.utils import timing
+from app.utils.data_utils import parse_metrics, train_test_split_data
+from app.utils.jobs import report_progress
+
+# Intra-op threads for training; model_config["num_threads"] overrides it.
+# Unset leaves PyTorch's default (one per core).
+DNN_NUM_THREADS = int(os.getenv("DNN_NUM_THREADS", 0))
+# "none", "script" (TorchScript) or "compile" (torch.compile); model_config["compile"] overrides it
+DNN_COMPILE = os.getenv("DNN_COMPILE", "none")
+COMPILE_MODES = ("none", "script", "compile")
+LR_SCHEDULERS = ("none", "plateau", "step", "cosine")
+
+
+@contextmanager
+def _num_threads(num_threads):
+    """Run the block with num_threads intra-op threads (0 keeps the current count).
+
+    torch.set_num_threads is process-wide and pool workers are reused, so the
+    previous count is restored afterwards.
+    """
+    previous = torch.get_num_threads()
+    if num_threads > 0:
+        torch.set_num_threads(num_threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
 
 
 # ------------------------------
@@ -48,13 +77,150 @@ class CustomNet(nn.Module):
         return self.model(x)
 
 
+# ------------------------------
+# Training helpers
+# ------------------------------
+class _ShuffledBatches(Sampler):
+    """Index tensors for each batch, sliced from one random permutation per epoch."""
+
+    def __init__(self, n_rows, batch_size, shuffle=True, seed=42):
+        self.n_rows = n_rows
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.generator = torch.Generator().manual_seed(seed)
+
+    def __iter__(self):
+        if self.shuffle:
+            order = torch.randperm(self.n_rows, generator=self.generator)
+        else:
+            order = torch.arange(self.n_rows)
+        return iter(order.split(self.batch_size))
+
+    def __len__(self):
+        return (self.n_rows + self.batch_size - 1) // self.batch_size
+
+
+def _make_loader(X_train, y_train, batch_size, shuffle=True, seed=42):
+    """DataLoader over whole batches: each batch is a single tensor gather,
+    not batch_size __getitem__ calls plus a collate."""
+    dataset = TensorDataset(X_train, y_train)
+    sampler = _ShuffledBatches(len(dataset), batch_size, shuffle, seed)
+    return DataLoader(dataset, sampler=sampler, batch_size=None)
+
+
+def _compile_model(model, mode):
+    """Return the module to train with; parameters are shared with `model`."""
+    if mode == "script":
+        return torch.jit.script(model)
+    if mode == "compile":
+        return torch.compile(model)
+    return model
+
+
+def _make_scheduler(name, optimizer, epochs, config):
+    if name == "plateau":
+        # Halve the learning rate when the monitored loss stops improving
+        return optim.lr_scheduler.ReduceLROnPlateau(
+            optimizer, factor=config.get("lr_factor", 0.5), patience=config.get("lr_patience", 3)
+        )
+    if name == "step":
+        return optim.lr_scheduler.StepLR(
+            optimizer, step_size=config.get("lr_step_size", max(1, epochs // 3)), gamma=config.get("lr_factor", 0.1)
+        )
+    if name == "cosine":
+        return optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=max(1, epochs))
+    return None
+
+
+# ------------------------------
+# Streaming (out-of-core) training
+# ------------------------------
+class StreamingNet:
+    """CustomNet trained one chunk at a time for utils/streaming.py.
+
+    Each partial_fit call runs shuffled mini-batch updates over one chunk and
+    keeps the optimizer state between chunks, so the whole dataset never has
+    to be in memory. Classification is binary, like the in-memory network.
+    """
+
+    def __init__(self, problem_type, config):
+        self.problem_type = problem_type
+        self.layers_config = config.get("layers", [{"units": 32, "activation": "relu"}])
+        self.learning_rate = config.get("learning_rate", 0.001)
+        self.batch_size = config.get("batch_size", 16)
+        self.shuffle = config.get("shuffle", True)
+        self.num_threads = int(config.get("num_threads") or DNN_NUM_THREADS)
+        self.seed = int(config.get("seed", 42))
+        self.net = None
+        self.optimizer = None
+        self.n_updates = 0
+        self.loss_ = None
+
+    def partial_fit(self, X, y, classes=None):
+        X = torch.tensor(X, dtype=torch.float32)
+        y = torch.tensor(y, dtype=torch.float32).view(-1, 1)
+        with _num_threads(self.num_threads):
+            if self.net is None:
+                torch.manual_seed(self.seed)
+                self.net = CustomNet(X.shape[1], self.layers_config)
+                self.optimizer = optim.Adam(self.net.parameters(), lr=self.learning_rate)
+            criterion = nn.MSELoss() if self.problem_type == "regression" else nn.BCEWithLogitsLoss()
+
+            self.net.train()
+            chunk_loss = torch.zeros(())
+            # A new shuffle seed per chunk, still deterministic for the same data
+            for X_batch, y_batch in _make_loader(X, y, self.batch_size, self.shuffle, seed=self.seed + self.n_updates):
+                self.optimizer.zero_grad(set_to_none=True)
+                loss = criterion(self.net(X_batch), y_batch)
+                loss.backward()
+                self.optimizer.step()
+                chunk_loss += loss.detach() * len(X_batch)
+            self.n_updates += 1
+            self.loss_ = chunk_loss.item() / len(X)
+            return self
+
+    def predict(self, X):
+        self.net.eval()
+        with torch.no_grad():
+            out = self.net(torch.tensor(X, dtype=torch.float32)).numpy().flatten()
+        if self.problem_type == "classification":
+            return (out > 0).astype(int)
+        return out
+
+    def __getstate__(self):
+        # The optimizer is only needed while training; saved models keep the network
+        state = dict(self.__dict__)
+        state["optimizer"] = None
+        return state
+
+
+def build_streaming_estimator(problem_type, params, classes, model_config=None):
+    if isinstance(model_config, str):
+        try:
+            model_config = json.loads(model_config)
+        except json.JSONDecodeError:
+            raise ValueError("Invalid JSON for model_config")
+    if classes is not None and len(classes) > 2:
+        raise ValueError("The neural network supports binary classification only")
+    return StreamingNet(problem_type, {**(model_config or {}), **params})
+
+
 # ------------------------------
 # Model Processing Function
 # ------------------------------
-def process_deep_neural_network(file: bytes, filename: str, target_column: str, model_config, metrics_list=None):
-    df = load_dataset(file, filename)
-    X_scaled, y, feature_names = prepare_features(df, target_column)
+def train(X_scaled, y, feature_names, metrics_list=None, params=None, split=None, model_config=None):
+    """Pipeline entry point (see utils/registry.py); /tune params are merged into model_config."""
+    if params:
+        if isinstance(model_config, str):
+            try:
+                model_config = json.loads(model_config)
+            except json.JSONDecodeError:
+                return {"error": "Invalid JSON for model_config"}
+        model_config = {**(model_config or {}), **params}
+    return fit_deep_neural_network(X_scaled, y, feature_names, model_config, metrics_list, split)
+
 
+def fit_deep_neural_network(X_scaled, y, feature_names, model_config, metrics_list=None, split=None):
     # Accept either JSON string or already parsed dict
     if isinstance(model_config, str):
         try:
@@ -70,10 +236,33 @@ def process_deep_neural_network(file: bytes, filename: str, target_column: str,
     epochs = config.get("epochs", 50)
     batch_size = config.get("batch_size", 16)
     problem_type = config.get("problem_type", "regression").lower()
+    shuffle = config.get("shuffle", True)
+    # Seeds the weight initialisation and the shuffling, so the same inputs train the same network
+    seed = int(config.get("seed", 42))
+    num_threads = int(config.get("num_threads") or DNN_NUM_THREADS)
+    compile_mode = str(config.get("compile") or DNN_COMPILE).lower()
+    if compile_mode not in COMPILE_MODES:
+        return {"error": f"Unknown compile mode '{compile_mode}'. Choose one of: {', '.join(COMPILE_MODES)}"}
+    # Early stopping and scheduling, all off unless asked for
+    validation_split = float(config.get("validation_split", 0.0))
+    patience = config.get("patience")
+    min_delta = float(config.get("min_delta", 0.0))
+    lr_scheduler = str(config.get("lr_scheduler") or "none").lower()
+    if lr_scheduler not in LR_SCHEDULERS:
+        return {"error": f"Unknown lr_scheduler '{lr_scheduler}'. Choose one of: {', '.join(LR_SCHEDULERS)}"}
+    if not 0.0 <= validation_split < 1.0:
+        return {"error": "validation_split must be between 0 and 1"}
+    restore_best_weights = config.get("restore_best_weights", validation_split > 0 or patience is not None)
 
     metrics_list = parse_metrics(metrics_list, {"mse", "r2", "accuracy", "f1_score", "confusion_matrix"})
 
-    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+    X_train, X_test, y_train, y_test = train_test_split_data(X_scaled, y, split)
+    # The validation rows come out of the training rows; the test rows stay untouched
+    X_val = y_val = None
+    if validation_split > 0:
+        X_train, X_val, y_train, y_val = train_test_split(
+            X_train, y_train, test_size=validation_split, random_state=42
+        )
 
     # Convert to tensors
     X_train = torch.tensor(X_train, dtype=torch.float32)
@@ -81,61 +270,122 @@ def process_deep_neural_network(file: bytes, filename: str, target_column: str,
         y_train.values if hasattr(y_train, "values") else y_train,
         dtype=torch.float32,
     ).view(-1, 1)
+    if X_val is not None:
+        X_val = torch.tensor(X_val, dtype=torch.float32)
+        y_val = torch.tensor(
+            y_val.values if hasattr(y_val, "values") else y_val,
+            dtype=torch.float32,
+        ).view(-1, 1)
     X_test = torch.tensor(X_test, dtype=torch.float32)
     y_test_np = y_test.values if hasattr(y_test, "values") else y_test
 
-    # Build model
-    model = CustomNet(X_train.shape[1], layers_config)
-    print("\n Custom Neural Network Architecture:")
-    print(model, "\n")
+    with _num_threads(num_threads):
+        # Build model
+        fit_start = time.perf_counter()
+        torch.manual_seed(seed)
+        model = CustomNet(X_train.shape[1], layers_config)
+        print("\n Custom Neural Network Architecture:")
+        print(model, "\n")
+        # The eager model is what gets saved; a scripted/compiled wrapper can't be pickled
+        train_model = _compile_model(model, compile_mode)
 
-    criterion = nn.MSELoss() if problem_type == "regression" else nn.BCELoss()
-    optimizer = optim.Adam(model.parameters(), lr=learning_rate)
+        criterion = nn.MSELoss() if problem_type == "regression" else nn.BCELoss()
+        optimizer = optim.Adam(model.parameters(), lr=learning_rate)
+        scheduler = _make_scheduler(lr_scheduler, optimizer, epochs, config)
+        loader = _make_loader(X_train, y_train, batch_size, shuffle, seed)
 
+        epoch_losses = []  # ✅ record loss per epoch
+        # Early stopping watches the validation loss, or the training loss without a validation split
+        best_loss, best_epoch, best_state = float("inf"), 0, None
+        stopped_epoch = None
 
-    epoch_losses = []  # ✅ record loss per epoch
+        for epoch in range(epochs):
+            train_model.train()
+            # Summed on-device; read back once per epoch instead of syncing every batch
+            epoch_loss = torch.zeros(())
+            for X_batch, y_batch in loader:
+                optimizer.zero_grad(set_to_none=True)
+                outputs = train_model(X_batch)
+                loss = criterion(outputs, y_batch)
+                loss.backward()
+                optimizer.step()
 
-    model.train()
-    for epoch in range(epochs):
-        batch_losses = []
-        for i in range(0, len(X_train), batch_size):
-            X_batch = X_train[i : i + batch_size]
-            y_batch = y_train[i : i + batch_size]
+                epoch_loss += loss.detach() * len(X_batch)
 
-            optimizer.zero_grad()
-            outputs = model(X_batch)
-            loss = criterion(outputs, y_batch)
-            loss.backward()
-            optimizer.step()
+            avg_epoch_loss = epoch_loss.item() / len(X_train)
+            record = {"epoch": epoch + 1, "loss": avg_epoch_loss, "lr": optimizer.param_groups[0]["lr"]}
+            monitored = avg_epoch_loss
+            if X_val is not None:
+                train_model.eval()
+                with torch.no_grad():
+                    monitored = criterion(train_model(X_val), y_val).item()
+                record["val_loss"] = monitored
+            epoch_losses.append(record)
 
-            batch_losses.append(loss.item())
+            if monitored < best_loss - min_delta:
+                best_loss, best_epoch = monitored, epoch + 1
+                if restore_best_weights:
+                    # Checkpoint in memory; copied because the optimizer updates tensors in place
+                    best_state = {name: tensor.detach().clone() for name, tensor in model.state_dict().items()}
 
-        avg_epoch_loss = float(np.mean(batch_losses))
-        epoch_losses.append({"epoch": epoch + 1, "loss": avg_epoch_loss})
-        if epoch % max(1, epochs // 5) == 0:
-            print(f"Epoch [{epoch+1}/{epochs}] - Loss: {avg_epoch_loss:.4f}")
+            if isinstance(scheduler, optim.lr_scheduler.ReduceLROnPlateau):
+                scheduler.step(monitored)
+            elif scheduler is not None:
+                scheduler.step()
 
-    model.eval()
-    with torch.no_grad():
-        preds = model(X_test).numpy().flatten()
+            message = f"Epoch {epoch + 1}/{epochs} - loss {avg_epoch_loss:.4f}"
+            if "val_loss" in record:
+                message += f" - val_loss {record['val_loss']:.4f}"
+            report_progress(0.3 + 0.65 * (epoch + 1) / epochs, message, partial={**record, "epochs": epochs})
+            if epoch % max(1, epochs // 5) == 0:
+                print(f"Epoch [{epoch+1}/{epochs}] - Loss: {avg_epoch_loss:.4f}")
 
-    results = {}
-    if problem_type == "regression":
-        results["mse"] = round(mean_squared_error(y_test_np, preds), 4)
-        results["r2_score"] = round(r2_score(y_test_np, preds), 4)
-    else:
-        preds_binary = (preds > 0.5).astype(int)
-        results["accuracy"] = round(accuracy_score(y_test_np, preds_binary), 4)
-        results["f1_score"] = round(f1_score(y_test_np, preds_binary, average="weighted"), 4)
-        results["confusion_matrix"] = confusion_matrix(y_test_np, preds_binary).tolist()
+            if patience is not None and epoch + 1 - best_epoch >= int(patience):
+                stopped_epoch = epoch + 1
+                print(f"Early stopping at epoch {stopped_epoch}; best epoch was {best_epoch}")
+                break
+
+        if best_state is not None:
+            model.load_state_dict(best_state)
+        timing.add("fit", time.perf_counter() - fit_start)
+
+        with timing.phase("predict"):
+            model.eval()
+            with torch.no_grad():
+                preds = model(X_test).numpy().flatten()
+
+        results = {}
+        with timing.phase("metrics"):
+            if problem_type == "regression":
+                results["mse"] = round(mean_squared_error(y_test_np, preds), 4)
+                results["r2_score"] = round(r2_score(y_test_np, preds), 4)
+            else:
+                preds_binary = (preds > 0.5).astype(int)
+                results["accuracy"] = round(accuracy_score(y_test_np, preds_binary), 4)
+                results["f1_score"] = round(f1_score(y_test_np, preds_binary, average="weighted"), 4)
+                results["confusion_matrix"] = confusion_matrix(y_test_np, preds_binary).tolist()
+        threads_used = torch.get_num_threads()
 
     return {
         "model_type": "Custom Deep Neural Network",
         "config_used": config,
+        "training": {
+            "batch_size": batch_size,
+            "num_threads": threads_used,
+            "compile": compile_mode,
+            "epochs_run": len(epoch_losses),
+            "stopped_early": stopped_epoch is not None,
+            "best_epoch": best_epoch,
+            "best_loss": best_loss if best_epoch else None,
+            "monitor": "val_loss" if X_val is not None else "loss",
+            "restored_best_weights": best_state is not None,
+            "lr_scheduler": lr_scheduler,
+        },
         "metrics": results,
         "training_loss": epoch_losses,
         "predictions_preview": [
             {"actual": float(a), "predicted": float(p)}
             for a, p in zip(y_test_np[:10], preds[:10])
         ],
+        "_model": {"estimator": model, "kind": "torch", "problem_type": problem_type},
     }
@@ -1,36 +1,88 @@
 # models/svm_regression_model.py
+import os
 import numpy as np
-from sklearn.svm import SVR
-from sklearn.metrics import mean_squared_error, r2_score
-from app.utils.data_utils import load_dataset, prepare_features, train_test_split_data, parse_metrics
-
-
-def process_svm_model(file: bytes, filename: str, target_column: str, metrics_list=None):
-    df = load_dataset(file, filename)
-    X_scaled, y, _ = prepare_features(df, target_column)
-
-    if not np.issubdtype(y.dtype, np.number) or y.nunique() <= 10:
-        return {"error": "Target appears categorical — use SVM Classification model instead."}
-
-    valid_metrics = {"r2_score", "mse", "rmse"}
-    metrics_list = parse_metrics(metrics_list, valid_metrics)
-
-    X_train, X_test, y_train, y_test = train_test_split_data(X_scaled, y)
-    model = SVR(kernel="rbf", C=1.0, epsilon=0.1)
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
-
-    results = {}
-    if "r2_score" in metrics_list:
-        results["r2_score"] = round(r2_score(y_test, y_pred), 4)
-    if "mse" in metrics_list:
-        results["mse"] = round(mean_squared_error(y_test, y_pred), 4)
-    if "rmse" in metrics_list:
-        results["rmse"] = round(np.sqrt(mean_squared_error(y_test, y_pred)), 4)
-
-    return {
-        "model_type": "SVM Regression",
-        "parameters": {"kernel": "rbf", "C": 1.0, "epsilon": 0.1, "scaler": "StandardScaler"},
-        "metrics": results,
-        "predictions_preview": [{"actual": float(a), "predicted": float(p)} for a, p in zip(y_test[:10], y_pred[:10])]
-    }
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.pipeline import Pipeline
+from sklearn.svm import SVR, LinearSVR
+from sklearn.utils.sparsefuncs import mean_variance_axis
+
+# Kernel SVR is quadratic-to-cubic in rows; above this many training rows the RBF kernel
+# is approximated with an explicit feature map and fitted with a linear SVR
+SVM_KERNEL_APPROX_ROWS = int(os.getenv("SVM_KERNEL_APPROX_ROWS", 20000))
+# "nystroem" or "rbf_sampler" (random Fourier features)
+SVM_KERNEL_APPROX = os.getenv("SVM_KERNEL_APPROX", "nystroem")
+SVM_APPROX_COMPONENTS = int(os.getenv("SVM_APPROX_COMPONENTS", 500))
+SOLVERS = ("auto", "exact", "approx")
+
+
+def _scale_gamma(X_train):
+    """SVR's gamma="scale", 1 / (n_features * X.var()).
+
+    Sparse features are scaled without centering, so their column offsets would
+    inflate X.var(); average the per-column variances instead, which the RBF
+    kernel doesn't depend on either.
+    """
+    if hasattr(X_train, "toarray"):
+        _, variances = mean_variance_axis(X_train.astype(np.float64), axis=0)
+        variance = variances.mean()
+    else:
+        variance = X_train.var()
+    return 1.0 / (X_train.shape[1] * variance)
+
+
+def _approx_model(X_train, params):
+    """RBF feature map + LinearSVR, taking the same C/epsilon/gamma as SVR."""
+    gamma = params["gamma"]
+    # Same meaning as SVR's gamma="scale"/"auto"
+    if gamma == "scale":
+        gamma = _scale_gamma(X_train)
+    elif gamma == "auto":
+        gamma = 1.0 / X_train.shape[1]
+
+    n_components = min(SVM_APPROX_COMPONENTS, X_train.shape[0])
+    if SVM_KERNEL_APPROX == "rbf_sampler":
+        feature_map = RBFSampler(gamma=gamma, n_components=n_components, random_state=42)
+    else:
+        feature_map = Nystroem(kernel="rbf", gamma=gamma, n_components=n_components, random_state=42)
+    svr = LinearSVR(C=params["C"], epsilon=params["epsilon"], dual=True, max_iter=5000, random_state=42)
+    return Pipeline([("features", feature_map), ("svr", svr)])
+
+
+def _solver(solver, X_train):
+    solver = solver or "auto"
+    if solver == "auto":
+        return "approx" if X_train.shape[0] > SVM_KERNEL_APPROX_ROWS else "exact"
+    return solver
+
+
+def check_input(X_scaled, problem_type, solver=None):
+    if solver is not None and solver not in SOLVERS:
+        return f"Unknown SVM solver '{solver}'. Choose one of: {', '.join(SOLVERS)}"
+    return None
+
+
+def build_estimator(problem_type, params, X_train, solver=None):
+    if _solver(solver, X_train) == "approx":
+        return _approx_model(X_train, params)
+    if params["gamma"] == "scale" and hasattr(X_train, "toarray"):
+        params = {**params, "gamma": _scale_gamma(X_train)}
+    return SVR(kernel="rbf", **params)
+
+
+def describe(model, feature_names, problem_type, solver=None):
+    if isinstance(model, Pipeline):
+        feature_map, svr = model.named_steps["features"], model.named_steps["svr"]
+        parameters = {
+            "kernel": "rbf",
+            "solver": f"{type(feature_map).__name__} + LinearSVR",
+            "n_components": feature_map.n_components,
+            "C": svr.C,
+            "epsilon": svr.epsilon,
+            "gamma": round(float(feature_map.gamma), 6),
+            "scaler": "StandardScaler",
+        }
+    else:
+        gamma = model.gamma if isinstance(model.gamma, str) else round(float(model.gamma), 6)
+        parameters = {"kernel": model.kernel, "solver": "SVR", "C": model.C, "epsilon": model.epsilon,
+                      "gamma": gamma, "scaler": "StandardScaler"}
+    return {"parameters": parameters}
@@ -0,0 +1,138 @@
+# utils/cache.py
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import joblib
+
+
+class LRUCache:
+    """Small thread-safe LRU cache bounded by entry count and total size in bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._total -= self._sizes.pop(key)
+                del self._data[key]
+            self._data[key] = value
+            self._sizes[key] = size
+            self._total += size
+            while len(self._data) > self.max_entries or self._total > self.max_bytes:
+                old_key, _ = self._data.popitem(last=False)
+                self._total -= self._sizes.pop(old_key)
+
+    def pop(self, key):
+        with self._lock:
+            if key in self._data:
+                self._total -= self._sizes.pop(key)
+                return self._data.pop(key)
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._total = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._data),
+            "bytes": self._total,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+class DiskCache:
+    """Directory of joblib files shared by all worker processes.
+
+    Entries are evicted oldest-access-first once the directory grows past
+    max_bytes. Writes go to a temp file and are renamed into place, so a
+    reader never sees a half-written entry.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str):
+        return os.path.join(self.directory, f"{key}.joblib")
+
+    def get(self, key: str, default=None):
+        path = self._path(key)
+        try:
+            value = joblib.load(path)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            # Corrupt or incompatible entry, drop it
+            self.delete(key)
+            return default
+        now = time.time()
+        os.utime(path, (now, now))
+        return value
+
+    def put(self, key: str, value):
+        if self.max_bytes <= 0:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}.tmp")
+        joblib.dump(value, tmp_path)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".joblib"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,139 @@
+# utils/columnar.py
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Rows parsed per chunk while converting an upload to Parquet
+PARQUET_CHUNK_ROWS = int(os.getenv("PARQUET_CHUNK_ROWS", 100_000))
+# Allow lossy float64 -> float32 downcasting (off by default so metrics don't change)
+DATASET_FLOAT32 = os.getenv("DATASET_FLOAT32", "0") == "1"
+
+_INT_TYPES = [(np.int8, pa.int8()), (np.int16, pa.int16()), (np.int32, pa.int32()), (np.int64, pa.int64())]
+
+
+def _iter_raw_chunks(path: str, ext: str, dtype=None):
+    if ext in ("csv", "txt"):
+        delimiter = "\t" if ext == "txt" else ","
+        yield from pd.read_csv(path, delimiter=delimiter, chunksize=PARQUET_CHUNK_ROWS, dtype=dtype)
+    elif ext in ("xls", "xlsx"):
+        # Excel readers can't stream, so the sheet is read in one go
+        yield pd.read_excel(path, dtype=dtype)
+    else:
+        raise ValueError(f"Unsupported file format: {ext}")
+
+
+class _ColumnStats:
+    def __init__(self):
+        self.kind = None
+        self.min = None
+        self.max = None
+        self.float32_exact = True
+
+    def update(self, col: pd.Series):
+        if pd.api.types.is_bool_dtype(col):
+            kind = "bool"
+        elif pd.api.types.is_integer_dtype(col):
+            kind = "int"
+        elif pd.api.types.is_float_dtype(col):
+            kind = "float"
+        elif col.isna().all():
+            # An all-empty chunk tells us nothing about the column type
+            return
+        else:
+            kind = "string"
+        self.kind = _merge_kinds(self.kind, kind)
+
+        if kind in ("int", "float"):
+            values = col.dropna().to_numpy()
+            if len(values):
+                self.min = values.min() if self.min is None else min(self.min, values.min())
+                self.max = values.max() if self.max is None else max(self.max, values.max())
+            # Int chunks are checked too: the column becomes float if a later
+            # chunk holds floats, and ints past 2**24 don't survive float32
+            if self.float32_exact and len(values):
+                values = values.astype(np.float64)
+                as32 = values.astype(np.float32)
+                self.float32_exact = bool(np.isfinite(as32).all() and np.array_equal(as32.astype(np.float64), values))
+
+    def plan(self):
+        """Return (pandas dtype, arrow type) for this column."""
+        if self.kind == "bool":
+            return "bool", pa.bool_()
+        if self.kind == "int":
+            for np_type, pa_type in _INT_TYPES:
+                info = np.iinfo(np_type)
+                if self.min is None or (info.min <= self.min and self.max <= info.max):
+                    return np_type, pa_type
+            return np.float64, pa.float64()
+        if self.kind == "float":
+            if self.float32_exact or DATASET_FLOAT32:
+                return np.float32, pa.float32()
+            return np.float64, pa.float64()
+        return str, pa.string()
+
+
+def _merge_kinds(current, new):
+    if current is None or current == new:
+        return new
+    if {current, new} == {"int", "float"}:
+        return "float"
+    # bool mixed with numbers, or anything mixed with text, is stored as text
+    return "string"
+
+
+def convert_to_parquet(raw_path: str, ext: str, parquet_path: str):
+    """Convert an uploaded CSV/TXT/Excel file to Parquet with the smallest lossless dtypes.
+
+    Runs in two streaming passes over the file (type inference, then writing),
+    so only one chunk of rows is in memory at a time. Returns dataset info.
+    """
+    stats = {}
+    for chunk in _iter_raw_chunks(raw_path, ext):
+        for col in chunk.columns:
+            stats.setdefault(col, _ColumnStats()).update(chunk[col])
+
+    plan = {col: column_stats.plan() for col, column_stats in stats.items()}
+    string_columns = {col: str for col, (dtype, _) in plan.items() if dtype is str}
+    schema = pa.schema([(str(col), pa_type) for col, (_, pa_type) in plan.items()])
+
+    tmp_path = f"{parquet_path}.{uuid.uuid4().hex}.tmp"
+    writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+    try:
+        for chunk in _iter_raw_chunks(raw_path, ext, dtype=string_columns or None):
+            for col, (dtype, _) in plan.items():
+                if dtype is not str and dtype != "bool" and chunk[col].dtype != dtype:
+                    chunk[col] = chunk[col].astype(dtype)
+            chunk.columns = [str(col) for col in chunk.columns]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        writer.close()
+    os.replace(tmp_path, parquet_path)
+
+    return parquet_info(parquet_path)
+
+
+def parquet_info(parquet_path: str):
+    """Row count and schema read from the Parquet footer, without loading any data."""
+    parquet_file = pq.ParquetFile(parquet_path)
+    dtypes = parquet_file.schema_arrow.empty_table().to_pandas().dtypes
+    return {
+        "n_rows": int(parquet_file.metadata.num_rows),
+        "n_columns": len(dtypes),
+        "schema": {str(col): str(dtype) for col, dtype in dtypes.items()},
+    }
+
+
+def read_parquet(parquet_path: str) -> pd.DataFrame:
+    """Load a stored dataset, memory-mapping the file."""
+    return pd.read_parquet(parquet_path, memory_map=True)
+
+
+def iter_parquet(parquet_path: str, batch_rows: int, columns=None):
+    """Yield a stored dataset as DataFrames of at most batch_rows rows."""
+    parquet_file = pq.ParquetFile(parquet_path)
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+        yield batch.to_pandas()
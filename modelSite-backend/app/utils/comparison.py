@@ -0,0 +1,105 @@
+# utils/comparison.py
+import os
+import time
+
+from joblib import delayed
+
+from app.utils import executor, timing
+from app.utils.cross_validation import check_cv, fold_tasks, get_folds, summarize_folds
+from app.utils.data_utils import load_dataset, prepare_features
+from app.utils.jobs import report_progress
+from app.utils.model_store import persist_model
+from app.utils.pipeline import fit_model
+from app.utils.registry import model_options, resolve_model_names
+
+# Max models fitted at the same time, defaults to the worker's share of cores (executor.WORKER_CPUS)
+COMPARE_JOBS = int(os.getenv("COMPARE_JOBS", executor.WORKER_CPUS))
+
+
+def _fit_one(model_name, X_scaled, y, feature_names, model_config=None, metrics_list=None):
+    options = model_options(model_name, model_config=model_config)
+    start = time.perf_counter()
+    timings = None
+    try:
+        res, timings = timing.timed_call(fit_model, model_name, X_scaled, y, feature_names, metrics_list, **options)
+    except Exception as e:
+        res = {"error": str(e)}
+    res["fit_seconds"] = round(time.perf_counter() - start, 3)
+    return model_name, None, res, timings
+
+
+def result_metrics(res):
+    """The metrics shown and saved for one result: the fold mean (plus <metric>_std) under cross-validation."""
+    summary = res.get("cross_validation")
+    if summary is None:
+        return res.get("metrics", {})
+    return {**summary["mean"], **{f"{name}_std": value for name, value in summary["std"].items()}}
+
+
+def compare_models(file, filename: str, target_column: str, model_names, model_config=None, metrics_list=None,
+                   cv=None, cv_folds=5):
+    """Train several models on one parse of the dataset.
+
+    Features are prepared once and every model uses the same deterministic
+    train/test split (train_test_split_data with random_state=42), so the
+    metrics are directly comparable. With cv, every model is also scored on the
+    same cached folds and the table shows the fold mean and std instead. Models
+    (and folds) are fitted in parallel processes.
+    """
+    cv = check_cv(cv, cv_folds)
+    model_names = resolve_model_names(model_names)
+    timing.label(model="compare")
+    df = load_dataset(file, filename)
+    X_scaled, y, feature_names, preprocessor = prepare_features(df, target_column, return_preprocessor=True)
+
+    tasks = [
+        delayed(_fit_one)(name, X_scaled, y, feature_names, model_config, metrics_list)
+        for name in model_names
+    ]
+    if cv is not None:
+        folds = get_folds(y, cv, cv_folds, df.attrs.get("content_hash"), target_column)
+        for name in model_names:
+            options = model_options(name, model_config=model_config)
+            tasks += fold_tasks(name, X_scaled, y, feature_names, folds, metrics_list, options=options)
+
+    results, fold_rows = {}, {name: [] for name in model_names}
+    parallel = executor.nested_parallel(max(1, min(len(tasks), COMPARE_JOBS)))
+    for done, (model_name, fold, res, timings) in enumerate(parallel(tasks), 1):
+        # Fits run in joblib workers; their phase timings come back with the result
+        timing.merge(timings)
+        if fold is None:
+            results[model_name] = persist_model(res, preprocessor, feature_names, target_column)
+        else:
+            fold_rows[model_name].append(res)
+        report_progress(0.3 + 0.65 * done / len(tasks), f"Finished {done}/{len(tasks)} fits", force=True)
+    if cv is not None:
+        for model_name, res in results.items():
+            if "error" not in res:
+                res["cross_validation"] = summarize_folds(cv, fold_rows[model_name])
+                if "error" in res["cross_validation"]:
+                    res["error"] = res["cross_validation"]["error"]
+
+    table = []
+    for model_name in model_names:
+        res = results[model_name]
+        row = {
+            "model": model_name,
+            "model_type": res.get("model_type"),
+            "model_id": res.get("model_id"),
+            "fit_seconds": res["fit_seconds"],
+        }
+        if "error" in res:
+            row["error"] = res["error"]
+        else:
+            row.update(result_metrics(res))
+        table.append(row)
+
+    return {
+        "dataset_name": filename,
+        "target_column": target_column,
+        "n_rows": int(X_scaled.shape[0]),
+        "n_features": int(X_scaled.shape[1]),
+        "cv": {"strategy": cv, "n_folds": int(cv_folds)} if cv is not None else None,
+        "table": table,
+        "results": {name: results[name] for name in model_names},
+    }
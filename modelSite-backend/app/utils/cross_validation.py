@@ -0,0 +1,130 @@
+# utils/cross_validation.py
+import hashlib
+import os
+import time
+
+import numpy as np
+from joblib import delayed
+
+from app.utils import executor, timing
+from app.utils.cache import LRUCache
+from app.utils.data_utils import disk_cache
+from app.utils.jobs import progress_muted, report_progress
+from app.utils.pipeline import detect_problem_type, fit_model
+
+# Max folds fitted at the same time, defaults to the worker's share of cores (executor.WORKER_CPUS)
+CV_JOBS = int(os.getenv("CV_JOBS", executor.WORKER_CPUS))
+CV_STRATEGIES = ("kfold", "stratified")
+CV_MAX_FOLDS = 20
+# Bump when the layout of cached fold indices changes
+FOLDS_CACHE_VERSION = 1
+
+# Fold indices are keyed by dataset hash, target, strategy and fold count, so
+# every model in a comparison (and every later run) is scored on the same folds
+fold_cache = LRUCache(32, 64 * 1024 * 1024, sizeof=lambda folds: sum(a.nbytes + b.nbytes for a, b in folds))
+
+
+def check_cv(cv, n_folds):
+    """Validate the cv form fields; returns the strategy, or None when cross-validation is off."""
+    if cv in (None, "", "none"):
+        return None
+    cv = str(cv).lower()
+    if cv not in CV_STRATEGIES:
+        raise ValueError(f"Unknown cv strategy '{cv}'. Choose one of: {', '.join(CV_STRATEGIES)}")
+    if not 2 <= int(n_folds) <= CV_MAX_FOLDS:
+        raise ValueError(f"cv_folds must be between 2 and {CV_MAX_FOLDS}")
+    return cv
+
+
+def _folds_key(content_hash: str, target_column: str, cv: str, n_folds: int):
+    target_hash = hashlib.sha256(target_column.encode("utf-8")).hexdigest()[:16]
+    return f"folds-{content_hash}-{target_hash}-{cv}-{n_folds}-v{FOLDS_CACHE_VERSION}"
+
+
+def _make_folds(y, cv: str, n_folds: int):
+    from sklearn.model_selection import KFold, StratifiedKFold
+
+    if cv == "stratified":
+        if detect_problem_type(y) != "classification":
+            raise ValueError("Stratified folds need a classification target; use cv=kfold for regression")
+        splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42)
+    else:
+        splitter = KFold(n_splits=n_folds, shuffle=True, random_state=42)
+    # Row positions into the prepared features; int32 keeps cached folds small
+    return [
+        (train.astype(np.int32), test.astype(np.int32))
+        for train, test in splitter.split(np.zeros(len(y)), np.asarray(y))
+    ]
+
+
+def get_folds(y, cv: str, n_folds: int, content_hash: str = None, target_column: str = None):
+    """The (train_rows, test_rows) pairs for this dataset and target, cached like prepared features."""
+    if content_hash is None:
+        return _make_folds(y, cv, n_folds)
+
+    key = _folds_key(content_hash, target_column, cv, n_folds)
+    folds = fold_cache.get(key)
+    if folds is None:
+        folds = disk_cache.get(key)
+        if folds is None:
+            folds = _make_folds(y, cv, n_folds)
+            disk_cache.put(key, folds)
+        fold_cache.put(key, folds)
+    return folds
+
+
+# ------------------------------
+# Fold fitting
+# ------------------------------
+def fit_fold(model_name, fold, X_scaled, y, feature_names, split, metrics_list=None, params=None, options=None):
+    """Fit and score one model on one fold. Returns (model_name, fold, result, phase timings)."""
+    start = time.perf_counter()
+    timings = None
+    try:
+        with progress_muted():
+            res, timings = timing.timed_call(fit_model, model_name, X_scaled, y, feature_names, metrics_list, params,
+                                             split=split, **(options or {}))
+    except Exception as e:
+        res = {"error": str(e)}
+    res.pop("_model", None)
+    row = {"fold": fold + 1, "test_rows": int(len(split[1])), "fit_seconds": round(time.perf_counter() - start, 3)}
+    if "error" in res:
+        row["error"] = res["error"]
+    else:
+        row["metrics"] = res["metrics"]
+    return model_name, fold, row, timings
+
+
+def fold_tasks(model_name, X_scaled, y, feature_names, folds, metrics_list=None, params=None, options=None):
+    return [
+        delayed(fit_fold)(model_name, fold, X_scaled, y, feature_names, split, metrics_list, params, options)
+        for fold, split in enumerate(folds)
+    ]
+
+
+def summarize_folds(cv: str, fold_rows):
+    """Per-fold metrics plus their mean and standard deviation (scalar metrics only)."""
+    fold_rows = sorted(fold_rows, key=lambda row: row["fold"])
+    summary = {"strategy": cv, "n_folds": len(fold_rows), "folds": fold_rows}
+    errors = [row for row in fold_rows if "error" in row]
+    if errors:
+        summary["error"] = f"Fold {errors[0]['fold']}: {errors[0]['error']}"
+        return summary
+
+    names = [name for name, value in fold_rows[0]["metrics"].items() if not isinstance(value, list)]
+    values = {name: np.array([row["metrics"][name] for row in fold_rows], dtype=float) for name in names}
+    summary["mean"] = {name: round(float(v.mean()), 4) for name, v in values.items()}
+    summary["std"] = {name: round(float(v.std()), 4) for name, v in values.items()}
+    return summary
+
+
+def cross_validate(model_name, X_scaled, y, feature_names, folds, cv: str, metrics_list=None, params=None, **options):
+    """Score one model on every fold, fitting the folds in parallel processes."""
+    rows = []
+    tasks = fold_tasks(model_name, X_scaled, y, feature_names, folds, metrics_list, params, options)
+    n_jobs = max(1, min(len(folds), CV_JOBS))
+    for _, _, row, timings in executor.nested_parallel(n_jobs)(tasks):
+        timing.merge(timings)
+        rows.append(row)
+        report_progress(0.3 + 0.6 * len(rows) / len(folds), f"Finished fold {len(rows)}/{len(folds)}", force=True)
+    return summarize_folds(cv, rows)
@@ -1,12 +1,82 @@
 import io
+import os
+import hashlib
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
 import json
+from app.utils import timing
+from app.utils.cache import LRUCache, DiskCache
+from app.utils.columnar import iter_parquet, read_parquet
+from app.utils.jobs import report_progress
 
-def load_dataset(file: bytes, filename: str) -> pd.DataFrame:
-    ext = filename.split(".")[-1].lower()
+# ------------------------------
+# Parsed dataset cache
+# ------------------------------
+# Parsed frames and prepared features are keyed by the SHA-256 of the uploaded
+# bytes, so running several models on the same file parses it only once. Each
+# worker keeps a small in-memory LRU; the disk tier is shared between workers.
+DATASET_CACHE_ENTRIES = int(os.getenv("DATASET_CACHE_ENTRIES", 8))
+DATASET_CACHE_MB = int(os.getenv("DATASET_CACHE_MB", 512))
+DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", "app/cache/datasets")
+DATASET_CACHE_DISK_MB = int(os.getenv("DATASET_CACHE_DISK_MB", 2048))
+
+
+def _frame_size(df: pd.DataFrame):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _features_size(prepared):
+    X_scaled, y, _, _ = prepared
+    if hasattr(X_scaled, "indptr"):
+        nbytes = X_scaled.data.nbytes + X_scaled.indices.nbytes + X_scaled.indptr.nbytes
+    else:
+        nbytes = X_scaled.nbytes
+    return int(nbytes + y.memory_usage(deep=True))
+
+
+dataset_cache = LRUCache(DATASET_CACHE_ENTRIES, DATASET_CACHE_MB * 1024 * 1024, sizeof=_frame_size)
+features_cache = LRUCache(DATASET_CACHE_ENTRIES, DATASET_CACHE_MB * 1024 * 1024, sizeof=_features_size)
+disk_cache = DiskCache(DATASET_CACHE_DIR, DATASET_CACHE_DISK_MB * 1024 * 1024)
+
+
+def hash_dataset(file: bytes) -> str:
+    return hashlib.sha256(file).hexdigest()
+
+
+def dataset_key(file, filename: str) -> str:
+    """Content key of a dataset: what load_dataset caches it under and puts in df.attrs["content_hash"]."""
+    if isinstance(file, str) and file.endswith(".parquet"):
+        # Stored datasets are named by content hash, so the file name is the key
+        return f"{os.path.basename(file)[:-len('.parquet')]}-parquet"
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            file = f.read()
+    return f"{hash_dataset(file)}-{filename.split('.')[-1].lower()}"
+
+
+# Bump when the layout of cached prepared features changes
+FEATURES_CACHE_VERSION = 3
+
+# ------------------------------
+# Feature preparation
+# ------------------------------
+# "dense": float64 array, every column scaled (what all models take)
+# "sparse": CSR float32 matrix; one-hot columns stay sparse and numeric columns
+#           are scaled without centering so zeros stay zeros
+# "auto": sparse once one-hot encoding would add more than FEATURE_SPARSE_MIN_COLUMNS columns
+FEATURE_MODE = os.getenv("FEATURE_MODE", "auto").lower()
+FEATURE_MODES = ("auto", "dense", "sparse")
+FEATURE_SPARSE_MIN_COLUMNS = int(os.getenv("FEATURE_SPARSE_MIN_COLUMNS", 200))
+# One-hot columns kept per categorical column; rarer values share one "infrequent" column
+FEATURE_MAX_CATEGORIES = int(os.getenv("FEATURE_MAX_CATEGORIES", 100))
+
+
+def _features_key(content_hash: str, target_column: str, mode: str):
+    target_hash = hashlib.sha256(target_column.encode("utf-8")).hexdigest()[:16]
+    return f"{content_hash}-{target_hash}-{mode}-v{FEATURES_CACHE_VERSION}"
+
+
+def parse_dataset(file: bytes, ext: str) -> pd.DataFrame:
     if ext == "csv":
         return pd.read_csv(io.BytesIO(file))
     elif ext in ["xls", "xlsx"]:
@@ -17,22 +87,192 @@ def load_dataset(file: bytes, filename: str) -> pd.DataFrame:
         raise ValueError(f"Unsupported file format: {ext}")
 
 
-def prepare_features(df: pd.DataFrame, target_column: str):
+def iter_dataset_chunks(file, filename: str, chunk_rows: int):
+    """Yield the dataset as DataFrames of at most chunk_rows rows, for training that
+    mustn't hold the whole file in memory. Stored Parquet datasets are read one
+    batch at a time; Excel files can't be streamed and come back as one chunk."""
+    if isinstance(file, str) and file.endswith(".parquet"):
+        yield from iter_parquet(file, chunk_rows)
+        return
+    ext = filename.split(".")[-1].lower()
+    source = io.BytesIO(file) if isinstance(file, (bytes, bytearray)) else file
+    if ext in ("csv", "txt"):
+        yield from pd.read_csv(source, delimiter="\t" if ext == "txt" else ",", chunksize=chunk_rows)
+    elif ext in ("xls", "xlsx"):
+        yield pd.read_excel(source)
+    else:
+        raise ValueError(f"Unsupported file format: {ext}")
+
+
+@timing.phase("load")
+def load_dataset(file, filename: str) -> pd.DataFrame:
+    """Parse an uploaded file.
+
+    `file` is either the raw bytes or the path of a stored dataset. Stored
+    Parquet datasets are memory-mapped.
+    """
+    report_progress(0.05, "Loading dataset", force=True)
+    if isinstance(file, str) and file.endswith(".parquet"):
+        return _load_parquet(file)
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            file = f.read()
+    ext = filename.split(".")[-1].lower()
+    key = dataset_key(file, filename)
+
+    df = dataset_cache.get(key)
+    if df is None:
+        df = disk_cache.get(key)
+        if df is None:
+            df = parse_dataset(file, ext)
+            disk_cache.put(key, df)
+        df.attrs["content_hash"] = key
+        dataset_cache.put(key, df)
+    return df
+
+
+def _load_parquet(path: str) -> pd.DataFrame:
+    key = dataset_key(path, path)
+    df = dataset_cache.get(key)
+    if df is None:
+        df = read_parquet(path)
+        df.attrs["content_hash"] = key
+        dataset_cache.put(key, df)
+    return df
+
+
+def describe_dataset(file, filename: str):
+    """Row count, column count and column dtypes for the dataset registry."""
+    df = load_dataset(file, filename)
+    return {
+        "n_rows": int(len(df)),
+        "n_columns": int(len(df.columns)),
+        "schema": {str(col): str(dtype) for col, dtype in df.dtypes.items()},
+    }
+
+
+@timing.phase("prepare")
+def prepare_features(df: pd.DataFrame, target_column: str, return_preprocessor: bool = False, mode: str = None):
+    """Return (X_scaled, y, feature_names), plus the fitted preprocessor if return_preprocessor is set.
+
+    The preprocessor turns raw rows (the dataset's columns) into model input,
+    so it is saved with the model and reused by /predict.
+    """
     if target_column not in df.columns:
         raise ValueError(f"Target column '{target_column}' not found in dataset.")
+    mode = (mode or FEATURE_MODE).lower()
+    if mode not in FEATURE_MODES:
+        raise ValueError(f"Unknown feature mode '{mode}'. Choose one of: {', '.join(FEATURE_MODES)}")
+    report_progress(0.2, "Preparing features", force=True)
+    timing.label(rows=len(df))
+
+    content_hash = df.attrs.get("content_hash")
+    if content_hash is not None:
+        key = _features_key(content_hash, target_column, mode)
+        prepared = features_cache.get(key)
+        if prepared is None:
+            prepared = disk_cache.get(key)
+            if prepared is None:
+                prepared = _prepare_features(df, target_column, mode)
+                disk_cache.put(key, prepared)
+            features_cache.put(key, prepared)
+    else:
+        prepared = _prepare_features(df, target_column, mode)
+
+    return prepared if return_preprocessor else prepared[:3]
+
+
+def feature_frame(X: pd.DataFrame, numeric, categorical, dtype):
+    """The feature columns with the dtypes the encoders expect; runs at training and predict time.
+
+    Numeric columns can arrive as object (e.g. JSON nulls in /predict rows), so
+    they are coerced; bool columns become 0/1.
+    """
+    columns = {col: pd.to_numeric(X[col], errors="coerce").astype(dtype) for col in numeric}
+    columns.update({col: X[col].astype(object) for col in categorical})
+    return pd.DataFrame(columns, index=X.index)
+
 
+def _frame_columns(transformer, input_features):
+    return np.asarray([*transformer.kw_args["numeric"], *transformer.kw_args["categorical"]], dtype=object)
+
+
+def feature_columns(X: pd.DataFrame):
+    """Split feature columns into (numeric, categorical); datetime columns are left out."""
+    numeric = [col for col in X.columns if pd.api.types.is_numeric_dtype(X[col])]
+    categorical = [
+        col for col in X.columns
+        if col not in numeric and not pd.api.types.is_datetime64_any_dtype(X[col])
+    ]
+    if not numeric and not categorical:
+        raise ValueError("No valid numeric features found.")
+    return numeric, categorical
+
+
+def build_preprocessor(numeric, categorical, sparse: bool = False, categories=None):
+    """Unfitted raw rows -> model input pipeline.
+
+    `categories` fixes the one-hot columns (one list per categorical column),
+    e.g. when they were counted over a stream of chunks; values outside them
+    are then encoded as all zeros.
+    """
+    # scikit-learn is imported on first use; the API process never needs it
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, StandardScaler
+
+    # Stored datasets may hold downcast columns; dense features are float64 so
+    # metrics match raw uploads, sparse ones float32 to halve their size
+    dtype = np.float32 if sparse else np.float64
+
+    transformers = []
+    if numeric:
+        transformers.append(("numeric", StandardScaler(with_mean=not sparse), numeric))
+    if categorical:
+        if categories is None:
+            encoder = OneHotEncoder(
+                handle_unknown="infrequent_if_exist",
+                max_categories=FEATURE_MAX_CATEGORIES,
+                sparse_output=sparse,
+                dtype=dtype,
+            )
+        else:
+            encoder = OneHotEncoder(categories=categories, handle_unknown="ignore", sparse_output=sparse, dtype=dtype)
+        transformers.append(("categorical", encoder, categorical))
+    return Pipeline([
+        ("frame", FunctionTransformer(
+            feature_frame,
+            kw_args={"numeric": numeric, "categorical": categorical, "dtype": dtype},
+            feature_names_out=_frame_columns,
+        )),
+        ("encode", ColumnTransformer(
+            transformers,
+            sparse_threshold=1.0 if sparse else 0.0,
+            verbose_feature_names_out=False,
+        )),
+    ])
+
+
+def _prepare_features(df: pd.DataFrame, target_column: str, mode: str):
     df = df.dropna(subset=[target_column])
     X = df.drop(columns=[target_column])
     y = df[target_column]
 
-    X = pd.get_dummies(X, drop_first=True).select_dtypes(include=[np.number])
-    if X.empty:
-        raise ValueError("No valid numeric features found.")
+    numeric, categorical = feature_columns(X)
+    if mode == "auto":
+        one_hot_columns = sum(min(X[col].nunique(dropna=False), FEATURE_MAX_CATEGORIES) for col in categorical)
+        mode = "sparse" if one_hot_columns > FEATURE_SPARSE_MIN_COLUMNS else "dense"
+    sparse = mode == "sparse"
+    preprocessor = build_preprocessor(numeric, categorical, sparse)
 
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    X_scaled = preprocessor.fit_transform(X)
+    if sparse:
+        X_scaled = X_scaled.tocsr().astype(np.float32)
+    else:
+        # Cached arrays are shared between runs, so guard them against in-place edits
+        X_scaled.flags.writeable = False
 
-    return X_scaled, y, X.columns
+    return X_scaled, y, list(preprocessor.get_feature_names_out()), preprocessor
 
 def parse_metrics(metrics_list, valid_metrics):
     if isinstance(metrics_list, str):
@@ -46,5 +286,14 @@ def parse_metrics(metrics_list, valid_metrics):
     return [m for m in metrics_list if m in valid_metrics] or list(valid_metrics)
 
 
-def train_test_split_data(X_scaled, y):
+@timing.phase("split")
+def train_test_split_data(X_scaled, y, split=None):
+    """The default 80/20 split, or the (train_rows, test_rows) positions in `split`, e.g. one CV fold."""
+    from sklearn.model_selection import train_test_split
+
+    report_progress(0.3, "Training model", force=True)
+    if split is not None:
+        train_rows, test_rows = split
+        take = (lambda rows: y.iloc[rows]) if hasattr(y, "iloc") else (lambda rows: y[rows])
+        return X_scaled[train_rows], X_scaled[test_rows], take(train_rows), take(test_rows)
     return train_test_split(X_scaled, y, test_size=0.2, random_state=42)
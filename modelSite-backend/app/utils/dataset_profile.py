@@ -0,0 +1,307 @@
+# utils/dataset_profile.py
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.utils import timing
+from app.utils.cache import LRUCache
+from app.utils.data_utils import FEATURE_MAX_CATEGORIES, dataset_cache, dataset_key, disk_cache, iter_dataset_chunks
+from app.utils.jobs import report_progress
+from app.utils.pipeline import WRONG_TASK_ERRORS
+from app.utils.registry import get_spec
+
+# ------------------------------
+# Configuration
+# ------------------------------
+# Quantiles, top values and distinct counts above TARGET_MAX_CLASSES come from a
+# seeded sample of this many rows; counts, min/max and mean/std use every row
+PROFILE_SAMPLE_ROWS = int(os.getenv("PROFILE_SAMPLE_ROWS", 100_000))
+# Rows read at a time while profiling; with the sample, this bounds memory use
+PROFILE_CHUNK_ROWS = int(os.getenv("PROFILE_CHUNK_ROWS", 100_000))
+PROFILE_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Most frequent values listed for each categorical column
+PROFILE_TOP_VALUES = 5
+# Columns with more nulls than this share get a "mostly_null" warning
+PROFILE_NULL_WARNING = 0.5
+# Same threshold as pipeline.detect_problem_type
+TARGET_MAX_CLASSES = 10
+# Bump when the layout of cached profiles changes
+PROFILE_CACHE_VERSION = 2
+
+# Profiles are keyed by the dataset's content key, so the API can check a
+# model/target choice against a profile computed earlier by any worker
+profile_cache = LRUCache(64, 16 * 1024 * 1024, sizeof=lambda profile: len(json.dumps(profile)))
+
+
+def _profile_key(content_key: str, sample_rows: int):
+    return f"profile-{content_key}-{sample_rows}-v{PROFILE_CACHE_VERSION}"
+
+
+def _latest_key(content_key: str):
+    # Points at the most recent profile of a dataset, whatever its sample size
+    return f"profile-{content_key}-latest-v{PROFILE_CACHE_VERSION}"
+
+
+def _number(value):
+    """A JSON-safe float: numpy scalars become floats, NaN and infinities None."""
+    if value is None or pd.isna(value):
+        return None
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def _kind(series: pd.Series):
+    if pd.api.types.is_bool_dtype(series):
+        return "boolean"
+    if pd.api.types.is_numeric_dtype(series):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+    return "categorical"
+
+
+# ------------------------------
+# Worker side
+# ------------------------------
+class _ProfileScan:
+    """Column statistics collected one chunk at a time, so profiling never holds
+    more than a chunk plus the sample in memory.
+
+    Row and null counts, min/max, mean/std (merged per chunk) and distinct
+    values up to the class threshold are exact. The sample is a uniform random
+    one: every row gets a seeded random key and the sample_rows smallest keys win.
+    """
+
+    def __init__(self, sample_rows: int):
+        self.sample_rows = sample_rows
+        self.rng = np.random.default_rng(42)
+        self.columns = None
+        self.n_rows = 0
+        self.nulls = None
+        self.kinds = {}
+        self.dtypes = {}
+        self.moments = {}
+        # Distinct non-null values per column until there are more than TARGET_MAX_CLASSES (then None)
+        self.values = {}
+        self.sample = None
+        self.sample_keys = None
+
+    def update(self, chunk: pd.DataFrame):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self.nulls = pd.Series(0, index=chunk.columns)
+            self.values = {col: set() for col in chunk.columns}
+        self.n_rows += len(chunk)
+        self.nulls += chunk.isna().sum()
+        for col in chunk.columns:
+            self.kinds.setdefault(col, set()).add(_kind(chunk[col]))
+            self.dtypes.setdefault(col, set()).add(str(chunk[col].dtype))
+
+        numeric = [col for col in chunk.columns if _kind(chunk[col]) == "numeric"]
+        if numeric:
+            stats = chunk[numeric].agg(["count", "mean", "var", "min", "max"])
+            for col in numeric:
+                self._merge_moments(col, stats[col])
+
+        for col in chunk.columns:
+            if self.values[col] is not None:
+                self.values[col].update(chunk[col].dropna().unique().tolist())
+                if len(self.values[col]) > TARGET_MAX_CLASSES:
+                    self.values[col] = None
+        self._update_sample(chunk)
+
+    def _merge_moments(self, col, stats):
+        # Chan et al.'s pairwise update of count, mean and sum of squared deviations
+        n_b = stats["count"]
+        if not n_b:
+            return
+        m2_b = stats["var"] * (n_b - 1) if n_b > 1 else 0.0
+        current = self.moments.get(col)
+        if current is None:
+            self.moments[col] = {"n": n_b, "mean": stats["mean"], "m2": m2_b, "min": stats["min"], "max": stats["max"]}
+            return
+        n = current["n"] + n_b
+        delta = stats["mean"] - current["mean"]
+        current["m2"] += m2_b + delta ** 2 * current["n"] * n_b / n
+        current["mean"] += delta * n_b / n
+        current["n"] = n
+        current["min"] = min(current["min"], stats["min"])
+        current["max"] = max(current["max"], stats["max"])
+
+    def _update_sample(self, chunk):
+        keys = self.rng.random(len(chunk))
+        if self.sample is not None and len(self.sample) >= self.sample_rows:
+            # Only rows that beat the current sample's largest key can get in
+            keep = keys < self.sample_keys.max()
+            chunk, keys = chunk[keep], keys[keep]
+            if chunk.empty:
+                return
+        if self.sample is not None:
+            chunk = pd.concat([self.sample, chunk], ignore_index=True)
+            keys = np.concatenate([self.sample_keys, keys])
+        if len(chunk) > self.sample_rows:
+            keep = np.sort(np.argpartition(keys, self.sample_rows)[:self.sample_rows])
+            chunk, keys = chunk.iloc[keep].reset_index(drop=True), keys[keep]
+        self.sample, self.sample_keys = chunk, keys
+
+    def kind(self, col):
+        # Chunks can disagree (a column that only has text further down):
+        # like one full read, anything mixed is categorical
+        kinds = self.kinds[col]
+        return next(iter(kinds)) if len(kinds) == 1 else "categorical"
+
+    def dtype(self, col):
+        dtypes = self.dtypes[col]
+        if len(dtypes) == 1:
+            return next(iter(dtypes))
+        return "float64" if self.kind(col) == "numeric" else "object"
+
+    def profile(self):
+        n_rows, sample = self.n_rows, self.sample
+        columns = []
+        if sample is not None:
+            # One vectorized call per statistic over all columns of the sample
+            unique = sample.nunique()
+            sample_values = sample.count()
+            numeric = [col for col in self.columns if self.kind(col) == "numeric"]
+            quantiles = sample[numeric].astype(float).quantile(list(PROFILE_QUANTILES)) if numeric else None
+
+        for col in self.columns:
+            kind = self.kind(col)
+            nulls = int(self.nulls[col])
+            exact_values = self.values[col]
+            column = {
+                "name": str(col),
+                "dtype": self.dtype(col),
+                "kind": kind,
+                "nulls": nulls,
+                "null_fraction": round(nulls / n_rows, 4) if n_rows else 0.0,
+                # Up to the class threshold the count is exact; above it, it comes from the sample
+                "unique": len(exact_values) if exact_values is not None else max(int(unique[col]), TARGET_MAX_CLASSES + 1),
+                "unique_exact": exact_values is not None,
+                # detect_problem_type on the non-null target values
+                "task": None if nulls == n_rows else (
+                    "regression" if kind == "numeric" and exact_values is None else "classification"
+                ),
+            }
+            moments = self.moments.get(col)
+            if kind == "numeric" and moments is not None:
+                column.update({
+                    "min": _number(moments["min"]),
+                    "max": _number(moments["max"]),
+                    "mean": _number(moments["mean"]),
+                    "std": _number(math.sqrt(moments["m2"] / (moments["n"] - 1))) if moments["n"] > 1 else None,
+                    "quantiles": {str(q): _number(quantiles.at[q, col]) for q in PROFILE_QUANTILES},
+                })
+            elif kind in ("categorical", "boolean") and sample is not None:
+                top = sample[col].value_counts().head(PROFILE_TOP_VALUES)
+                column["top_values"] = [{"value": str(value), "count": int(count)} for value, count in top.items()]
+
+            warnings = []
+            if column["task"] is None:
+                warnings.append("empty")
+            else:
+                if column["unique"] <= 1:
+                    warnings.append("constant")
+                if nulls / n_rows > PROFILE_NULL_WARNING:
+                    warnings.append("mostly_null")
+            if kind == "categorical" and column["unique"] > FEATURE_MAX_CATEGORIES:
+                # One-hot encoding keeps FEATURE_MAX_CATEGORIES columns; the rest share one
+                warnings.append("high_cardinality")
+            if kind == "categorical" and exact_values is None and unique[col] == sample_values[col]:
+                # Every value distinct, e.g. an ID or free text: useless as a feature
+                warnings.append("identifier")
+            column["warnings"] = warnings
+            columns.append(column)
+
+        return {
+            "n_rows": n_rows,
+            "n_columns": len(self.columns or []),
+            "sampled": n_rows > self.sample_rows,
+            "sample_rows": len(sample) if sample is not None else 0,
+            "columns": columns,
+        }
+
+
+@timing.phase("profile")
+def profile_dataset(file, filename: str, sample_rows: int = None):
+    """Column types, null counts, cardinality, quantiles and the task each column
+    implies as a target, for one dataset. Cached by content, like prepared features.
+
+    The file is read PROFILE_CHUNK_ROWS rows at a time (stored Parquet datasets
+    batch by batch), unless this worker already holds it parsed in memory.
+    """
+    sample_rows = sample_rows or PROFILE_SAMPLE_ROWS
+    content_key = dataset_key(file, filename)
+    key = _profile_key(content_key, sample_rows)
+
+    cache_hit = True
+    profile = profile_cache.get(key)
+    if profile is None:
+        profile = disk_cache.get(key)
+        if profile is None:
+            cache_hit = False
+            report_progress(0.05, "Profiling dataset", force=True)
+            df = dataset_cache.get(content_key)
+            chunks = [df] if df is not None else iter_dataset_chunks(file, filename, PROFILE_CHUNK_ROWS)
+            scan = _ProfileScan(sample_rows)
+            for chunk in chunks:
+                scan.update(chunk)
+            timing.label(rows=scan.n_rows)
+            profile = scan.profile()
+            disk_cache.put(key, profile)
+            disk_cache.put(_latest_key(content_key), profile)
+        profile_cache.put(key, profile)
+    return {**profile, "cache_hit": cache_hit}
+
+
+# ------------------------------
+# API side
+# ------------------------------
+def cached_profile(content_key: str, sample_rows: int = None):
+    """The stored profile of a dataset, or None if it was never profiled.
+
+    Without sample_rows, the most recent profile of the dataset is returned.
+    """
+    key = _profile_key(content_key, sample_rows) if sample_rows else _latest_key(content_key)
+    profile = profile_cache.get(key)
+    if profile is None:
+        profile = disk_cache.get(key)
+        if profile is None:
+            return None
+        profile_cache.put(key, profile)
+    return {**profile, "cache_hit": True}
+
+
+def target_task(content_key: str, target_column: str):
+    """The task the dataset's cached profile detected for target_column, or None if unknown."""
+    profile = cached_profile(content_key)
+    if profile is None:
+        return None
+    return next((c["task"] for c in profile["columns"] if c["name"] == target_column), None)
+
+
+def check_target(model_name: str, content_key: str, target_column: str):
+    """Reject a model/target choice the dataset's profile already rules out.
+
+    Returns the error the training run would end with (the same message), or
+    None when the choice looks valid or the dataset hasn't been profiled.
+    Reads the cache only, so a run never waits for a profile.
+    """
+    profile = cached_profile(content_key)
+    if profile is None:
+        return None
+    columns = {column["name"]: column for column in profile["columns"]}
+    column = columns.get(target_column)
+    if column is None:
+        return f"Target column '{target_column}' not found in dataset."
+    if column["task"] is None:
+        return f"Target column '{target_column}' has no values."
+    if not any(c["kind"] != "datetime" for name, c in columns.items() if name != target_column):
+        return "No valid numeric features found."
+    if column["task"] not in get_spec(model_name).tasks:
+        return WRONG_TASK_ERRORS[column["task"]]
+    return None
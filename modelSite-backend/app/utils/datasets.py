@@ -0,0 +1,94 @@
+# utils/datasets.py
+import asyncio
+import hashlib
+import os
+import uuid
+
+import app.database.DB as db
+import app.utils.executor as executor
+from app.utils.columnar import convert_to_parquet, parquet_info
+
+# Uploaded files are converted once to Parquet and stored here, named by the
+# hash of the original upload so identical uploads share a single file
+DATASET_STORAGE_DIR = os.getenv("DATASET_STORAGE_DIR", "app/storage/datasets")
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", 1024 * 1024))
+SUPPORTED_EXTENSIONS = {"csv", "txt", "xls", "xlsx"}
+
+
+def ingest_dataset(raw_path: str, ext: str, parquet_path: str):
+    """Worker side: convert the raw upload to Parquet (unless already stored) and drop the raw file."""
+    try:
+        if os.path.exists(parquet_path):
+            return parquet_info(parquet_path)
+        return convert_to_parquet(raw_path, ext, parquet_path)
+    finally:
+        os.remove(raw_path)
+
+
+async def register_dataset(file, username: str = None):
+    """Stream an UploadFile to disk in chunks, convert it to Parquet and record it."""
+    filename = file.filename
+    ext = filename.split(".")[-1].lower()
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported file format: {ext}")
+
+    os.makedirs(DATASET_STORAGE_DIR, exist_ok=True)
+    raw_path = os.path.join(DATASET_STORAGE_DIR, f".upload-{uuid.uuid4().hex}.{ext}")
+    hasher = hashlib.sha256()
+    size_bytes = 0
+    try:
+        with open(raw_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                hasher.update(chunk)
+                size_bytes += len(chunk)
+                await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        os.remove(raw_path)
+        raise
+
+    content_hash = hasher.hexdigest()
+    parquet_path = os.path.join(DATASET_STORAGE_DIR, f"{content_hash}.parquet")
+    # Parsing and conversion happen in the worker pool
+    try:
+        info = await executor.run_model(ingest_dataset, raw_path, ext, parquet_path)
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+
+    dataset_id = uuid.uuid4().hex
+    await asyncio.to_thread(
+        db.save_dataset,
+        dataset_id, username, filename, parquet_path, content_hash, size_bytes,
+        info["n_rows"], info["n_columns"], info["schema"],
+    )
+    return await asyncio.to_thread(db.get_dataset, dataset_id)
+
+
+async def resolve_dataset(file, dataset_id: str = None):
+    """Return (source, filename) for a model run.
+
+    `source` is the uploaded bytes, or the stored file path when a registered
+    dataset_id is given, so the worker reads it from disk instead of the
+    request carrying the whole file again.
+    """
+    if dataset_id:
+        dataset = await asyncio.to_thread(db.get_dataset, dataset_id)
+        if dataset is None:
+            raise ValueError(f"Dataset '{dataset_id}' not found")
+        return dataset["path"], dataset["filename"]
+    if file is None:
+        raise ValueError("Upload a file or pass a dataset_id")
+    return await file.read(), file.filename
+
+
+def delete_dataset(dataset_id: str):
+    dataset = db.get_dataset(dataset_id)
+    if dataset is None:
+        return False
+    remaining = db.delete_dataset(dataset_id)
+    if remaining == 0:
+        try:
+            os.remove(dataset["path"])
+        except FileNotFoundError:
+            pass
+    return True
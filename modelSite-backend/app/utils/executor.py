@@ -0,0 +1,129 @@
+# utils/executor.py
+import asyncio
+import functools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from joblib import Parallel, parallel_config
+
+from app.utils import profiling, timing
+
+# ------------------------------
+# Configuration (environment variables)
+# ------------------------------
+# MODEL_EXECUTOR     "process" (default) or "thread"
+# MODEL_WORKERS      number of training workers, defaults to the CPU count
+# MODEL_QUEUE_LIMIT  max jobs running or waiting before new ones are rejected
+# MODEL_START_METHOD multiprocessing start method for process workers
+EXECUTOR_KIND = os.getenv("MODEL_EXECUTOR", "process").lower()
+MAX_WORKERS = max(1, int(os.getenv("MODEL_WORKERS", os.cpu_count() or 1)))
+# Cores each training worker gets with every worker busy: the default fan-out of
+# CV folds, /compare models and /tune trials, and the threads random forest and
+# bagging use, so a full pool doesn't start more threads than there are cores
+WORKER_CPUS = max(1, (os.cpu_count() or 1) // MAX_WORKERS)
+QUEUE_LIMIT = max(1, int(os.getenv("MODEL_QUEUE_LIMIT", MAX_WORKERS * 4)))
+START_METHOD = os.getenv("MODEL_START_METHOD", "spawn")
+
+_executor = None
+_pending = 0
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the training queue already holds QUEUE_LIMIT jobs."""
+
+
+def get_executor():
+    """Create the worker pool on first use."""
+    global _executor
+    if _executor is None:
+        if EXECUTOR_KIND == "thread":
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="model-worker")
+        else:
+            _executor = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS,
+                mp_context=multiprocessing.get_context(START_METHOD),
+            )
+    return _executor
+
+
+def queue_status():
+    return {
+        "executor": EXECUTOR_KIND,
+        "workers": MAX_WORKERS,
+        "queue_limit": QUEUE_LIMIT,
+        "pending": _pending,
+    }
+
+
+def _call_in_worker(func, *args, **kwargs):
+    # Estimators left at n_jobs=None (random forest, bagging) use the worker's share of cores
+    with parallel_config(backend="threading", n_jobs=WORKER_CPUS):
+        return func(*args, **kwargs)
+
+
+def nested_parallel(n_jobs):
+    """joblib Parallel for fits fanned out inside a training worker (CV folds,
+    /compare models, /tune trials), yielding results as they finish.
+
+    Its processes get one BLAS/OpenMP thread each and run estimators with
+    n_jobs=1, so n_jobs processes use about n_jobs cores.
+    """
+    return Parallel(n_jobs=n_jobs, backend="loky", inner_max_num_threads=1, return_as="generator_unordered")
+
+
+def submit(func, *args, **kwargs):
+    """Queue a blocking model function on the worker pool and return an asyncio future.
+
+    Raises QueueFullError straight away when too many jobs are in flight, so
+    callers can reject the request before doing any other work.
+    """
+    global _pending
+    if _pending >= QUEUE_LIMIT:
+        raise QueueFullError(f"Server is busy ({_pending} models queued). Please try again shortly.")
+
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_executor(), functools.partial(_call_in_worker, func, *args, **kwargs))
+    _pending += 1
+    future.add_done_callback(_job_finished)
+    return future
+
+
+def _job_finished(future):
+    global _executor, _pending
+    _pending -= 1
+    if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+        # A worker died (e.g. out of memory); start a fresh pool for the next job
+        _executor = None
+
+
+async def run_model(func, *args, **kwargs):
+    """Run a blocking model function in the worker pool and await its result.
+
+    The event loop stays free while the model trains, so other requests are
+    served normally. Raises QueueFullError when too many jobs are in flight.
+    The worker's phase timings are added to the request's, along with the time
+    the call spent waiting for a free worker ("queue"). When the request asked
+    for profiling, the worker runs func under the profiler (utils/profiling.py).
+    """
+    mode = profiling.requested_mode()
+    if mode is not None:
+        func, args = profiling.profiled_call, (mode, func, *args)
+    start = time.perf_counter()
+    try:
+        res, timings = await submit(timing.timed_call, func, *args, **kwargs)
+    except BrokenProcessPool:
+        raise RuntimeError("Model worker crashed while training. Please try again with a smaller dataset.")
+    timing.add("queue", max(0.0, time.perf_counter() - start - timings["seconds"]))
+    timing.merge(timings)
+    profiling.note(res)
+    return res
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
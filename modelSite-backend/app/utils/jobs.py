@@ -0,0 +1,260 @@
+# utils/jobs.py
+import asyncio
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+import numpy as np
+
+import app.database.DB as db
+import app.utils.executor as executor
+from app.utils import profiling, timing
+from app.utils.registry import get_spec
+
+# Minimum gap between two progress writes from the same job
+PROGRESS_INTERVAL = 0.5
+# How often /jobs/{id}/events checks the job for changes, and how long it can
+# stay quiet before sending a keep-alive comment
+EVENTS_POLL_INTERVAL = float(os.getenv("JOB_EVENTS_POLL_INTERVAL", 0.5))
+EVENTS_KEEPALIVE = 15
+FINISHED_STATUSES = ("done", "failed", "cancelled")
+
+_current_job = ContextVar("current_job", default=None)
+_last_report = {}
+
+# Keeps references to running asyncio tasks so they are not garbage collected
+_tasks = set()
+
+
+class JobCancelled(Exception):
+    """Raised by report_progress inside a worker once the job has been cancelled."""
+
+
+def _to_jsonable(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# ------------------------------
+# Worker side
+# ------------------------------
+def report_progress(progress: float, message: str = None, force: bool = False, partial: dict = None):
+    """Record progress (0-1) for the job running in this worker. No-op outside a job.
+
+    `partial` is an intermediate result (e.g. best-so-far of a search, or the
+    latest epoch's loss) that /jobs/{id}/result and /jobs/{id}/events return
+    while the job is still running. Raises JobCancelled once the job has been
+    cancelled, so training stops at the next progress report.
+    """
+    job_id = _current_job.get()
+    if job_id is None:
+        return
+
+    now = time.monotonic()
+    if not force and now - _last_report.get(job_id, 0) < PROGRESS_INTERVAL:
+        return
+    _last_report[job_id] = now
+
+    fields = {"progress": round(min(max(progress, 0.0), 1.0), 4)}
+    if message is not None:
+        fields["message"] = message
+    if partial is not None:
+        fields["result"] = json.dumps(partial, default=_to_jsonable)
+    db.update_job(job_id, **fields)
+    if db.is_job_cancel_requested(job_id):
+        raise JobCancelled()
+
+
+def in_job():
+    """Whether report_progress reaches a job here, i.e. the run can be watched and cancelled."""
+    return _current_job.get() is not None
+
+
+@contextmanager
+def progress_muted():
+    """Ignore report_progress calls made inside the block, e.g. by sub-fits of a larger job."""
+    token = _current_job.set(None)
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+def run_job(job_id: str, func, *args, **kwargs):
+    """Executed inside a pool worker: runs the model and stores the outcome in the jobs table.
+
+    Returns the run's phase timings (None if it didn't finish) for the /metrics histograms.
+    """
+    if not db.mark_job_running(job_id):
+        return None  # cancelled while it was queued
+    token = _current_job.set(job_id)
+    timings = None
+    try:
+        res, timings = timing.timed_call(func, *args, **kwargs)
+        if "error" in res:
+            db.update_job(job_id, status="failed", error=res["error"], finished_at=datetime.now())
+        else:
+            db.update_job(
+                job_id,
+                status="done",
+                progress=1.0,
+                message="Finished",
+                result=json.dumps(res, default=_to_jsonable),
+                finished_at=datetime.now(),
+            )
+    except JobCancelled:
+        db.update_job(job_id, status="cancelled", error="Cancelled by user", message="Cancelled",
+                      result=None, finished_at=datetime.now())
+    except Exception as e:
+        db.update_job(job_id, status="failed", error=str(e), finished_at=datetime.now())
+    finally:
+        _current_job.reset(token)
+        _last_report.pop(job_id, None)
+    return timings
+
+
+# ------------------------------
+# API side
+# ------------------------------
+async def submit_job(model_name: str, username: str, dataset_name: str, target_column: str, *args, **kwargs):
+    """Create a job row and start training in the background. Returns the job ID.
+
+    The job keeps running even if the client disconnects; its result is stored
+    in the database and can be fetched later by ID. A run found in the result
+    cache becomes a job that is already done; one the dataset's cached profile
+    rules out raises ValueError before a job is created.
+    """
+    # Imported here: the pipeline and the result cache import data_utils, which imports this module
+    from app.utils.pipeline import run_pipeline
+    from app.utils.result_cache import cached_call, lookup, prepare_run
+
+    model_name = get_spec(model_name).name
+    key, error = await asyncio.to_thread(prepare_run, model_name, *args, **kwargs)
+    if error is not None:
+        raise ValueError(error)
+    cached = await asyncio.to_thread(lookup, key) if profiling.requested_mode() is None else None
+    if cached is not None:
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(db.create_job, job_id, username, model_name, dataset_name, target_column)
+        await asyncio.to_thread(
+            db.update_job, job_id, status="done", progress=1.0, message="Finished (cached result)",
+            result=json.dumps(cached, default=_to_jsonable), started_at=datetime.now(), finished_at=datetime.now(),
+        )
+        return job_id
+    return await start_job(model_name, cached_call, username, dataset_name, target_column,
+                           key, run_pipeline, model_name, *args, **kwargs)
+
+
+async def start_job(job_type: str, func, username: str, dataset_name: str, target_column: str, *args, **kwargs):
+    """Run any worker function as a background job, e.g. a hyperparameter search.
+
+    If the request asked for profiling, the job's result links the saved profile.
+    """
+    job_id = uuid.uuid4().hex
+    mode = profiling.requested_mode()
+    if mode is not None:
+        func, args = profiling.profiled_call, (mode, func, *args)
+    await asyncio.to_thread(db.create_job, job_id, username, job_type, dataset_name, target_column)
+    try:
+        future = executor.submit(run_job, job_id, func, *args, **kwargs)
+    except Exception as e:
+        await asyncio.to_thread(db.update_job, job_id, status="failed", error=str(e), finished_at=datetime.now())
+        raise
+
+    task = asyncio.ensure_future(_watch(job_id, future))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job_id
+
+
+async def _watch(job_id: str, future):
+    # run_job records its own outcome; only worker crashes and cancellations land here
+    try:
+        timings = await future
+    except Exception as e:
+        await asyncio.to_thread(
+            db.update_job, job_id, status="failed", error=str(e) or type(e).__name__, finished_at=datetime.now()
+        )
+        return
+    if timings:
+        timing.observe(timings)
+
+
+def get_job_status(job_id: str):
+    job = db.get_job(job_id)
+    if job is None:
+        return None
+    job.pop("result")
+    return job
+
+
+def get_job_result(job_id: str):
+    job = db.get_job(job_id)
+    if job is None:
+        return None
+    if job["status"] == "done":
+        return {"job_id": job_id, "status": "done", "result": json.loads(job["result"])}
+    if job["status"] in ("failed", "cancelled"):
+        return {"job_id": job_id, "status": job["status"], "error": job["error"]}
+    res = {"job_id": job_id, "status": job["status"], "progress": job["progress"], "message": "Job has not finished yet"}
+    if job["result"]:
+        res["partial"] = json.loads(job["result"])
+    return res
+
+
+def cancel_job(job_id: str):
+    """Cancel a queued or running job. Returns its status, or None if it doesn't exist."""
+    status = db.request_job_cancel(job_id)
+    if status == "running":
+        return "cancelling"
+    return status
+
+
+def _event(name: str, data: dict):
+    return f"event: {name}\ndata: {json.dumps(data, default=_to_jsonable)}\n\n"
+
+
+async def job_events(job_id: str):
+    """Server-Sent Events for one job: a "progress" event whenever its progress,
+    message or partial result changes, then one final event named after the
+    finished status ("done", "failed" or "cancelled").
+
+    Workers write progress to the jobs table, so this polls the row; the
+    interval is JOB_EVENTS_POLL_INTERVAL seconds.
+    """
+    last, quiet = None, 0.0
+    while True:
+        job = await asyncio.to_thread(db.get_job, job_id)
+        if job is None:
+            yield _event("error", {"job_id": job_id, "error": "Job not found"})
+            return
+
+        event = {
+            "job_id": job_id,
+            "status": job["status"],
+            "progress": job["progress"],
+            "message": job["message"],
+        }
+        if job["status"] in FINISHED_STATUSES:
+            if job["status"] != "done":
+                event["error"] = job["error"]
+            yield _event(job["status"], event)
+            return
+
+        if job["result"]:
+            event["partial"] = json.loads(job["result"])
+        if event != last:
+            yield _event("progress", event)
+            last, quiet = event, 0.0
+        elif quiet >= EVENTS_KEEPALIVE:
+            yield ": keep-alive\n\n"
+            quiet = 0.0
+        await asyncio.sleep(EVENTS_POLL_INTERVAL)
+        quiet += EVENTS_POLL_INTERVAL
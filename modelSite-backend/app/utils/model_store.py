@@ -0,0 +1,153 @@
+# utils/model_store.py
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from app.utils import timing
+from app.utils.cache import LRUCache
+
+# Fitted models are saved here together with the feature layout used to train them
+MODEL_STORE_DIR = os.getenv("MODEL_STORE_DIR", "app/storage/models")
+# Oldest models are deleted once the store holds more than this many
+MODEL_STORE_MAX_MODELS = int(os.getenv("MODEL_STORE_MAX_MODELS", 500))
+# Models kept loaded in memory for /predict
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", 16))
+
+_MODEL_ID = re.compile(r"^[0-9a-f]{32}$")
+
+loaded_models = LRUCache(MODEL_CACHE_SIZE, float("inf"))
+
+
+def _path(model_id: str):
+    if not _MODEL_ID.match(model_id):
+        raise ValueError("Invalid model ID")
+    return os.path.join(MODEL_STORE_DIR, f"{model_id}.joblib")
+
+
+# ------------------------------
+# Saving (runs in the training worker)
+# ------------------------------
+@timing.phase("persist")
+def persist_model(res: dict, preprocessor, feature_names, target_column: str):
+    """Save the fitted model attached by a fit_* function and add its model_id to the result.
+
+    fit_* functions return the estimator under the private "_model" key; it is
+    always removed here so the result stays JSON-serializable. The feature
+    preprocessor is saved alongside so /predict can take raw rows.
+    """
+    fitted = res.pop("_model", None)
+    if fitted is None or "error" in res:
+        return res
+
+    model_id = uuid.uuid4().hex
+    bundle = {
+        "model_id": model_id,
+        "model_type": res.get("model_type"),
+        "target_column": target_column,
+        "input_columns": [str(col) for col in preprocessor.feature_names_in_],
+        "feature_columns": [str(col) for col in feature_names],
+        "preprocessor": preprocessor,
+        "sparse": fitted.get("sparse", False),
+        "estimator": fitted["estimator"],
+        "kind": fitted.get("kind", "sklearn"),
+        "problem_type": fitted.get("problem_type"),
+        "classes": list(fitted["classes"]) if fitted.get("classes") is not None else None,
+        "created_at": datetime.now().isoformat(),
+    }
+
+    os.makedirs(MODEL_STORE_DIR, exist_ok=True)
+    tmp_path = os.path.join(MODEL_STORE_DIR, f".{model_id}.tmp")
+    joblib.dump(bundle, tmp_path)
+    os.replace(tmp_path, _path(model_id))
+    _evict()
+
+    res["model_id"] = model_id
+    return res
+
+
+def _evict():
+    entries = []
+    for name in os.listdir(MODEL_STORE_DIR):
+        if name.endswith(".joblib"):
+            path = os.path.join(MODEL_STORE_DIR, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                continue
+    for _, path in sorted(entries)[:max(0, len(entries) - MODEL_STORE_MAX_MODELS)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# ------------------------------
+# Loading and scoring (runs in the API process)
+# ------------------------------
+@timing.phase("load_model")
+def load_model(model_id: str):
+    """Return the saved bundle, keeping recently used models in memory. None if unknown."""
+    bundle = loaded_models.get(model_id)
+    if bundle is None:
+        try:
+            bundle = joblib.load(_path(model_id))
+        except FileNotFoundError:
+            return None
+        loaded_models.put(model_id, bundle)
+    return bundle
+
+
+def model_exists(model_id: str):
+    return model_id in loaded_models or os.path.exists(_path(model_id))
+
+
+def build_features(bundle, df: pd.DataFrame):
+    """Turn raw rows into model input with the preprocessor saved at training time."""
+    missing = [col for col in bundle["input_columns"] if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    X = bundle["preprocessor"].transform(df)
+    if hasattr(X, "toarray") and not bundle["sparse"]:
+        X = X.toarray()
+    return X
+
+
+def predict(model_id: str, df: pd.DataFrame):
+    bundle = load_model(model_id)
+    if bundle is None:
+        return None
+
+    start = time.perf_counter()
+    timing.label(rows=len(df))
+    with timing.phase("prepare"):
+        X = build_features(bundle, df)
+    with timing.phase("predict"):
+        if bundle["kind"] == "torch":
+            import torch
+
+            model = bundle["estimator"]
+            model.eval()
+            with torch.no_grad():
+                preds = model(torch.tensor(X, dtype=torch.float32)).numpy().flatten()
+            if bundle["problem_type"] == "classification":
+                preds = (preds > 0.5).astype(int)
+        else:
+            preds = bundle["estimator"].predict(X)
+
+    if bundle["classes"] is not None:
+        preds = np.asarray(bundle["classes"], dtype=object)[preds.astype(int)]
+
+    return {
+        "model_id": model_id,
+        "model_type": bundle["model_type"],
+        "target_column": bundle["target_column"],
+        "n_rows": int(len(preds)),
+        "predictions": [p.item() if isinstance(p, np.generic) else p for p in preds],
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
@@ -0,0 +1,165 @@
+# utils/pipeline.py
+import numpy as np
+import pandas as pd
+
+from app.utils import timing
+from app.utils.data_utils import load_dataset, prepare_features, train_test_split_data, parse_metrics
+from app.utils.jobs import progress_muted, report_progress
+from app.utils.model_store import persist_model
+from app.utils.registry import get_spec
+
+# Requested metric name -> (result key, sklearn.metrics function, extra arguments).
+# sklearn.metrics is imported when metrics are first computed, not with this module.
+WEIGHTED = {"average": "weighted", "zero_division": 0}
+METRIC_FUNCTIONS = {
+    "mse": ("mse", "mean_squared_error", {}),
+    "mae": ("mae", "mean_absolute_error", {}),
+    "rmse": ("rmse", "root_mean_squared_error", {}),
+    "r2": ("r2_score", "r2_score", {}),
+    "r2_score": ("r2_score", "r2_score", {}),
+    "accuracy": ("accuracy", "accuracy_score", {}),
+    "precision": ("precision", "precision_score", WEIGHTED),
+    "recall": ("recall", "recall_score", WEIGHTED),
+    "f1_score": ("f1_score", "f1_score", WEIGHTED),
+    "confusion_matrix": ("confusion_matrix", "confusion_matrix", {}),
+}
+
+WRONG_TASK_ERRORS = {
+    "regression": "Target appears continuous. Use a regression model instead.",
+    "classification": "Target appears categorical. Use a classification model instead.",
+}
+
+
+# ------------------------------
+# Shared steps
+# ------------------------------
+def detect_problem_type(y: pd.Series):
+    """Numeric targets with more than 10 distinct values are regression, anything else classification.
+
+    Uses pandas' dtype checks: np.issubdtype can't interpret extension dtypes
+    such as the string dtype pandas 3 reads text columns as.
+    """
+    if pd.api.types.is_numeric_dtype(y) and not pd.api.types.is_bool_dtype(y) and y.nunique() > 10:
+        return "regression"
+    return "classification"
+
+
+@timing.phase("metrics")
+def compute_metrics(metrics_list, y_test, y_pred):
+    import sklearn.metrics
+
+    results = {}
+    for name in metrics_list:
+        key, func_name, kwargs = METRIC_FUNCTIONS[name]
+        value = getattr(sklearn.metrics, func_name)(y_test, y_pred, **kwargs)
+        results[key] = value.tolist() if isinstance(value, np.ndarray) else round(float(value), 4)
+    return results
+
+
+def predictions_preview(y_test, y_pred, problem_type, n=10):
+    if problem_type == "regression":
+        cast = float
+    else:
+        cast = lambda value: value.item() if isinstance(value, np.generic) else value
+    return [{"actual": cast(a), "predicted": cast(p)} for a, p in zip(y_test[:n], y_pred[:n])]
+
+
+def _check_options(spec, options):
+    unknown = [name for name in options if name not in spec.options]
+    if unknown:
+        raise ValueError(f"'{spec.name}' does not take option(s): {', '.join(unknown)}")
+
+
+# ------------------------------
+# Runner
+# ------------------------------
+def fit_model(model_name: str, X_scaled, y, feature_names, metrics_list=None, params=None, split=None, **options):
+    """Split, fit, score and describe one registered model on prepared features.
+
+    `split` is a (train_rows, test_rows) pair of row positions to use instead of
+    the default 80/20 split, e.g. one cross-validation fold. Returns the usual
+    result dict, with the fitted estimator under "_model" for persist_model, or
+    {"error": ...} if the model doesn't fit this target.
+    """
+    spec = get_spec(model_name)
+    options = {name: value for name, value in options.items() if value is not None}
+    _check_options(spec, options)
+    timing.label(model=spec.name)
+    module = spec.load()
+    if hasattr(X_scaled, "toarray") and not spec.sparse:
+        X_scaled = X_scaled.toarray()
+    if hasattr(module, "train"):
+        return module.train(X_scaled, y, feature_names, metrics_list, params=params, split=split, **options)
+
+    # --- Detect problem type ---
+    problem_type = detect_problem_type(y)
+    if problem_type not in spec.tasks:
+        return {"error": WRONG_TASK_ERRORS[problem_type]}
+    classes = None
+    if problem_type == "classification" and not pd.api.types.is_numeric_dtype(y):
+        y, classes = pd.factorize(y)
+
+    if hasattr(module, "check_input"):
+        error = module.check_input(X_scaled, problem_type, **options)
+        if error:
+            return {"error": error}
+
+    metrics_list = parse_metrics(metrics_list, set(spec.metrics[problem_type]))
+
+    # --- Train/test split ---
+    X_train, X_test, y_train, y_test = train_test_split_data(X_scaled, y, split)
+
+    # --- Train model ---
+    # Hyperparameters picked by /tune override the spec's defaults
+    with timing.phase("fit"):
+        model = module.build_estimator(problem_type, {**spec.defaults, **(params or {})}, X_train, **options)
+        if hasattr(module, "fit_estimator"):
+            module.fit_estimator(model, X_train, y_train, **options)
+        else:
+            model.fit(X_train, y_train)
+    with timing.phase("predict"):
+        y_pred = model.predict(X_test)
+
+    res = {"model_type": spec.model_type(problem_type), "metrics": compute_metrics(metrics_list, y_test, y_pred)}
+    if hasattr(module, "describe"):
+        res.update(module.describe(model, feature_names, problem_type, **options))
+    res["predictions_preview"] = predictions_preview(y_test, y_pred, problem_type)
+    res["_model"] = {"estimator": model, "problem_type": problem_type, "classes": classes, "sparse": spec.sparse}
+    return res
+
+
+def run_pipeline(model_name: str, file, filename: str, target_column: str, metrics_list=None,
+                 cv=None, cv_folds=5, stream=False, chunk_rows=None, stream_epochs=None, **options):
+    """Load -> prepare -> fit -> persist for one model; what every model endpoint and job runs.
+
+    With cv ("kfold" or "stratified") the model is first scored on cv_folds
+    folds, and the per-fold and mean/std metrics are added under "cross_validation".
+    With stream the dataset is never loaded whole; see utils/streaming.py.
+    """
+    # Imported here: cross_validation and streaming build on this module
+    from app.utils.cross_validation import check_cv, cross_validate, get_folds
+
+    cv = check_cv(cv, cv_folds)
+    if stream:
+        from app.utils.streaming import run_streaming
+
+        if cv is not None:
+            raise ValueError("Cross-validation isn't available in streaming mode")
+        return run_streaming(model_name, file, filename, target_column, metrics_list,
+                             chunk_rows=chunk_rows, epochs=stream_epochs, **options)
+    df = load_dataset(file, filename)
+    X_scaled, y, feature_names, preprocessor = prepare_features(df, target_column, return_preprocessor=True)
+    if cv is None:
+        res = fit_model(model_name, X_scaled, y, feature_names, metrics_list, **options)
+        return persist_model(res, preprocessor, feature_names, target_column)
+
+    folds = get_folds(y, cv, cv_folds, df.attrs.get("content_hash"), target_column)
+    summary = cross_validate(model_name, X_scaled, y, feature_names, folds, cv, metrics_list, **options)
+    if "error" in summary:
+        return {"error": summary["error"]}
+    report_progress(0.9, "Fitting the final model", force=True)
+    with progress_muted():
+        res = fit_model(model_name, X_scaled, y, feature_names, metrics_list, **options)
+    if "error" not in res:
+        res["cross_validation"] = summary
+    return persist_model(res, preprocessor, feature_names, target_column)
@@ -0,0 +1,314 @@
+# utils/profiling.py
+import os
+import re
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+
+# ------------------------------
+# Configuration
+# ------------------------------
+# Profiles are saved here and served by GET /profiles/{profile_id}
+PROFILE_DIR = os.getenv("PROFILE_DIR", "app/storage/profiles")
+# Oldest profiles are deleted once there are more than this many
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", 100))
+# Seconds between two stack samples in "sample" mode
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.005))
+# "sample": a thread samples the worker's Python stack (collapsed stacks for flamegraphs)
+# "cprofile": deterministic cProfile, saved as .pstats; exact call counts but slows pure-Python code
+PROFILE_MODES = ("sample", "cprofile")
+PROFILE_EXTENSIONS = {"sample": "folded", "cprofile": "pstats"}
+# Functions listed in a result's profile summary
+PROFILE_TOP = 15
+# Honor X-Profile from any client; otherwise it needs the admin token (X-Admin-Token)
+PROFILE_ALLOW_HEADER = os.getenv("PROFILE_ALLOW_HEADER", "false").lower() in ("1", "true", "yes")
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# Set for every HTTP request by ProfilingMiddleware: the profile mode asked for
+# (X-Profile header, else the admin toggle) and the profiles the request produced
+_request = ContextVar("profile_request", default=None)
+# Admin toggle: profile every model run in this API process
+_admin_mode = os.getenv("PROFILE_MODE", "off").lower()
+
+
+def parse_mode(value):
+    """X-Profile header / toggle value -> a profile mode, or None when profiling is off."""
+    value = (value or "").strip().lower()
+    if value in ("", "0", "off", "false", "no", "none"):
+        return None
+    return value if value in PROFILE_MODES else "sample"
+
+
+def get_admin_mode():
+    return parse_mode(_admin_mode)
+
+
+def set_admin_mode(mode):
+    """Turn profiling of every model run on ("sample"/"cprofile") or off. Returns the new mode."""
+    global _admin_mode
+    mode = parse_mode(mode)
+    _admin_mode = mode or "off"
+    return mode
+
+
+def requested_mode():
+    """The profile mode for the model run being started by this request, or None."""
+    request = _request.get()
+    return request["mode"] if request is not None else None
+
+
+def note(res):
+    """Remember the profile attached to a worker result so it is linked from the response headers."""
+    request = _request.get()
+    if request is not None and isinstance(res, dict) and "profile" in res:
+        request["profiles"].append(res["profile"]["url"])
+
+
+# ------------------------------
+# Worker side
+# ------------------------------
+def _short_path(path: str):
+    # Library frames as "sklearn/ensemble/_forest.py", the standard library as
+    # "stdlib/json/decoder.py" and app frames relative to the backend folder
+    marker = "site-packages" + os.sep
+    if marker in path:
+        return path.split(marker, 1)[1]
+    stdlib = sysconfig.get_paths()["stdlib"] + os.sep
+    if path.startswith(stdlib):
+        return "stdlib/" + path[len(stdlib):]
+    cwd = os.getcwd() + os.sep
+    return path[len(cwd):] if path.startswith(cwd) else path
+
+
+def _package(path: str):
+    """Top-level package of a shortened path: "app", "pandas", "sklearn", "torch", "stdlib", ..."""
+    if path in ("~", "") or path.startswith("<"):
+        return "builtins"
+    return re.split(r"[/\\.]", path, maxsplit=1)[0] or "other"
+
+
+class _StackSampler:
+    """Samples one thread's Python stack every `interval` seconds from a background thread.
+
+    Only frames below `root` (the profiled call) are kept. Stacks are counted
+    in the collapsed format flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, root, interval: float):
+        self.root = root
+        self.thread_id = threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self._labels = {}
+        self._packages = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            path = _short_path(code.co_filename)
+            label = self._labels[code] = f"{code.co_name} ({path}:{code.co_firstlineno})"
+            self._packages[label] = _package(path)
+        return label
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame is not self.root:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def summary(self):
+        total = sum(self.stacks.values())
+        inclusive, packages = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            for frame in set(frames):
+                inclusive[frame] += count
+            packages[self._packages[frames[-1]]] += count
+        return {
+            "samples": total,
+            "interval_ms": self.interval * 1000,
+            # Share of samples whose innermost frame is in each package (app, pandas, sklearn, torch, ...)
+            "by_package": {name: round(count / total, 4) for name, count in packages.most_common()} if total else {},
+            "top": [
+                {"function": frame, "share": round(count / total, 4)}
+                for frame, count in inclusive.most_common(PROFILE_TOP)
+            ],
+        }
+
+
+def _cprofile_summary(profiler):
+    import pstats
+
+    stats = pstats.Stats(profiler).stats
+    packages = Counter()
+    for (filename, _, _), (_, _, tottime, _, _) in stats.items():
+        packages[_package(_short_path(filename))] += tottime
+    total = sum(packages.values())
+    top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+    return {
+        # Share of the time spent inside each package's own functions
+        "by_package": {name: round(t / total, 4) for name, t in packages.most_common()} if total else {},
+        "top": [
+            {
+                "function": f"{name} ({_short_path(filename)}:{line})",
+                "calls": calls,
+                "cumulative_seconds": round(cumtime, 4),
+            }
+            for (filename, line, name), (_, calls, _, cumtime, _) in top
+        ],
+    }
+
+
+def _evict():
+    entries = []
+    for name in os.listdir(PROFILE_DIR):
+        path = os.path.join(PROFILE_DIR, name)
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except FileNotFoundError:
+            continue
+    for _, path in sorted(entries)[:max(0, len(entries) - PROFILE_MAX_FILES)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def profiled_call(mode: str, func, *args, **kwargs):
+    """Executed inside a pool worker: run func under the profiler and save the profile.
+
+    A dict result gets a "profile" entry with the profile's URL and a short
+    summary (top functions and time share per package). The profile is saved
+    even if func raises.
+    """
+    profile_id = uuid.uuid4().hex
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.{PROFILE_EXTENSIONS[mode]}")
+    start = time.perf_counter()
+    if mode == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            res = func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+        summary = _cprofile_summary(profiler)
+    else:
+        sampler = _StackSampler(sys._getframe(), PROFILE_INTERVAL)
+        sampler.start()
+        try:
+            res = func(*args, **kwargs)
+        finally:
+            sampler.stop()
+            sampler.save(path)
+        summary = sampler.summary()
+    _evict()
+
+    if isinstance(res, dict):
+        res["profile"] = {
+            "profile_id": profile_id,
+            "mode": mode,
+            "url": f"/profiles/{profile_id}",
+            "seconds": round(time.perf_counter() - start, 3),
+            **summary,
+        }
+    return res
+
+
+# ------------------------------
+# API side
+# ------------------------------
+def profile_path(profile_id: str):
+    """(path, mode) of a saved profile, or None if it doesn't exist (or was evicted)."""
+    if not _PROFILE_ID.match(profile_id):
+        raise ValueError("Invalid profile ID")
+    for mode, ext in PROFILE_EXTENSIONS.items():
+        path = os.path.join(PROFILE_DIR, f"{profile_id}.{ext}")
+        if os.path.exists(path):
+            return path, mode
+    return None
+
+
+def pstats_text(path: str, sort: str = "cumulative", limit: int = 50):
+    """A saved cProfile profile as the usual pstats table."""
+    import io
+    import pstats
+
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class ProfilingMiddleware:
+    """Reads the X-Profile request header ("sample", "cprofile", or "1" for the
+    default sampler) and, for requests that ran a profiled model, links the
+    saved profiles in an X-Profile-Url response header.
+
+    The header only counts when the request carries the admin token in
+    X-Admin-Token (or PROFILE_ALLOW_HEADER is set), so anonymous clients
+    can't add profiler overhead and profile files. Otherwise the admin toggle
+    decides; with both off nothing is profiled and the only cost is one
+    ContextVar per request.
+    """
+
+    def __init__(self, app, admin_token: str = None):
+        self.app = app
+        self.admin_token = admin_token
+
+    def _header_allowed(self, headers):
+        if PROFILE_ALLOW_HEADER:
+            return True
+        token = headers.get(b"x-admin-token")
+        return bool(self.admin_token) and token is not None and token.decode("latin-1") == self.admin_token
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        header = headers.get(b"x-profile")
+        if header is not None and self._header_allowed(headers):
+            mode = parse_mode(header.decode("latin-1"))
+        else:
+            mode = get_admin_mode()
+        request = {"mode": mode, "profiles": []}
+
+        async def send_with_profiles(message):
+            if message["type"] == "http.response.start" and request["profiles"]:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-url", ", ".join(request["profiles"]).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _request.set(request)
+        try:
+            await self.app(scope, receive, send_with_profiles)
+        finally:
+            _request.reset(token)
@@ -0,0 +1,185 @@
+# utils/registry.py
+import importlib
+from dataclasses import dataclass, field
+
+REGRESSION_METRICS = ("mse", "mae", "r2")
+CLASSIFICATION_METRICS = ("accuracy", "precision", "recall", "f1_score", "confusion_matrix")
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """What the shared pipeline (utils/pipeline.py) needs to know about one model.
+
+    The model's code lives in app.models.<module> and is only imported when the
+    model is first used. That module provides:
+      build_estimator(problem_type, params, X_train, **options) -> unfitted estimator
+    and optionally:
+      check_input(X_scaled, problem_type, **options) -> error message or None
+      fit_estimator(model, X_train, y_train, **options)   (default: model.fit)
+      describe(model, feature_names, problem_type, **options) -> extra response fields
+      train(X_scaled, y, feature_names, metrics_list, params=None, split=None, **options)
+        which replaces the generic split/fit/metrics steps entirely.
+    Models with streaming=True also provide
+      build_streaming_estimator(problem_type, params, classes, **options)
+    returning an estimator with partial_fit(X, y[, classes]) and predict(X),
+    used by utils/streaming.py to train chunk by chunk.
+    """
+    name: str                       # endpoint path, e.g. "random-forest"
+    module: str                     # module in app.models
+    label: str                      # model_type shown in results
+    tasks: tuple                    # "regression" and/or "classification"
+    metrics: dict = field(default_factory=dict)   # task -> metrics that can be requested
+    defaults: dict = field(default_factory=dict)  # estimator parameters; /tune params override them
+    options: tuple = ()             # extra keyword options the model accepts, e.g. ("engine",)
+    sparse: bool = False            # takes scipy sparse input; otherwise sparse features are densified
+    streaming: bool = False         # can be trained out of core (see utils/streaming.py)
+
+    def load(self):
+        return importlib.import_module(f"app.models.{self.module}")
+
+    def model_type(self, problem_type: str):
+        if len(self.tasks) == 1:
+            return self.label
+        return f"{self.label} ({problem_type.title()})"
+
+
+MODEL_SPECS = {}
+
+
+def register(spec: ModelSpec):
+    MODEL_SPECS[spec.name] = spec
+    return spec
+
+
+# ------------------------------
+# Registered models
+# ------------------------------
+register(ModelSpec(
+    name="linear-regression",
+    module="linearregression",
+    label="Linear Regression",
+    tasks=("regression",),
+    metrics={"regression": REGRESSION_METRICS},
+    sparse=True,
+    streaming=True,
+))
+register(ModelSpec(
+    name="logistic-regression",
+    module="logisticregression",
+    label="Logistic Regression",
+    tasks=("classification",),
+    metrics={"classification": CLASSIFICATION_METRICS},
+    defaults={"max_iter": 1000},
+    sparse=True,
+    streaming=True,
+))
+register(ModelSpec(
+    name="bagging",
+    module="bagging",
+    label="Bagging Regression",
+    tasks=("regression",),
+    metrics={"regression": ("r2_score", "mse", "rmse")},
+    defaults={"n_estimators": 10, "random_state": 42},
+    sparse=True,
+))
+register(ModelSpec(
+    name="decision-trees",
+    module="decisiontrees",
+    label="Decision Tree",
+    tasks=("regression", "classification"),
+    metrics={"regression": REGRESSION_METRICS, "classification": CLASSIFICATION_METRICS},
+    defaults={"random_state": 42},
+    sparse=True,
+))
+register(ModelSpec(
+    name="random-forest",
+    module="randomforest",
+    label="Random Forest",
+    tasks=("regression", "classification"),
+    metrics={"regression": REGRESSION_METRICS, "classification": CLASSIFICATION_METRICS},
+    defaults={"n_estimators": 100, "random_state": 42},
+    sparse=True,
+))
+register(ModelSpec(
+    name="svm",
+    module="svm",
+    label="SVM Regression",
+    tasks=("regression",),
+    metrics={"regression": ("r2_score", "mse", "rmse")},
+    defaults={"C": 1.0, "epsilon": 0.1, "gamma": "scale"},
+    options=("solver",),
+    sparse=True,
+))
+register(ModelSpec(
+    name="boosting",
+    module="boosting",
+    label="Boosting",
+    tasks=("regression", "classification"),
+    metrics={"regression": REGRESSION_METRICS, "classification": CLASSIFICATION_METRICS},
+    defaults={"learning_rate": 0.1, "random_state": 42},
+    options=("engine",),
+))
+register(ModelSpec(
+    name="deep-neural-network",
+    module="deepnueralnetwork",
+    label="Custom Deep Neural Network",
+    tasks=("regression", "classification"),
+    metrics={"regression": ("mse", "r2"), "classification": ("accuracy", "f1_score", "confusion_matrix")},
+    # Defaults are read from model_config (see fit_deep_neural_network)
+    options=("model_config",),
+    streaming=True,
+))
+
+
+# ------------------------------
+# Lookup
+# ------------------------------
+def _normalize(name: str):
+    return "".join(ch for ch in name.lower() if ch.isalnum())
+
+
+def _aliases():
+    # Accept "random-forest", "randomforest", "Random Forest", or the module name
+    aliases = {_normalize(spec.name): spec.name for spec in MODEL_SPECS.values()}
+    aliases.update({_normalize(spec.module): spec.name for spec in MODEL_SPECS.values()})
+    return aliases
+
+
+def get_spec(model_name: str) -> ModelSpec:
+    name = _aliases().get(_normalize(model_name))
+    if name is None:
+        raise ValueError(f"Unknown model '{model_name}'. Choose from: {', '.join(MODEL_SPECS)}")
+    return MODEL_SPECS[name]
+
+
+def resolve_model_names(model_names):
+    resolved = []
+    for name in model_names:
+        key = get_spec(name).name
+        if key not in resolved:
+            resolved.append(key)
+    if not resolved:
+        raise ValueError("Pick at least one model to compare")
+    return resolved
+
+
+def model_options(model_name: str, **options):
+    """Keep only the options this model takes, e.g. model_config for the neural network."""
+    spec = get_spec(model_name)
+    return {name: value for name, value in options.items() if name in spec.options}
+
+
+def describe_models():
+    return [
+        {
+            "name": spec.name,
+            "model_type": spec.label,
+            "tasks": list(spec.tasks),
+            "metrics": {task: list(metrics) for task, metrics in spec.metrics.items()},
+            "defaults": spec.defaults,
+            "options": list(spec.options),
+            "sparse_input": spec.sparse,
+            "streaming": spec.streaming,
+        }
+        for spec in MODEL_SPECS.values()
+    ]
@@ -0,0 +1,165 @@
+# utils/result_cache.py
+import asyncio
+import functools
+import hashlib
+import json
+import os
+from datetime import datetime
+from importlib import metadata
+
+import app.database.DB as db
+import app.utils.executor as executor
+import app.utils.pipeline as pipeline
+from app.utils import profiling
+from app.utils.dataset_profile import check_target
+from app.utils.data_utils import dataset_key
+from app.utils.jobs import _to_jsonable
+from app.utils.model_store import model_exists
+from app.utils.registry import get_spec
+
+# ------------------------------
+# Configuration
+# ------------------------------
+# Seconds a stored result stays valid; 0 turns the result cache off
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", 7 * 24 * 3600))
+# Least recently used results are dropped once the table holds more than this
+RESULT_CACHE_MB = int(os.getenv("RESULT_CACHE_MB", 64))
+# Libraries whose version is part of every key: an upgrade can change results
+KEY_LIBRARIES = ("numpy", "pandas", "scikit-learn", "torch")
+# Environment settings that change what a run trains when the request doesn't
+# set them (engine, solver, feature layout, streaming defaults); DNN_* are all included
+KEY_SETTINGS = (
+    "BOOSTING_ENGINE", "HIST_STAGE_ITERATIONS",
+    "FEATURE_MODE", "FEATURE_MAX_CATEGORIES", "FEATURE_SPARSE_MIN_COLUMNS",
+    "SVM_KERNEL_APPROX", "SVM_KERNEL_APPROX_ROWS", "SVM_APPROX_COMPONENTS",
+    "STREAM_CHUNK_ROWS", "STREAM_EPOCHS", "DATASET_FLOAT32",
+)
+KEY_SETTING_PREFIXES = ("DNN_",)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def key_settings():
+    """The KEY_SETTINGS environment variables that are set, e.g. {"BOOSTING_ENGINE": "hist"}.
+
+    Read from the environment rather than the model modules, which the API
+    process doesn't import; the workers inherit the same environment.
+    """
+    return {
+        name: value for name, value in sorted(os.environ.items())
+        if name in KEY_SETTINGS or name.startswith(KEY_SETTING_PREFIXES)
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """Hash of the backend's Python sources, the versions of the ML libraries and
+    the environment settings that change training defaults.
+
+    Any change to the code (a new default, a bug fix in a model), a library
+    upgrade or a config change (e.g. BOOSTING_ENGINE) gives every run a new
+    key, so stale results are never served.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(APP_DIR):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, APP_DIR).encode("utf-8"))
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    for library in KEY_LIBRARIES:
+        try:
+            digest.update(f"{library}=={metadata.version(library)}".encode("utf-8"))
+        except metadata.PackageNotFoundError:
+            pass
+    for name, value in key_settings().items():
+        digest.update(f"{name}={value}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def result_key(model_name: str, content_key: str, target_column: str, **options):
+    """Key of one run_pipeline call: dataset content key, model, target, every option
+    (hyperparameters, model_config, engine, cv, streaming settings) and the code version."""
+    options = {name: value for name, value in options.items() if value is not None}
+    # Settings that don't apply to this run must not split the key, e.g. the
+    # cv_folds=5 jobs always send next to cv=None
+    if not options.get("cv"):
+        options = {name: value for name, value in options.items() if name not in ("cv", "cv_folds")}
+    if not options.get("stream"):
+        options = {name: value for name, value in options.items()
+                   if name not in ("stream", "chunk_rows", "stream_epochs")}
+    payload = json.dumps(
+        {
+            "dataset": content_key,
+            "model": get_spec(model_name).name,
+            "target": target_column,
+            "options": options,
+            "code": code_version(),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def prepare_run(model_name: str, file, filename: str, target_column: str, **options):
+    """(result key, error) for a run_pipeline call, hashing the dataset once for both.
+
+    error is set when the dataset's cached profile (POST /datasets/profile)
+    already shows the run would fail, e.g. a continuous target for a
+    classification model; the run is then rejected before it is queued.
+    """
+    content_key = dataset_key(file, filename)
+    error = check_target(model_name, content_key, target_column)
+    return result_key(model_name, content_key, target_column, **options), error
+
+
+def _min_created_at():
+    return datetime.now().timestamp() - RESULT_CACHE_TTL
+
+
+def lookup(key: str):
+    """The stored result for key, flagged as a cache hit, or None.
+
+    Results whose saved model has since been evicted from the model store are
+    dropped, so a hit always comes with a usable model_id.
+    """
+    if RESULT_CACHE_TTL <= 0:
+        return None
+    row = db.get_cached_result(key, _min_created_at())
+    if row is None:
+        return None
+    res = json.loads(row["result"])
+    if res.get("model_id") and not model_exists(res["model_id"]):
+        db.delete_cached_result(key)
+        return None
+    res["cache_hit"] = True
+    res["cached_at"] = datetime.fromtimestamp(row["created_at"]).isoformat()
+    return res
+
+
+def cached_call(key: str, func, *args, **kwargs):
+    """Executed inside a pool worker: run func and store a successful result under key."""
+    res = func(*args, **kwargs)
+    if "error" not in res and RESULT_CACHE_TTL > 0:
+        db.save_cached_result(key, res.get("model_type"), json.dumps(res, default=_to_jsonable),
+                              RESULT_CACHE_MB * 1024 * 1024, _min_created_at())
+    res["cache_hit"] = False
+    return res
+
+
+async def run_pipeline(model_name: str, file, filename: str, target_column: str, **options):
+    """run_pipeline in the worker pool, answered straight from the result cache when
+    the same run finished before. Profiled requests always train."""
+    key, error = await asyncio.to_thread(prepare_run, model_name, file, filename, target_column, **options)
+    if error is not None:
+        return {"error": error}
+    if profiling.requested_mode() is None:
+        cached = await asyncio.to_thread(lookup, key)
+        if cached is not None:
+            return cached
+    return await executor.run_model(
+        cached_call, key, pipeline.run_pipeline, model_name, file, filename, target_column, **options
+    )
@@ -0,0 +1,285 @@
+# utils/streaming.py
+import math
+import os
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from app.utils import timing
+from app.utils.data_utils import (
+    FEATURE_MAX_CATEGORIES, build_preprocessor, feature_columns, feature_frame, iter_dataset_chunks, parse_metrics,
+)
+from app.utils.jobs import report_progress
+from app.utils.model_store import persist_model
+from app.utils.pipeline import METRIC_FUNCTIONS, WRONG_TASK_ERRORS, predictions_preview
+from app.utils.registry import MODEL_SPECS, get_spec
+
+# Rows read, encoded and trained on at a time; this is what bounds memory use
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", 50_000))
+# Passes over the data for SGD / the neural network
+STREAM_EPOCHS = int(os.getenv("STREAM_EPOCHS", 5))
+STREAM_TEST_FRACTION = 0.2
+# Classification targets with more distinct values than this are rejected
+STREAM_MAX_CLASSES = 100
+
+
+# ------------------------------
+# First pass: feature and target statistics
+# ------------------------------
+class _DatasetScan:
+    """Everything streaming training needs to know before the first update,
+    collected one chunk at a time: numeric scaling statistics, category counts,
+    the target's type and classes, and the row count."""
+
+    def __init__(self, target_column: str):
+        from sklearn.preprocessing import StandardScaler
+
+        self.target_column = target_column
+        self.numeric = self.categorical = None
+        self.scaler = StandardScaler()
+        self.category_counts = {}
+        self.target_numeric = True
+        self.target_values = set()
+        self.n_rows = 0
+        self.n_chunks = 0
+        self.first_chunk = None
+
+    def update(self, chunk: pd.DataFrame):
+        if self.target_column not in chunk.columns:
+            raise ValueError(f"Target column '{self.target_column}' not found in dataset.")
+        chunk = chunk.dropna(subset=[self.target_column])
+        self.n_chunks += 1
+        if chunk.empty:
+            return
+        X = chunk.drop(columns=[self.target_column])
+        y = chunk[self.target_column]
+        if self.numeric is None:
+            self.numeric, self.categorical = feature_columns(X)
+            self.category_counts = {col: Counter() for col in self.categorical}
+            self.first_chunk = X
+        self.n_rows += len(chunk)
+
+        frame = feature_frame(X, self.numeric, self.categorical, np.float64)
+        if self.numeric:
+            self.scaler.partial_fit(frame[self.numeric])
+        for col in self.categorical:
+            self.category_counts[col].update(frame[col].value_counts(dropna=False).to_dict())
+
+        self.target_numeric &= pd.api.types.is_numeric_dtype(y) and not pd.api.types.is_bool_dtype(y)
+        if len(self.target_values) <= STREAM_MAX_CLASSES:
+            self.target_values.update(y.unique().tolist())
+
+    def problem_type(self):
+        # Same rule as pipeline.detect_problem_type
+        if self.target_numeric and len(self.target_values) > 10:
+            return "regression"
+        return "classification"
+
+    def categories(self):
+        """The FEATURE_MAX_CATEGORIES most frequent values of each categorical column."""
+        categories = []
+        for col in self.categorical:
+            values = [value for value, _ in self.category_counts[col].most_common(FEATURE_MAX_CATEGORIES)]
+            missing = [value for value in values if pd.isna(value)]
+            # OneHotEncoder wants explicit categories sorted, with a missing value last
+            categories.append(sorted((v for v in values if not pd.isna(v)), key=str) + missing[:1])
+        return categories
+
+    def preprocessor(self):
+        """The same preprocessor batch training builds, with the scaler statistics from every chunk."""
+        preprocessor = build_preprocessor(self.numeric, self.categorical, categories=self.categories())
+        preprocessor.fit(self.first_chunk)
+        if self.numeric:
+            scaler = preprocessor.named_steps["encode"].named_transformers_["numeric"]
+            for attr in ("mean_", "var_", "scale_", "n_samples_seen_"):
+                setattr(scaler, attr, getattr(self.scaler, attr))
+        return preprocessor
+
+
+# ------------------------------
+# Metrics computed chunk by chunk
+# ------------------------------
+class _StreamingMetrics:
+    """Running sums (regression) or a confusion matrix (classification), so the
+    test rows never have to be held in memory together."""
+
+    def __init__(self, problem_type: str, n_classes: int = 0):
+        self.problem_type = problem_type
+        self.n = 0
+        self.sum_y = self.sum_y2 = self.sse = self.sae = 0.0
+        self.confusion = np.zeros((n_classes, n_classes), dtype=np.int64)
+
+    def update(self, y_true, y_pred):
+        self.n += len(y_true)
+        if self.problem_type == "regression":
+            y_true = np.asarray(y_true, dtype=np.float64)
+            errors = y_true - np.asarray(y_pred, dtype=np.float64)
+            self.sum_y += y_true.sum()
+            self.sum_y2 += np.square(y_true).sum()
+            self.sse += np.square(errors).sum()
+            self.sae += np.abs(errors).sum()
+        else:
+            np.add.at(self.confusion, (np.asarray(y_true, dtype=int), np.asarray(y_pred, dtype=int)), 1)
+
+    def _weighted(self, per_class):
+        support = self.confusion.sum(axis=1)
+        return float((per_class * support).sum() / max(support.sum(), 1))
+
+    def value(self, name: str):
+        if name == "mse":
+            return self.sse / self.n
+        if name == "mae":
+            return self.sae / self.n
+        if name == "rmse":
+            return math.sqrt(self.sse / self.n)
+        if name in ("r2", "r2_score"):
+            total = self.sum_y2 - self.sum_y ** 2 / self.n
+            return 1.0 - self.sse / total if total > 0 else 0.0
+        if name == "confusion_matrix":
+            return self.confusion.tolist()
+
+        hits = np.diag(self.confusion).astype(float)
+        predicted, actual = self.confusion.sum(axis=0), self.confusion.sum(axis=1)
+        precision = np.divide(hits, predicted, out=np.zeros_like(hits), where=predicted > 0)
+        recall = np.divide(hits, actual, out=np.zeros_like(hits), where=actual > 0)
+        if name == "accuracy":
+            return hits.sum() / self.n
+        if name == "precision":
+            return self._weighted(precision)
+        if name == "recall":
+            return self._weighted(recall)
+        both = precision + recall
+        return self._weighted(np.divide(2 * precision * recall, both, out=np.zeros_like(hits), where=both > 0))
+
+    def results(self, metrics_list):
+        results = {}
+        for name in metrics_list:
+            value = self.value(name)
+            results[METRIC_FUNCTIONS[name][0]] = value if isinstance(value, list) else round(float(value), 4)
+        return results
+
+
+# ------------------------------
+# Runner
+# ------------------------------
+def _test_mask(chunk_no: int, n_rows: int):
+    # Seeded per chunk, so every pass holds out the same rows
+    return np.random.default_rng([42, chunk_no]).random(n_rows) < STREAM_TEST_FRACTION
+
+
+def _encoded_chunks(file, filename, target_column, preprocessor, chunk_rows, classes):
+    """Yield (chunk_no, X, y) with features encoded and classification targets as class indices."""
+    for chunk_no, chunk in enumerate(iter_dataset_chunks(file, filename, chunk_rows)):
+        chunk = chunk.dropna(subset=[target_column])
+        if chunk.empty:
+            continue
+        X = preprocessor.transform(chunk.drop(columns=[target_column]))
+        y = chunk[target_column].to_numpy()
+        if classes is not None:
+            y = pd.Index(classes).get_indexer(y)
+        yield chunk_no, X, y
+
+
+def check_streaming(model_name: str):
+    spec = get_spec(model_name)
+    if not spec.streaming:
+        streaming = ", ".join(name for name, s in MODEL_SPECS.items() if s.streaming)
+        raise ValueError(f"'{spec.name}' can't be trained in streaming mode. Choose from: {streaming}")
+    return spec
+
+
+def run_streaming(model_name: str, file, filename: str, target_column: str, metrics_list=None,
+                  chunk_rows=None, epochs=None, params=None, **options):
+    """Train without loading the whole dataset: scan it once for scaling and
+    category statistics, then make `epochs` passes of partial_fit updates, one
+    chunk at a time, and score the held-out rows in a final pass.
+
+    Returns the same result as pipeline.run_pipeline, plus a "streaming" section.
+    """
+    spec = check_streaming(model_name)
+    chunk_rows = int(chunk_rows or STREAM_CHUNK_ROWS)
+    epochs = int(epochs or STREAM_EPOCHS)
+    options = {name: value for name, value in options.items() if value is not None}
+    module = spec.load()
+    timing.label(model=spec.name)
+
+    report_progress(0.05, "Scanning dataset", force=True)
+    scan = _DatasetScan(target_column)
+    with timing.phase("scan"):
+        for chunk in iter_dataset_chunks(file, filename, chunk_rows):
+            scan.update(chunk)
+    if scan.n_rows == 0:
+        return {"error": f"Target column '{target_column}' has no values"}
+    timing.label(rows=scan.n_rows)
+
+    problem_type = scan.problem_type()
+    if problem_type not in spec.tasks:
+        return {"error": WRONG_TASK_ERRORS[problem_type]}
+    classes = None
+    if problem_type == "classification":
+        if len(scan.target_values) > STREAM_MAX_CLASSES:
+            return {"error": f"Target has more than {STREAM_MAX_CLASSES} classes"}
+        classes = sorted(scan.target_values, key=str)
+    metrics_list = parse_metrics(metrics_list, set(spec.metrics[problem_type]))
+
+    preprocessor = scan.preprocessor()
+    feature_names = list(preprocessor.get_feature_names_out())
+    model = module.build_streaming_estimator(problem_type, {**spec.defaults, **(params or {})}, classes, **options)
+    fit_kwargs = {"classes": np.arange(len(classes))} if classes is not None else {}
+
+    # Reading and encoding the chunks is part of every pass, so it counts towards "fit"
+    fit_start = time.perf_counter()
+    train_rows = 0
+    total_steps = epochs * scan.n_chunks
+    for epoch in range(epochs):
+        for chunk_no, X, y in _encoded_chunks(file, filename, target_column, preprocessor, chunk_rows, classes):
+            train = ~_test_mask(chunk_no, len(y))
+            if train.any():
+                model.partial_fit(X[train], y[train], **fit_kwargs)
+            if epoch == 0:
+                train_rows += int(train.sum())
+            step = epoch * scan.n_chunks + chunk_no + 1
+            partial = {"epoch": epoch + 1, "chunk": chunk_no + 1}
+            if hasattr(model, "loss_"):
+                partial["loss"] = model.loss_
+            report_progress(0.1 + 0.8 * step / total_steps,
+                            f"Epoch {epoch + 1}/{epochs} - chunk {chunk_no + 1}/{scan.n_chunks}", partial=partial)
+
+    timing.add("fit", time.perf_counter() - fit_start)
+
+    report_progress(0.9, "Scoring held-out rows", force=True)
+    scores = _StreamingMetrics(problem_type, len(classes or ()))
+    preview_true, preview_pred = [], []
+    for chunk_no, X, y in _encoded_chunks(file, filename, target_column, preprocessor, chunk_rows, classes):
+        test = _test_mask(chunk_no, len(y))
+        if not test.any():
+            continue
+        with timing.phase("predict"):
+            y_pred = model.predict(X[test])
+        with timing.phase("metrics"):
+            scores.update(y[test], y_pred)
+        if len(preview_true) < 10:
+            preview_true.extend(y[test][:10])
+            preview_pred.extend(y_pred[:10])
+    if scores.n == 0:
+        return {"error": "Not enough rows to hold out a test set"}
+    if classes is not None:
+        labels = np.asarray(classes, dtype=object)
+        preview_true, preview_pred = labels[preview_true], labels[np.asarray(preview_pred, dtype=int)]
+
+    res = {"model_type": spec.model_type(problem_type), "metrics": scores.results(metrics_list)}
+    if hasattr(module, "describe"):
+        res.update(module.describe(model, feature_names, problem_type))
+    res["streaming"] = {
+        "rows": scan.n_rows,
+        "train_rows": train_rows,
+        "test_rows": scan.n_rows - train_rows,
+        "chunk_rows": chunk_rows,
+        "chunks": scan.n_chunks,
+        "epochs": epochs,
+    }
+    res["predictions_preview"] = predictions_preview(preview_true[:10], preview_pred[:10], problem_type)
+    res["_model"] = {"estimator": model, "problem_type": problem_type, "classes": classes, "sparse": False}
+    return persist_model(res, preprocessor, feature_names, target_column)
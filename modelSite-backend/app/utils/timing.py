@@ -0,0 +1,227 @@
+# utils/timing.py
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# ------------------------------
+# Phase timings
+# ------------------------------
+# Each request (and each worker call made for it) collects how long it spent in
+# named phases: load, prepare, split, fit, predict, metrics, persist, db, ...
+# The API turns them into a Server-Timing header and into the /metrics histograms.
+# Workers run in other processes, so they hand their timings back with the result.
+_current = ContextVar("timings", default=None)
+
+
+class Timings:
+    """Seconds and call count per phase, plus labels (model, rows) for the histograms."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.labels = {}
+
+    def add(self, name: str, seconds: float, count: int = 1):
+        total = self.phases.setdefault(name, [0.0, 0])
+        total[0] += seconds
+        total[1] += count
+
+    def merge(self, timings: dict):
+        for name, (seconds, count) in timings["phases"].items():
+            self.add(name, seconds, count)
+        for name, value in timings["labels"].items():
+            self.labels.setdefault(name, value)
+
+    def as_dict(self):
+        """Plain, picklable form returned from workers."""
+        return {
+            "phases": {name: list(total) for name, total in self.phases.items()},
+            "labels": dict(self.labels),
+            "seconds": time.perf_counter() - self.start,
+        }
+
+
+@contextmanager
+def phase(name: str):
+    """Time the block (or decorated function) under `name`. No-op when nothing is collecting."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def add(name: str, seconds: float, count: int = 1):
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds, count)
+
+
+def label(**labels):
+    """Attach labels to the current timings; the first value set for a label wins."""
+    timings = _current.get()
+    if timings is not None:
+        for name, value in labels.items():
+            timings.labels.setdefault(name, value)
+
+
+def merge(timings: dict):
+    """Add timings collected elsewhere (a worker process) to the current ones."""
+    current = _current.get()
+    if current is not None and timings:
+        current.merge(timings)
+
+
+@contextmanager
+def collect():
+    """Collect the phases timed inside the block into a fresh Timings."""
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def timed_call(func, *args, **kwargs):
+    """Run func collecting its phase timings. Returns (result, timings as a dict); used in workers."""
+    with collect() as timings:
+        res = func(*args, **kwargs)
+    return res, timings.as_dict()
+
+
+# ------------------------------
+# Histograms (Prometheus text format)
+# ------------------------------
+# Default Prometheus latency buckets, extended for training runs that take minutes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# Dataset size classes for the "rows" label; keeps the label's cardinality fixed
+ROW_BUCKETS = ((1_000, "1k"), (10_000, "10k"), (100_000, "100k"), (1_000_000, "1M"))
+
+
+def rows_bucket(n_rows):
+    if n_rows is None:
+        return "unknown"
+    for limit, name in ROW_BUCKETS:
+        if n_rows <= limit:
+            return f"<={name}"
+    return f">{ROW_BUCKETS[-1][1]}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """A Prometheus histogram with fixed label names; safe to observe from several threads."""
+
+    def __init__(self, name: str, help_text: str, labelnames, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: {**s, "buckets": list(s["buckets"])} for key, s in sorted(self._series.items())}
+        for key, s in series.items():
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key))
+            prefix = labels + "," if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, s["buckets"]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {s["count"]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {s['sum']:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {s['count']}")
+        return "\n".join(lines)
+
+
+request_seconds = Histogram(
+    "modelsite_request_duration_seconds", "Time to answer an HTTP request.", ("method", "route", "status")
+)
+phase_seconds = Histogram(
+    "modelsite_phase_duration_seconds", "Time spent in one phase of a request or background job.",
+    ("phase", "model", "rows"),
+)
+
+
+def observe(timings: dict):
+    """Record every phase of one request or job in the phase histogram."""
+    labels = timings["labels"]
+    model, rows = labels.get("model", "none"), rows_bucket(labels.get("rows"))
+    for name, (seconds, _) in timings["phases"].items():
+        phase_seconds.observe(seconds, phase=name, model=model, rows=rows)
+
+
+def render_metrics():
+    return "\n".join(histogram.render() for histogram in (request_seconds, phase_seconds)) + "\n"
+
+
+# ------------------------------
+# ASGI middleware
+# ------------------------------
+def server_timing(timings: Timings):
+    """Server-Timing header value: one entry per phase in milliseconds, then the total so far."""
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, (seconds, _) in timings.phases.items()]
+    entries.append(f"total;dur={(time.perf_counter() - timings.start) * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class TimingMiddleware:
+    """Collects phase timings for every HTTP request, sends them as a Server-Timing
+    header and records the request and its phases in the histograms.
+
+    Requests are labelled by route template ("/predict/{model_id}"), never by the
+    raw path, so IDs in URLs don't create new series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(timings).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with collect() as timings:
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                route = scope.get("route")
+                elapsed = time.perf_counter() - timings.start
+                request_seconds.observe(elapsed, method=scope["method"],
+                                        route=getattr(route, "path", "unmatched"), status=status)
+                observe(timings.as_dict())
@@ -0,0 +1,357 @@
+# utils/tuning.py
+import itertools
+import math
+import os
+import time
+
+import numpy as np
+from joblib import delayed
+
+from app.utils import executor, timing
+from app.utils.data_utils import load_dataset, prepare_features
+from app.utils.jobs import progress_muted, report_progress
+from app.utils.model_store import persist_model
+from app.utils.pipeline import METRIC_FUNCTIONS, detect_problem_type, fit_model
+from app.utils.registry import get_spec, model_options, resolve_model_names
+
+# Max trials evaluated at the same time, defaults to the worker's share of cores (executor.WORKER_CPUS)
+TUNE_JOBS = int(os.getenv("TUNE_JOBS", executor.WORKER_CPUS))
+# Upper bound on the number of candidates one search may evaluate
+TUNE_MAX_TRIALS = int(os.getenv("TUNE_MAX_TRIALS", 100))
+# Successive halving: keep 1/HALVING_FACTOR of the candidates per round, and
+# never train a candidate on fewer rows than HALVING_MIN_ROWS
+HALVING_FACTOR = 3
+HALVING_MIN_ROWS = int(os.getenv("HALVING_MIN_ROWS", 200))
+
+STRATEGIES = ("grid", "random", "halving")
+
+# Default search space per model. A parameter is either a list of values, or a
+# range {"low": ..., "high": ..., "log": bool, "type": "int" | "float"} (random/halving only)
+SEARCH_SPACES = {
+    "logistic-regression": {
+        "C": {"low": 1e-3, "high": 1e3, "log": True},
+    },
+    "bagging": {
+        "n_estimators": [5, 10, 20, 50],
+        "max_samples": [0.5, 0.75, 1.0],
+    },
+    "decision-trees": {
+        "max_depth": [None, 3, 5, 8, 12, 20],
+        "min_samples_leaf": [1, 2, 5, 10, 20],
+    },
+    "random-forest": {
+        "n_estimators": [50, 100, 200, 400],
+        "max_depth": [None, 5, 10, 20],
+        "min_samples_leaf": [1, 2, 5],
+        "max_features": [1.0, "sqrt", 0.5],
+    },
+    "svm": {
+        "C": {"low": 1e-2, "high": 1e2, "log": True},
+        "epsilon": {"low": 1e-2, "high": 1.0, "log": True},
+        "gamma": ["scale", "auto"],
+    },
+    # GradientBoosting ("exact" engine); see ENGINE_SEARCH_SPACES for "hist"
+    "boosting": {
+        "n_estimators": [50, 100, 200, 400],
+        "learning_rate": {"low": 0.01, "high": 0.3, "log": True},
+        "max_depth": [2, 3, 4, 6],
+        "subsample": [0.7, 0.85, 1.0],
+    },
+    "deep-neural-network": {
+        "learning_rate": {"low": 1e-4, "high": 1e-2, "log": True},
+        "epochs": [20, 50, 100],
+        "batch_size": [16, 32, 64],
+    },
+}
+
+# Models whose engines take different parameters: (model, resolved engine) -> space
+ENGINE_SEARCH_SPACES = {
+    # HistGradientBoosting; early stopping still caps the number of iterations
+    ("boosting", "hist"): {
+        "max_iter": [100, 200, 500],
+        "learning_rate": {"low": 0.01, "high": 0.3, "log": True},
+        "max_leaf_nodes": [15, 31, 63, 127],
+        "min_samples_leaf": [10, 20, 50],
+        "l2_regularization": {"low": 1e-4, "high": 10.0, "log": True},
+    },
+}
+
+# Metrics where a smaller value is better; every other metric is maximized
+LOWER_IS_BETTER = {"mse", "mae", "rmse"}
+# Reported but not a single number, so it can't rank trials
+UNSCORED_METRICS = {"confusion_matrix"}
+
+
+# ------------------------------
+# Search space
+# ------------------------------
+def _is_range(spec):
+    return isinstance(spec, dict)
+
+
+def default_space(model_name: str, engine: str = None):
+    """The model's default search space, for the engine the run resolves to."""
+    spec = get_spec(model_name)
+    if "engine" in spec.options:
+        engine = spec.load().resolve_engine(engine)
+        return ENGINE_SEARCH_SPACES.get((model_name, engine), SEARCH_SPACES[model_name])
+    return SEARCH_SPACES[model_name]
+
+
+def validate_space(space: dict, strategy: str):
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose one of: {', '.join(STRATEGIES)}")
+    if not space:
+        raise ValueError("Search space is empty")
+    for name, spec in space.items():
+        if _is_range(spec):
+            if strategy == "grid":
+                raise ValueError(f"Grid search needs a list of values for '{name}', not a range")
+            if "low" not in spec or "high" not in spec or spec["low"] > spec["high"]:
+                raise ValueError(f"Range for '{name}' needs low <= high")
+            if spec.get("log") and spec["low"] <= 0:
+                raise ValueError(f"Log range for '{name}' must be positive")
+        elif not isinstance(spec, list) or not spec:
+            raise ValueError(f"'{name}' must be a non-empty list of values or a low/high range")
+
+
+def _sample(spec, rng):
+    if not _is_range(spec):
+        return spec[rng.integers(len(spec))]
+    low, high = spec["low"], spec["high"]
+    value = math.exp(rng.uniform(math.log(low), math.log(high))) if spec.get("log") else rng.uniform(low, high)
+    if spec.get("type") == "int" or (isinstance(low, int) and isinstance(high, int) and not spec.get("log")):
+        return int(round(value))
+    return round(float(value), 6)
+
+
+def build_candidates(space: dict, strategy: str, n_trials: int, seed: int = 42):
+    """Parameter combinations to evaluate: the full grid, or n_trials random draws."""
+    if strategy == "grid":
+        names = list(space)
+        candidates = [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+        if len(candidates) > TUNE_MAX_TRIALS:
+            raise ValueError(f"Grid has {len(candidates)} combinations; the limit is {TUNE_MAX_TRIALS}")
+        return candidates
+
+    n_trials = max(1, min(n_trials, TUNE_MAX_TRIALS))
+    rng = np.random.default_rng(seed)
+    candidates, seen = [], set()
+    # Skip duplicate draws, with a bound in case the space is smaller than n_trials
+    for _ in range(n_trials * 10):
+        params = {name: _sample(spec, rng) for name, spec in space.items()}
+        key = repr(sorted(params.items()))
+        if key not in seen:
+            seen.add(key)
+            candidates.append(params)
+        if len(candidates) == n_trials:
+            break
+    return candidates
+
+
+def resolve_metric(model_name: str, metric: str = None, problem_type: str = None):
+    """The result key trials are ranked by ("r2" -> "r2_score"), or None for the default.
+
+    The metric must be one the model reports for problem_type, or for any of
+    its tasks when the problem type isn't known yet; raises ValueError otherwise.
+    """
+    if metric is None:
+        return None
+    spec = get_spec(model_name)
+    tasks = [problem_type] if problem_type else spec.tasks
+    allowed = [m for task in tasks for m in spec.metrics.get(task, ()) if m not in UNSCORED_METRICS]
+    # Normalized like parse_metrics does for the other endpoints
+    name = metric.lower().replace(" ", "_")
+    key = METRIC_FUNCTIONS[name][0] if name in METRIC_FUNCTIONS else None
+    if key is None or key not in {METRIC_FUNCTIONS[m][0] for m in allowed}:
+        raise ValueError(f"Metric '{metric}' can't rank {spec.name} trials. Choose one of: {', '.join(allowed)}")
+    return key
+
+
+# ------------------------------
+# Trials
+# ------------------------------
+def _fit(model_name, X, y, feature_names, params, options=None, metrics_list=None):
+    # options: the run's model options (model_config, engine, solver); unused ones are dropped
+    return fit_model(model_name, X, y, feature_names, metrics_list, params=params,
+                     **model_options(model_name, **(options or {})))
+
+
+def _run_trial(index, model_name, params, X, y, feature_names, rows, options=None):
+    """Fit one candidate on the first `rows` training rows; scored on the fit's own hold-out split.
+
+    Returns (trial, phase timings).
+    """
+    start = time.perf_counter()
+    timings = None
+    with progress_muted():
+        try:
+            res, timings = timing.timed_call(_fit, model_name, X[:rows], y.iloc[:rows], feature_names, params,
+                                             options)
+        except Exception as e:
+            res = {"error": str(e)}
+    res.pop("_model", None)
+    trial = {"trial": index, "params": params, "rows": int(rows), "fit_seconds": round(time.perf_counter() - start, 3)}
+    if "error" in res:
+        trial["error"] = res["error"]
+    else:
+        trial["metrics"] = res.get("metrics", {})
+    return trial, timings
+
+
+def _score(trial, metric):
+    value = trial.get("metrics", {}).get(metric)
+    if value is None:
+        return None
+    return -value if metric in LOWER_IS_BETTER else value
+
+
+def _default_metric(trials):
+    for trial in trials:
+        metrics = trial.get("metrics", {})
+        for metric in ("accuracy", "r2_score", "mse"):
+            if metric in metrics:
+                return metric
+    return None
+
+
+class _Search:
+    """Runs trial batches in parallel and streams the best-so-far to the job."""
+
+    def __init__(self, model_name, X, y, feature_names, metric, options, total_trials):
+        self.model_name = model_name
+        self.X, self.y, self.feature_names = X, y, feature_names
+        self.metric = metric
+        self.options = options
+        self.total_trials = total_trials
+        self.trials = []
+        self.best = None
+
+    def run(self, candidates, rows):
+        first = len(self.trials)
+        tasks = (
+            delayed(_run_trial)(first + i, self.model_name, params, self.X, self.y,
+                                self.feature_names, rows, self.options)
+            for i, params in enumerate(candidates)
+        )
+        n_jobs = max(1, min(len(candidates), TUNE_JOBS))
+        batch = []
+        for trial, timings in executor.nested_parallel(n_jobs)(tasks):
+            timing.merge(timings)
+            batch.append(trial)
+            self._record(trial)
+        return sorted(batch, key=lambda t: t["trial"])
+
+    def _record(self, trial):
+        self.trials.append(trial)
+        if self.metric is None:
+            self.metric = _default_metric([trial])
+        trial["score"] = _score(trial, self.metric) if self.metric else None
+
+        improved = trial["score"] is not None and (
+            self.best is None
+            or (trial["rows"], trial["score"]) > (self.best["rows"], self.best["score"])
+        )
+        if improved:
+            self.best = trial
+        progress = 0.3 + 0.6 * len(self.trials) / self.total_trials
+        message = f"Trial {len(self.trials)}/{self.total_trials}"
+        if self.best is not None:
+            message += f" - best {self.metric} {self.best['metrics'][self.metric]}"
+        report_progress(progress, message, force=improved, partial=self.summary() if improved else None)
+
+    def summary(self):
+        return {
+            "model": self.model_name,
+            "metric": self.metric,
+            "trials_done": len(self.trials),
+            "best_params": self.best["params"] if self.best else None,
+            "best_metrics": self.best["metrics"] if self.best else None,
+        }
+
+
+def _halving_rounds(n_candidates, n_rows):
+    """Number of rows per successive-halving round, ending with all training rows."""
+    n_rounds = max(1, math.ceil(math.log(max(n_candidates, 1), HALVING_FACTOR)) + 1)
+    rows = [n_rows]
+    for _ in range(n_rounds - 1):
+        smaller = rows[0] // HALVING_FACTOR
+        if smaller < HALVING_MIN_ROWS:
+            break
+        rows.insert(0, smaller)
+    return rows
+
+
+def tune_model(file, filename: str, target_column: str, model_name: str, strategy: str = "random",
+               space: dict = None, n_trials: int = 20, metric: str = None, model_config=None, engine: str = None,
+               solver: str = None):
+    """Search hyperparameters for one model and refit the best candidate.
+
+    Trials only see the training part of the standard split (train_test_split_data,
+    random_state=42) and are scored on a hold-out inside it; the refitted model
+    is then evaluated on the usual test rows, so its metrics compare with a
+    normal run. "halving" starts every candidate on a subsample of rows and
+    keeps the best 1/3 each round until the survivors use all training rows.
+    """
+    from sklearn.model_selection import train_test_split
+
+    model_name = resolve_model_names([model_name])[0]
+    timing.label(model=model_name)
+    options = {"model_config": model_config, "engine": engine, "solver": solver}
+    if model_name not in SEARCH_SPACES:
+        raise ValueError(f"'{model_name}' has no hyperparameters to tune")
+    space = space or default_space(model_name, engine)
+    validate_space(space, strategy)
+    candidates = build_candidates(space, strategy, n_trials)
+
+    df = load_dataset(file, filename)
+    X_scaled, y, feature_names, preprocessor = prepare_features(df, target_column, return_preprocessor=True)
+    metric = resolve_metric(model_name, metric, detect_problem_type(y))
+    # Same split as train_test_split_data; trials never see the test rows
+    X_train, _, y_train, _ = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+
+    if strategy == "halving":
+        rounds = _halving_rounds(len(candidates), len(y_train))
+        total, survivors = 0, len(candidates)
+        for _ in rounds:
+            total += survivors
+            survivors = max(1, math.ceil(survivors / HALVING_FACTOR))
+    else:
+        rounds = [len(y_train)]
+        total = len(candidates)
+
+    search = _Search(model_name, X_train, y_train, feature_names, metric, options, total)
+    report_progress(0.3, f"Running {total} trials", force=True)
+    for i, rows in enumerate(rounds):
+        batch = search.run(candidates, rows)
+        if i == len(rounds) - 1:
+            break
+        scored = [t for t in batch if t["score"] is not None]
+        scored.sort(key=lambda t: t["score"], reverse=True)
+        candidates = [t["params"] for t in scored[:max(1, math.ceil(len(candidates) / HALVING_FACTOR))]]
+        if not candidates:
+            break
+
+    if search.best is None:
+        errors = {t["error"] for t in search.trials if "error" in t}
+        return {"error": f"Every trial failed: {'; '.join(sorted(errors)) or 'no score for ' + str(search.metric)}"}
+
+    report_progress(0.9, "Refitting best parameters", force=True, partial=search.summary())
+    with progress_muted():
+        res = _fit(model_name, X_scaled, y, feature_names, search.best["params"], options)
+    res = persist_model(res, preprocessor, feature_names, target_column)
+    if "error" in res:
+        return res
+
+    # Best first; halving trials on more rows rank above early-round ones
+    trials = sorted(search.trials, key=lambda t: (t["score"] is None, -t["rows"], -(t["score"] or 0)))
+    return {
+        **res,
+        "strategy": strategy,
+        "metric": search.metric,
+        "best_params": search.best["params"],
+        "best_validation_metrics": search.best["metrics"],
+        "n_trials": len(search.trials),
+        "search_space": space,
+        "trials": trials,
+    }
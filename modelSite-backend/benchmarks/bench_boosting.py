@@ -0,0 +1,49 @@
+"""Compare the two /boosting engines on synthetic airQuality-like data.
+
+Reports fit wall time and test metrics for engine=exact (GradientBoosting)
+and engine=hist (HistGradientBoosting), and hist on data with missing values,
+which the exact engine cannot train on.
+
+    cd modelSite-backend
+    python -m benchmarks.bench_boosting --rows 10000 50000 200000
+"""
+import argparse
+import time
+
+from app.utils.pipeline import fit_model
+from app.utils.data_utils import prepare_features
+from benchmarks.synthetic import make_air_quality
+
+
+def run(engine, df, label):
+    X_scaled, y, feature_names = prepare_features(df, "pm25")
+    start = time.perf_counter()
+    res = fit_model("boosting", X_scaled, y, feature_names, engine=engine)
+    elapsed = time.perf_counter() - start
+    if "error" in res:
+        print(f"{label:<26} error: {res['error']}")
+        return None
+    metrics = res["metrics"]
+    extra = f"  iterations={res['parameters']['n_iter']}" if engine == "hist" else ""
+    print(f"{label:<26} {elapsed:>8.2f}s   r2={metrics['r2_score']:.4f}  mse={metrics['mse']:.4f}{extra}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 50000, 200000])
+    parser.add_argument("--missing", type=float, default=0.05, help="NaN fraction for the missing-values run")
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        print(f"\n{n_rows} rows")
+        df = make_air_quality(n_rows)
+        exact = run("exact", df, "exact")
+        hist = run("hist", df, "hist")
+        if exact and hist:
+            print(f"{'':<26} speedup x{exact / hist:.1f}")
+        run("hist", make_air_quality(n_rows, missing=args.missing), f"hist, {args.missing:.0%} missing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Micro-benchmark for the SQLite data layer.
+
+Compares the original one-connection-per-call access (default rollback
+journal) with the pooled WAL connections in app.database.DB, for login and
+history reads under concurrent callers, with and without concurrent saves.
+
+    cd modelSite-backend
+    python -m benchmarks.bench_db --threads 16 --seconds 3
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+_tmp = tempfile.mkdtemp(prefix="bench_db_")
+os.environ["DB_PATH"] = os.path.join(_tmp, "pooled.db")
+
+import app.database.DB as db  # noqa: E402  (DB_PATH must be set first)
+
+LEGACY_DB = os.path.join(_tmp, "legacy.db")
+METRICS = {"mse": 3.95, "mae": 1.6, "r2_score": 0.62}
+
+
+# ------------------------------
+# Original access pattern (one connection per call)
+# ------------------------------
+def legacy_get_user(username, password):
+    conn = sqlite3.connect(LEGACY_DB)
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM users WHERE username = ? AND password = ?", (username, password))
+    user = cursor.fetchone()
+    conn.close()
+    return bool(user)
+
+
+def legacy_save_model_result(username, dataset_name, model_type, target_column, metrics):
+    conn = sqlite3.connect(LEGACY_DB)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO model_results (username, dataset_name, model_type, target_column, metrics, metric_value, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (username, dataset_name, model_type, target_column, json.dumps(metrics), metrics["r2_score"], datetime.now()))
+    conn.commit()
+    conn.close()
+
+
+def legacy_get_history(username):
+    conn = sqlite3.connect(LEGACY_DB)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT dataset_name, model_type, target_column, metrics, metric_value, timestamp
+        FROM model_results WHERE username = ? ORDER BY timestamp DESC
+    """, (username,))
+    rows = cursor.fetchall()
+    conn.close()
+    return [json.loads(row[3]) for row in rows]
+
+
+def seed(n_users, n_history):
+    conn = sqlite3.connect(LEGACY_DB)
+    conn.executescript("""
+        CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL, password TEXT NOT NULL);
+        CREATE TABLE model_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL, dataset_name TEXT NOT NULL,
+            model_type TEXT NOT NULL, target_column TEXT, metrics TEXT, metric_value REAL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    conn.executemany("INSERT INTO users (username, password) VALUES (?, ?)",
+                     [(f"user{i}", "pw") for i in range(n_users)])
+    conn.commit()
+    conn.close()
+    for i in range(n_users):
+        db.add_user(f"user{i}", "pw")
+
+    rows = [("bench", f"data{i % 5}.csv", f"model{i % 8}", "pm25", METRICS, None) for i in range(n_history)]
+    for start in range(0, n_history, 500):
+        batch = rows[start:start + 500]
+        db.save_model_results("bench", "seed.csv", "pm25", [(m, metrics, mid) for _, _, m, _, metrics, mid in batch])
+        for r in batch:
+            legacy_save_model_result(r[0], r[1], r[2], r[3], METRICS)
+
+
+def run(label, operations, threads, seconds):
+    counts = [0] * threads
+    errors = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def worker(index):
+        op_index = index
+        while time.perf_counter() < deadline:
+            try:
+                operations[op_index % len(operations)]()
+                counts[index] += 1
+            except sqlite3.OperationalError:
+                errors[index] += 1
+            op_index += 1
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    total = sum(counts)
+    print(f"{label:<34} {total / seconds:>10.1f} ops/s   errors={sum(errors)}")
+    return total / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--history", type=int, default=2000)
+    args = parser.parse_args()
+
+    db.initialize_db()
+    print(f"Seeding {args.users} users and {args.history} history rows in {_tmp}")
+    seed(args.users, args.history)
+    print(f"{args.threads} concurrent callers, {args.seconds}s per workload\n")
+
+    workloads = {
+        "login": (
+            [lambda: legacy_get_user("user7", "pw")],
+            [lambda: db.get_user("user7", "pw")],
+        ),
+        "history": (
+            [lambda: legacy_get_history("bench")],
+            [lambda: db.get_user_model_history("bench")],
+        ),
+        "login + history + 20% saves": (
+            [lambda: legacy_get_user("user7", "pw")] * 2 + [lambda: legacy_get_history("bench")] * 2
+            + [lambda: legacy_save_model_result("writer", "w.csv", "svm", "pm25", METRICS)],
+            [lambda: db.get_user("user7", "pw")] * 2 + [lambda: db.get_user_model_history("bench")] * 2
+            + [lambda: db.save_model_result("writer", "w.csv", "svm", "pm25", METRICS)],
+        ),
+    }
+    for name, (legacy_ops, pooled_ops) in workloads.items():
+        before = run(f"{name} [per-call connect]", legacy_ops, args.threads, args.seconds)
+        after = run(f"{name} [pooled WAL]", pooled_ops, args.threads, args.seconds)
+        print(f"{'':<34} speedup x{after / before:.2f}\n")
+
+
+if __name__ == "__main__":
+    main()
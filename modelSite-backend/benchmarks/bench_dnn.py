@@ -0,0 +1,87 @@
+"""Training throughput (samples/sec) of the custom neural network on CPU.
+
+Compares the original loop (Python slicing in row order, loss.item() after
+every batch) with the DataLoader-based loop in fit_deep_neural_network, for
+several batch sizes and compile modes.
+
+    cd modelSite-backend
+    python -m benchmarks.bench_dnn --rows 50000 --epochs 5 --threads 4
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from sklearn.model_selection import train_test_split
+
+from app.models.deepnueralnetwork import CustomNet, fit_deep_neural_network
+from app.utils.data_utils import prepare_features
+from benchmarks.synthetic import make_air_quality
+
+LAYERS = [{"units": 64, "activation": "relu"}, {"units": 32, "activation": "relu"}]
+
+
+def legacy_train(X_scaled, y, epochs, batch_size):
+    """The training loop as it was before the DataLoader rewrite."""
+    X_train, _, y_train, _ = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+    X_train = torch.tensor(X_train, dtype=torch.float32)
+    y_train = torch.tensor(y_train.values, dtype=torch.float32).view(-1, 1)
+    model = CustomNet(X_train.shape[1], LAYERS)
+    criterion = nn.MSELoss()
+    optimizer = optim.Adam(model.parameters(), lr=0.001)
+
+    model.train()
+    for _ in range(epochs):
+        batch_losses = []
+        for i in range(0, len(X_train), batch_size):
+            X_batch = X_train[i: i + batch_size]
+            y_batch = y_train[i: i + batch_size]
+            optimizer.zero_grad()
+            loss = criterion(model(X_batch), y_batch)
+            loss.backward()
+            optimizer.step()
+            batch_losses.append(loss.item())
+        float(np.mean(batch_losses))
+    return len(X_train)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads())
+    parser.add_argument("--compile", nargs="+", default=["none", "script"], help="none, script and/or compile")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    X_scaled, y, feature_names = prepare_features(make_air_quality(args.rows), "pm25")
+    n_train = int(len(y) * 0.8)
+    print(f"{args.rows} rows ({n_train} training), {X_scaled.shape[1]} features, {args.epochs} epochs, "
+          f"{args.threads} thread(s)\n")
+    print(f"{'loop':<22} {'batch':>6} {'samples/s':>12} {'r2':>8}")
+
+    for batch_size in args.batch_sizes:
+        torch.manual_seed(0)
+        start = time.perf_counter()
+        legacy_train(X_scaled, y, args.epochs, batch_size)
+        rate = args.epochs * n_train / (time.perf_counter() - start)
+        print(f"{'original':<22} {batch_size:>6} {rate:>12.0f} {'':>8}")
+
+        for mode in args.compile:
+            torch.manual_seed(0)
+            config = {"layers": LAYERS, "epochs": args.epochs, "batch_size": batch_size,
+                      "num_threads": args.threads, "compile": mode}
+            start = time.perf_counter()
+            res = fit_deep_neural_network(X_scaled, y, feature_names, config)
+            rate = args.epochs * n_train / (time.perf_counter() - start)
+            if "error" in res:
+                print(f"{'dataloader, ' + mode:<22} {batch_size:>6} error: {res['error']}")
+                continue
+            print(f"{'dataloader, ' + mode:<22} {batch_size:>6} {rate:>12.0f} {res['metrics']['r2_score']:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compare feature preparation before and after the sparse preprocessor.
+
+  legacy  - pd.get_dummies(dtype=float) + a dense StandardScaler (the old path)
+  dense   - the ColumnTransformer preprocessor with dense float64 output
+  sparse  - the same preprocessor with float32 CSR output
+
+Each run reports wall time, the peak memory tracemalloc saw while preparing and
+the size of the resulting feature matrix. Data is synthetic airQuality-like
+rows with a high-cardinality County column.
+
+    cd modelSite-backend
+    python -m benchmarks.bench_features --rows 20000 50000 --counties 2000
+"""
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from app.utils.data_utils import _prepare_features
+from benchmarks.synthetic import make_air_quality
+
+
+def legacy_features(df, target_column):
+    from sklearn.preprocessing import StandardScaler
+
+    X = pd.get_dummies(df.drop(columns=[target_column]), drop_first=True, dtype=float)
+    return StandardScaler().fit_transform(X)
+
+
+def matrix_bytes(X):
+    if hasattr(X, "indptr"):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+
+def run(label, prepare):
+    tracemalloc.start()
+    start = time.perf_counter()
+    X = prepare()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = matrix_bytes(X)
+    print(f"{label:<8} {elapsed:>7.2f}s   peak {peak / 2**20:>8.1f} MiB   "
+          f"features {size / 2**20:>8.1f} MiB   shape {X.shape[0]}x{X.shape[1]}")
+    return {"seconds": elapsed, "peak_bytes": peak, "feature_bytes": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[20000, 50000])
+    parser.add_argument("--counties", type=int, default=2000, help="distinct County values")
+    parser.add_argument("--max-categories", type=int, help="override FEATURE_MAX_CATEGORIES")
+    args = parser.parse_args()
+
+    if args.max_categories:
+        import app.utils.data_utils as data_utils
+        data_utils.FEATURE_MAX_CATEGORIES = args.max_categories
+
+    for n_rows in args.rows:
+        print(f"\n{n_rows} rows, {args.counties} counties")
+        df = make_air_quality(n_rows, n_counties=args.counties)
+        run("legacy", lambda: legacy_features(df, "pm25"))
+        run("dense", lambda: _prepare_features(df, "pm25", "dense")[0])
+        run("sparse", lambda: _prepare_features(df, "pm25", "sparse")[0])
+
+
+if __name__ == "__main__":
+    main()
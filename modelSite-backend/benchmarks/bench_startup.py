@@ -0,0 +1,111 @@
+"""Cold-start benchmark for the API process and the training workers.
+
+Every measurement runs in a fresh interpreter, so nothing is cached in
+sys.modules between runs:
+
+  import     - time to import app.main (what uvicorn does before serving)
+  uvicorn    - time from starting `uvicorn app.main:app` until GET /status answers
+  worker     - what a pool worker pays before its first random-forest fit:
+               importing the pipeline and loading one model module
+
+It also reports whether torch and scikit-learn were imported along the way.
+
+    cd modelSite-backend
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "torch": "torch" in sys.modules, "sklearn": "sklearn" in sys.modules}))
+"""
+
+WORKER_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from app.utils.pipeline import fit_model
+from app.utils.registry import get_spec
+get_spec("random-forest").load()
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "torch": "torch" in sys.modules, "sklearn": "sklearn" in sys.modules}))
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench_startup_"), "startup.db"))
+    env["PYTHONPATH"] = os.getcwd() + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def run_snippet(snippet):
+    out = subprocess.run([sys.executable, "-c", snippet], env=_env(), capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_uvicorn(timeout=120):
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/status", timeout=1) as res:
+                    if res.status == 200:
+                        return {"seconds": time.perf_counter() - start}
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError("uvicorn did not answer /status")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summarize(name, results):
+    seconds = [r["seconds"] for r in results]
+    line = f"{name:8s} median {statistics.median(seconds):6.3f}s  min {min(seconds):6.3f}s  max {max(seconds):6.3f}s"
+    if "torch" in results[0]:
+        line += f"  torch={results[0]['torch']}  sklearn={results[0]['sklearn']}"
+    print(line)
+    return {"median": statistics.median(seconds), "min": min(seconds), "max": max(seconds), "runs": seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    report = {
+        "import": summarize("import", [run_snippet(IMPORT_SNIPPET) for _ in range(args.runs)]),
+        "uvicorn": summarize("uvicorn", [run_uvicorn() for _ in range(args.runs)]),
+        "worker": summarize("worker", [run_snippet(WORKER_SNIPPET) for _ in range(args.runs)]),
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
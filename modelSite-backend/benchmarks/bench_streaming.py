@@ -0,0 +1,71 @@
+"""Peak memory and time of in-memory versus streaming (out-of-core) training.
+
+Writes synthetic airQuality-like rows to a stored Parquet dataset, then trains
+linear regression on pm25 both ways, each in a fresh interpreter so the peak
+resident set size (ru_maxrss) belongs to that run alone:
+
+  memory  - run_pipeline: the whole dataset as a DataFrame plus a dense matrix
+  stream  - run_pipeline(stream=True): chunk_rows rows at a time
+
+    cd modelSite-backend
+    python -m benchmarks.bench_streaming --rows 200000 2000000 --chunk-rows 50000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from app.utils.columnar import convert_to_parquet
+from benchmarks.synthetic import make_air_quality
+
+RUN_SNIPPET = """
+import json, resource, sys, time
+from app.utils.pipeline import run_pipeline
+path, stream, chunk_rows = sys.argv[1], sys.argv[2] == "1", int(sys.argv[3])
+start = time.perf_counter()
+res = run_pipeline("linear-regression", path, "data.parquet", "pm25", stream=stream, chunk_rows=chunk_rows)
+print(json.dumps({"seconds": time.perf_counter() - start, "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  "metrics": res.get("metrics"), "error": res.get("error")}))
+"""
+
+
+def make_dataset(n_rows, directory):
+    csv_path = os.path.join(directory, f"air-{n_rows}.csv")
+    parquet_path = os.path.join(directory, f"air-{n_rows}.parquet")
+    make_air_quality(n_rows).to_csv(csv_path, index=False)
+    convert_to_parquet(csv_path, "csv", parquet_path)
+    os.remove(csv_path)
+    return parquet_path
+
+
+def run(path, stream, chunk_rows, directory):
+    env = dict(os.environ, PYTHONPATH=os.getcwd(), MODEL_STORE_DIR=os.path.join(directory, "models"),
+               DATASET_CACHE_DIR=os.path.join(directory, "cache"), DB_PATH=os.path.join(directory, "bench.db"))
+    out = subprocess.run([sys.executable, "-c", RUN_SNIPPET, path, "1" if stream else "0", str(chunk_rows)],
+                         env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[200000, 1000000])
+    parser.add_argument("--chunk-rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_streaming_") as directory:
+        for n_rows in args.rows:
+            path = make_dataset(n_rows, directory)
+            print(f"\n{n_rows} rows ({os.path.getsize(path) / 2**20:.1f} MiB Parquet)")
+            for label, stream in (("memory", False), ("stream", True)):
+                result = run(path, stream, args.chunk_rows, directory)
+                if result["error"]:
+                    print(f"{label:<8} error: {result['error']}")
+                    continue
+                print(f"{label:<8} {result['seconds']:>7.2f}s   peak RSS {result['peak_mb']:>8.1f} MiB   "
+                      f"r2={result['metrics']['r2_score']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
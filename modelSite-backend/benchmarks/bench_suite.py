@@ -0,0 +1,327 @@
+"""End-to-end benchmark suite for the data pipeline and the API.
+
+Pipeline phases, for each synthetic airQuality-like dataset size:
+
+  load          - load_dataset on the raw CSV bytes, caches cleared first
+                  (parsing plus writing the disk cache)
+  load_cached   - the same call served from the in-memory cache
+  prepare       - prepare_features with the feature cache cleared
+  fit           - fit_model for each registered model (split, fit, predict, metrics)
+  persist       - persist_model saving the fitted model and preprocessor
+
+API load test, against `uvicorn app.main:app` started in a subprocess:
+concurrent clients call each endpoint and the throughput and latency
+percentiles (p50/p90/p99) are reported. The server runs with the result
+cache off (RESULT_CACHE_TTL=0), so training requests really train.
+
+Everything goes to one JSON file together with the git commit and machine
+info, so runs from two commits can be compared with --compare.
+
+    cd modelSite-backend
+    python -m benchmarks.bench_suite --rows 10000 50000 --output before.json
+    python -m benchmarks.bench_suite --rows 10000 50000 --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+_tmp = tempfile.mkdtemp(prefix="bench_suite_")
+# Keep caches, saved models and the database out of the app folders
+os.environ["DATASET_CACHE_DIR"] = os.path.join(_tmp, "cache")
+os.environ["MODEL_STORE_DIR"] = os.path.join(_tmp, "models")
+os.environ["DB_PATH"] = os.path.join(_tmp, "bench.db")
+
+import app.utils.data_utils as data_utils  # noqa: E402  (the settings above must be set first)
+from app.utils.model_store import persist_model  # noqa: E402
+from app.utils.pipeline import fit_model  # noqa: E402
+from app.utils.registry import MODEL_SPECS, model_options  # noqa: E402
+from benchmarks.synthetic import make_air_quality  # noqa: E402
+
+TARGET = "pm25"
+
+
+def timed(func, *args, repeat=1, setup=None, **kwargs):
+    """Run func `repeat` times; returns (last result, {"median", "min", "runs"}) in seconds."""
+    runs, result = [], None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        runs.append(time.perf_counter() - start)
+    return result, {"median": statistics.median(runs), "min": min(runs), "runs": runs}
+
+
+def clear_caches():
+    data_utils.dataset_cache.clear()
+    data_utils.features_cache.clear()
+    shutil.rmtree(data_utils.DATASET_CACHE_DIR, ignore_errors=True)
+
+
+# ------------------------------
+# Pipeline phases
+# ------------------------------
+def bench_pipeline(n_rows, models, repeat, dnn_epochs):
+    raw = make_air_quality(n_rows).to_csv(index=False).encode()
+    report = {"csv_mb": round(len(raw) / 2**20, 2)}
+
+    _, report["load"] = timed(data_utils.load_dataset, raw, "air.csv", repeat=repeat, setup=clear_caches)
+    df, report["load_cached"] = timed(data_utils.load_dataset, raw, "air.csv", repeat=repeat)
+    prepared, report["prepare"] = timed(
+        data_utils.prepare_features, df, TARGET, return_preprocessor=True, repeat=repeat,
+        setup=data_utils.features_cache.clear,
+    )
+    X_scaled, y, feature_names, preprocessor = prepared
+    report["n_features"] = int(X_scaled.shape[1])
+    print(f"  load {report['load']['median']:.3f}s  cached {report['load_cached']['median']:.4f}s  "
+          f"prepare {report['prepare']['median']:.3f}s  ({report['n_features']} features)")
+
+    report["fit"], report["persist"] = {}, {}
+    for name in models:
+        options = model_options(name, model_config={"epochs": dnn_epochs})
+        res, fit_time = timed(fit_model, name, X_scaled, y, feature_names, repeat=repeat, **options)
+        if "error" in res:
+            report["fit"][name] = {"error": res["error"]}
+            print(f"  {name:<22} error: {res['error']}")
+            continue
+        report["fit"][name] = {**fit_time, "metrics": res["metrics"]}
+        _, report["persist"][name] = timed(persist_model, res, preprocessor, feature_names, TARGET)
+        print(f"  {name:<22} fit {fit_time['median']:>8.3f}s   persist {report['persist'][name]['median']:.3f}s")
+    return report
+
+
+# ------------------------------
+# API load test
+# ------------------------------
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(timeout=120):
+    port = _free_port()
+    # The result cache is off so the repeated training requests in bench_api
+    # measure training throughput rather than cache hits
+    env = dict(os.environ, PYTHONPATH=os.getcwd(), DATASET_STORAGE_DIR=os.path.join(_tmp, "datasets"),
+               RESULT_CACHE_TTL="0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            with urllib.request.urlopen(f"{base_url}/status", timeout=1):
+                return proc, base_url
+        except OSError:
+            time.sleep(0.05)
+    proc.terminate()
+    raise TimeoutError("uvicorn did not answer /status")
+
+
+def call(url, data=None, content_type=None, timeout=600):
+    """One HTTP request; returns (status, parsed JSON body or None)."""
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": content_type} if content_type else {})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as res:
+            return res.status, json.loads(res.read() or "null")
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+
+def form(fields):
+    return urllib.parse.urlencode(fields).encode(), "application/x-www-form-urlencoded"
+
+
+def multipart(fields, file_field, filename, content):
+    boundary = uuid.uuid4().hex
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in fields.items()
+    ]
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n".encode() + content + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def load_test(make_request, clients, n_requests):
+    """Send n_requests from `clients` threads; latency percentiles in milliseconds.
+
+    "busy" counts requests the server turned away because its training queue
+    was full (MODEL_QUEUE_LIMIT); "errors" counts every other failure.
+    """
+    def one(_):
+        start = time.perf_counter()
+        status, body = make_request()
+        error = body.get("error") if isinstance(body, dict) else None
+        if status != 200:
+            outcome = "error"
+        elif error:
+            outcome = "busy" if error.startswith("Server is busy") else "error"
+        else:
+            outcome = "ok"
+        return time.perf_counter() - start, outcome
+
+    make_request()  # warm-up: first-use imports and model loading aren't part of the steady state
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        results = list(pool.map(one, range(n_requests)))
+    wall = time.perf_counter() - start
+    latencies = np.array([seconds for seconds, _ in results]) * 1000
+    return {
+        "clients": clients,
+        "requests": n_requests,
+        "errors": sum(outcome == "error" for _, outcome in results),
+        "busy": sum(outcome == "busy" for _, outcome in results),
+        "throughput_rps": round(n_requests / wall, 2),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p90_ms": round(float(np.percentile(latencies, 90)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "max_ms": round(float(latencies.max()), 2),
+    }
+
+
+def bench_api(n_rows, clients, n_requests, train_requests):
+    proc, base_url = start_server()
+    try:
+        raw = make_air_quality(n_rows).to_csv(index=False).encode()
+        _, dataset = call(f"{base_url}/datasets", *multipart({}, "file", "air.csv", raw))
+        dataset_id = dataset["dataset_id"]
+        _, trained = call(f"{base_url}/linear-regression", *form({"target_column": TARGET, "dataset_id": dataset_id}))
+        rows = make_air_quality(10, seed=1).drop(columns=[TARGET]).to_dict(orient="records")
+        predict_body = json.dumps({"rows": rows}).encode()
+
+        scenarios = {
+            "GET /status": (lambda: call(f"{base_url}/status"), n_requests),
+            "GET /models": (lambda: call(f"{base_url}/models"), n_requests),
+            "POST /predict/{model_id} (10 rows)": (
+                lambda: call(f"{base_url}/predict/{trained['model_id']}", predict_body, "application/json"),
+                n_requests,
+            ),
+            "POST /linear-regression (dataset_id)": (
+                lambda: call(f"{base_url}/linear-regression", *form({"target_column": TARGET, "dataset_id": dataset_id})),
+                train_requests,
+            ),
+        }
+        report = {}
+        for name, (make_request, count) in scenarios.items():
+            report[name] = stats = load_test(make_request, clients, count)
+            print(f"  {name:<38} {stats['throughput_rps']:>8.1f} req/s   p50 {stats['p50_ms']:>8.2f}ms   "
+                  f"p90 {stats['p90_ms']:>8.2f}ms   p99 {stats['p99_ms']:>8.2f}ms   "
+                  f"errors {stats['errors']}  busy {stats['busy']}")
+        return report
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+# ------------------------------
+# Report
+# ------------------------------
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def machine_info():
+    import sklearn
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def flatten(report):
+    """{"pipeline/10000/fit/svm": seconds, "api/GET /status/p50_ms": ms, ...} for comparing runs."""
+    flat = {}
+    for size, phases in report.get("pipeline", {}).items():
+        for phase, value in phases.items():
+            if phase == "fit" or phase == "persist":
+                for model, timing in value.items():
+                    if "median" in timing:
+                        flat[f"pipeline/{size}/{phase}/{model}"] = timing["median"]
+            elif isinstance(value, dict) and "median" in value:
+                flat[f"pipeline/{size}/{phase}"] = value["median"]
+    for scenario, stats in report.get("api", {}).items():
+        for key in ("p50_ms", "p99_ms"):
+            flat[f"api/{scenario}/{key}"] = stats[key]
+    return flat
+
+
+def compare(report, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    old, new = flatten(baseline), flatten(report)
+    print(f"\nCompared with {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key] / old[key] if old[key] else float("inf")
+        flag = "  SLOWER" if ratio > threshold else ("  faster" if ratio < 1 / threshold else "")
+        print(f"  {key:<64} {old[key]:>10.4f} -> {new[key]:>10.4f}  x{ratio:5.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 50000], help="dataset sizes")
+    parser.add_argument("--models", nargs="+", default=list(MODEL_SPECS), help="registered model names")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per pipeline phase (median is reported)")
+    parser.add_argument("--dnn-epochs", type=int, default=10)
+    parser.add_argument("--skip-api", action="store_true", help="only run the pipeline phases")
+    parser.add_argument("--api-rows", type=int, default=10000, help="dataset size for the load test")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent clients in the load test")
+    parser.add_argument("--requests", type=int, default=400, help="requests per light endpoint")
+    parser.add_argument("--train-requests", type=int, default=24, help="requests to the training endpoint")
+    parser.add_argument("--output", default="bench_suite.json", help="JSON results file")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="ratio flagged as slower/faster")
+    args = parser.parse_args()
+
+    report = {"meta": {**machine_info(), "args": vars(args)}, "pipeline": {}}
+    try:
+        for n_rows in args.rows:
+            print(f"\nPipeline, {n_rows} rows")
+            report["pipeline"][str(n_rows)] = bench_pipeline(n_rows, args.models, args.repeat, args.dnn_epochs)
+        if not args.skip_api:
+            print(f"\nAPI load test, {args.clients} clients, {args.api_rows}-row dataset")
+            report["api"] = bench_api(args.api_rows, args.clients, args.requests, args.train_requests)
+    finally:
+        shutil.rmtree(_tmp, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(report, args.compare, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
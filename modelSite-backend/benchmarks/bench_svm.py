@@ -0,0 +1,46 @@
+"""Fit time vs. row count for the exact and approximate SVM paths.
+
+The exact path (SVR with an RBF kernel) is skipped above --exact-max-rows,
+where it takes too long to be worth waiting for.
+
+    cd modelSite-backend
+    python -m benchmarks.bench_svm --rows 5000 10000 20000 50000 200000
+"""
+import argparse
+import time
+import warnings
+
+from app.models.svm import SVM_KERNEL_APPROX_ROWS
+from app.utils.pipeline import fit_model
+from app.utils.data_utils import prepare_features
+from benchmarks.synthetic import make_air_quality
+
+
+def run(solver, X_scaled, y, feature_names):
+    start = time.perf_counter()
+    res = fit_model("svm", X_scaled, y, feature_names, solver=solver)
+    elapsed = time.perf_counter() - start
+    return elapsed, res["metrics"]["r2_score"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[5000, 10000, 20000, 50000, 200000])
+    parser.add_argument("--exact-max-rows", type=int, default=50000)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    print(f"auto switches to the approximate path above {SVM_KERNEL_APPROX_ROWS} training rows\n")
+    print(f"{'rows':>8}  {'exact s':>9}  {'exact r2':>8}  {'approx s':>9}  {'approx r2':>9}")
+    for n_rows in args.rows:
+        X_scaled, y, feature_names = prepare_features(make_air_quality(n_rows), "pm25")
+        exact = ("-", "-")
+        if n_rows <= args.exact_max_rows:
+            seconds, r2 = run("exact", X_scaled, y, feature_names)
+            exact = (f"{seconds:.2f}", f"{r2:.4f}")
+        seconds, r2 = run("approx", X_scaled, y, feature_names)
+        print(f"{n_rows:>8}  {exact[0]:>9}  {exact[1]:>8}  {seconds:>9.2f}  {r2:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
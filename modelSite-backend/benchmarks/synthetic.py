@@ -0,0 +1,44 @@
+"""Synthetic datasets shaped like the airQuality data the site is used with."""
+import numpy as np
+import pandas as pd
+
+
+def make_air_quality(n_rows: int, seed: int = 0, missing: float = 0.0, n_counties: int = 60):
+    """Year/State/County plus pollutant readings, with pm25 as a noisy function of them.
+
+    `missing` is the fraction of pollutant readings replaced by NaN.
+    """
+    rng = np.random.default_rng(seed)
+    states = np.array(["CA", "TX", "NY", "FL", "IL", "PA", "OH", "GA"])
+    state = states[rng.integers(len(states), size=n_rows)]
+    county = np.char.add("c", rng.integers(n_counties, size=n_rows).astype(str))
+    year = rng.integers(2000, 2016, size=n_rows)
+
+    ozone = rng.gamma(6.0, 5.0, size=n_rows)
+    no2 = rng.gamma(4.0, 5.0, size=n_rows)
+    co = rng.gamma(2.0, 1.0, size=n_rows)
+    state_effect = dict(zip(states, rng.normal(0, 2, size=len(states))))
+    pm25 = (
+        4
+        + 0.12 * ozone
+        + 0.25 * no2
+        + 1.5 * np.log1p(co)
+        + 0.002 * (no2 - 20) ** 2
+        - 0.15 * (year - 2000)
+        + np.vectorize(state_effect.get)(state)
+        + rng.normal(0, 2, size=n_rows)
+    )
+
+    df = pd.DataFrame({
+        "Year": year,
+        "State": state,
+        "County": county,
+        "ozone": ozone,
+        "no2": no2,
+        "co": co,
+        "pm25": pm25,
+    })
+    if missing:
+        for col in ("ozone", "no2", "co"):
+            df.loc[rng.random(n_rows) < missing, col] = np.nan
+    return df
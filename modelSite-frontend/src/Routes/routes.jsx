@@ -54,10 +54,23 @@ const runModel = async (model, formData) => {
   }
 };
 
+const profileDataset = async (formData) => {
+  try {
+    const response = await axios.post(`${API_BASE_URL}/datasets/profile`, formData, {
+      headers: { "Content-Type": "multipart/form-data" },
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Error profiling dataset:", error);
+    throw error;
+  }
+};
+
 
 const router_functions = {
   fetchDataFromFastAPI,
   loginUser,
+  profileDataset,
   runModel,
   signup
 }
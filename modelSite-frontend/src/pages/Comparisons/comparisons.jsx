@@ -26,16 +26,18 @@ export default function Comparisons() {
       }
         console.log(username)
       try {
-        const res = await fetch(`http://127.0.0.1:8000/model-history/${username}`);
+        // Best run of each model per dataset, aggregated by the backend
+        const res = await fetch(`http://127.0.0.1:8000/model-history/${username}/best`);
         const data = await res.json();
 
-        if (data.history && data.history.length > 0) {
-          setComparisonResults(data.history);
+        if (data.best && data.best.length > 0) {
+          setComparisonResults(data.best);
           setStatus("Comparison data loaded successfully.");
 
-          // Group by dataset name
-          const grouped = data.history.reduce((acc, item) => {
-            const key = item.dataset_name || "Unknown Dataset";
+          // Group by dataset name and target: metrics of different targets don't compare
+          const grouped = data.best.reduce((acc, item) => {
+            const dataset = item.dataset_name || "Unknown Dataset";
+            const key = item.target_column ? `${dataset} (target: ${item.target_column})` : dataset;
             if (!acc[key]) acc[key] = [];
             acc[key].push(item);
             return acc;
@@ -89,7 +91,7 @@ export default function Comparisons() {
     <div className="comparisons-page">
       <h1>Model Comparisons</h1>
       <p className="subtitle">
-        Compare performance of your trained models grouped by dataset.
+        Compare the best run of each of your trained models, grouped by dataset and target.
       </p>
 
       <p className="status">{status}</p>
@@ -117,7 +119,8 @@ export default function Comparisons() {
             <thead>
               <tr>
                 <th>Model</th>
-                <th>Primary Metric</th>
+                <th>Best Primary Metric</th>
+                <th>Runs</th>
                 <th>Full Metrics</th>
               </tr>
             </thead>
@@ -125,7 +128,8 @@ export default function Comparisons() {
               {models.map((m, i) => (
                 <tr key={i}>
                   <td>{m.model}</td>
-                  <td>{m.metric?.toFixed(4)}</td>
+                  <td>{m.metric_value?.toFixed(4)}</td>
+                  <td>{m.runs}</td>
                   <td>
                     {typeof m.metrics === "string"
                       ? m.metrics
@@ -23,6 +23,7 @@ export default function Models() {
   const [status, setStatus] = useState(null);
   const [results, setResults] = useState(null);
   const [columns, setColumns] = useState([]);
+  const [profile, setProfile] = useState(null);
   const [targetColumn, setTargetColumn] = useState("");
   const [showNNModal, setShowNNModal] = useState(false);
   const [nnConfig, setNNConfig] = useState(null);
@@ -53,13 +54,30 @@ export default function Models() {
     try {
       const { columns } = await parseDataset(file);
       setColumns(columns);
+      setProfile(null);
       setStatus(`Parsed ${columns.length} columns successfully.`);
     } catch (err) {
       console.error("Error parsing dataset:", err);
       setStatus("Failed to parse dataset.");
+      return;
+    }
+
+    // Profiled once on the server; it also lets the backend reject a model
+    // that doesn't fit the chosen target before training starts
+    try {
+      const formData = new FormData();
+      formData.append("file", file);
+      const response = await router_functions.profileDataset(formData);
+      if (!response.error) setProfile(response);
+    } catch (err) {
+      console.error("Error profiling dataset:", err);
     }
   }
 
+  const columnTasks = Object.fromEntries(
+    (profile?.columns || []).map((col) => [col.name, col.task])
+  );
+
   async function handleSubmit(e) {
     e.preventDefault();
     setResults(null);
@@ -104,6 +122,7 @@ export default function Models() {
       saveData.append("model_type", response.model_type || modelType);
       saveData.append("target_column", targetColumn);
       saveData.append("metrics", JSON.stringify(response.metrics));
+      if (response.model_id) saveData.append("model_id", response.model_id);
 
       await fetch("http://127.0.0.1:8000/save-model-result", {
         method: "POST",
@@ -141,7 +160,7 @@ export default function Models() {
               <option value="">-- Choose Target Column --</option>
               {columns.map((col) => (
                 <option key={col} value={col}>
-                  {col}
+                  {columnTasks[col] ? `${col} (${columnTasks[col]})` : col}
                 </option>
               ))}
             </select>
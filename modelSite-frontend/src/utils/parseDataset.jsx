@@ -1,39 +1,54 @@
 import * as XLSX from "xlsx";
 
+// Bytes read at a time while looking for the end of the CSV/TXT header line
+const HEADER_CHUNK_BYTES = 64 * 1024;
+
+/**
+ * Read the header line of a CSV/TXT file without loading the rest of it.
+ *
+ * @param {File} file - Uploaded dataset file.
+ * @returns {Promise<string>}
+ */
+async function readHeaderLine(file) {
+  let end = 0;
+  let text = "";
+  while (end < file.size) {
+    end = Math.min(end + HEADER_CHUNK_BYTES, file.size);
+    text = new TextDecoder("utf-8").decode(await file.slice(0, end).arrayBuffer());
+    const newline = text.indexOf("\n");
+    if (newline !== -1) return text.slice(0, newline);
+  }
+  return text;
+}
+
 /**
  * Parse uploaded dataset file and return column headers.
  * Supports CSV, TXT, and Excel (.xlsx/.xls) formats.
  *
+ * Only the header is read; column types and statistics come from the
+ * backend's /datasets/profile endpoint.
+ *
  * @param {File} file - Uploaded dataset file.
- * @returns {Promise<{ columns: string[], rows: any[] }>}
+ * @returns {Promise<{ columns: string[] }>}
  */
 export async function parseDataset(file) {
   const ext = file.name.split(".").pop().toLowerCase();
 
-  // Read file as binary string or text depending on type
-  const data = await file.arrayBuffer();
-
   let columns = [];
-  let rows = [];
 
   if (["xlsx", "xls"].includes(ext)) {
-    const workbook = XLSX.read(data, { type: "array" });
+    const data = await file.arrayBuffer();
+    // sheetRows: 1 stops after the header row instead of converting every cell
+    const workbook = XLSX.read(data, { type: "array", sheetRows: 1 });
     const sheet = workbook.Sheets[workbook.SheetNames[0]];
-    rows = XLSX.utils.sheet_to_json(sheet, { defval: "" });
-    if (rows.length > 0) {
-      columns = Object.keys(rows[0]);
-    }
+    const [header = []] = XLSX.utils.sheet_to_json(sheet, { header: 1, defval: "" });
+    columns = header.map((c) => String(c).trim());
   } else if (["csv", "txt"].includes(ext)) {
-    const text = new TextDecoder("utf-8").decode(data);
-    const lines = text.trim().split("\n");
-    columns = lines[0].split(/[,\t]/).map((c) => c.trim());
-    rows = lines.slice(1).map((line) => {
-      const values = line.split(/[,\t]/);
-      return Object.fromEntries(columns.map((c, i) => [c, values[i]]));
-    });
+    const line = await readHeaderLine(file);
+    columns = line.split(ext === "txt" ? "\t" : ",").map((c) => c.trim().replace(/^"(.*)"$/, "$1"));
   } else {
     throw new Error("Unsupported file type. Please upload CSV, TXT, or Excel.");
   }
 
-  return { columns, rows };
+  return { columns };
 }